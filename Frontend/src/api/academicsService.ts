@@ -1,4 +1,5 @@
 import { api } from './api';
+import { studentService } from './apiService';
 
 export const academicsService = {
   getDepartments: () => api.get('academics/departments/'),
@@ -33,13 +34,7 @@ export const academicsService = {
   deleteFee: (feeId: number) => api.delete(`academics/fees/${feeId}/`),
 
   // Student APIs
-  getStudents: (filters?: { department?: number; semester?: number }) => {
-    const params = new URLSearchParams();
-    if (filters?.department) params.append('department', filters.department.toString());
-    if (filters?.semester) params.append('semester', filters.semester.toString());
-    console.log('Student API filters:', params.toString());
-    return api.get(`students/?${params.toString()}`);
-  },
+  getStudents: (filters?: { department?: number; semester?: number }) => studentService.getEveryStudent(filters),
   getStudent: (studentId: string) => api.get(`students/students/${studentId}/`),
 
   // Semester APIs
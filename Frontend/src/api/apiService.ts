@@ -2,15 +2,28 @@ import { api } from './api';
 
 // Student Service
 export const studentService = {
-  getAllStudents: (filters?: { department?: number; semester?: number; search?: string; ordering?: string }) => {
+  // One page of the directory: { next, previous, results }
+  getAllStudents: (filters?: { department?: number; semester?: number; search?: string; ordering?: string; pageSize?: number }) => {
     const params = new URLSearchParams();
     if (filters?.department) params.append('department', filters.department.toString());
     if (filters?.semester) params.append('semester', filters.semester.toString());
     if (filters?.search) params.append('search', filters.search);
     if (filters?.ordering) params.append('ordering', filters.ordering);
+    if (filters?.pageSize) params.append('page_size', filters.pageSize.toString());
     const queryString = params.toString();
     return api.get(`students/${queryString ? '?' + queryString : ''}`);
   },
+  getStudentPage: (url: string) => api.get(url),
+  // Follows the pages for screens that need every student at once; data is the plain array
+  getEveryStudent: async (filters?: { department?: number; semester?: number }) => {
+    let response = await studentService.getAllStudents({ ...filters, pageSize: 500 });
+    const students: any[] = response.data.results.slice();
+    while (response.data.next) {
+      response = await api.get(response.data.next);
+      students.push(...response.data.results);
+    }
+    return { ...response, data: students };
+  },
   getStudentById: (id: number) => api.get(`students/${id}/`),
   createStudent: (data: any) => api.post('students/', data),
   updateStudent: (id: number, data: any) => api.put(`students/${id}/`, data),
@@ -50,7 +50,7 @@ const ScholarshipEligibilityChecker: React.FC = () => {
     const fetchStudents = async () => {
       try {
         setLoading(true);
-        const response = await studentService.getAllStudents();
+        const response = await studentService.getEveryStudent();
         const studentsData: StudentWithEligibility[] = response.data.map((student: Student) => ({
           ...student,
           loading: false
@@ -108,7 +108,7 @@ const ScholarshipEligibilityChecker: React.FC = () => {
       await studentService.updateStudentMetrics(studentId);
 
       // Refresh student data
-      const response = await studentService.getAllStudents();
+      const response = await studentService.getEveryStudent();
       const updatedStudents = response.data.map((student: Student) => ({
         ...student,
         eligibility: students.find(s => s.student_id === student.student_id)?.eligibility
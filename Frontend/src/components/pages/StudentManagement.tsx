@@ -40,8 +40,45 @@ interface StudentManagementProps {
   activeTab: string;
 }
 
+// Students per department id, whatever shape the department comes in
+const countByDepartment = (students: Student[]): Record<number, number> => {
+  const counts: Record<number, number> = {};
+  students.forEach((student: Student) => {
+    let departmentId: number | null = null;
+
+    // Handle different possible department structures
+    if (student.department) {
+      if (typeof student.department === 'object' && student.department !== null) {
+        // If department is an object, try different ID fields
+        if (student.department.department_id) {
+          departmentId = student.department.department_id;
+        } else if (student.department.id) {
+          departmentId = student.department.id;
+        } else if (student.department.departmentId) {
+          departmentId = student.department.departmentId;
+        }
+      } else if (typeof student.department === 'number') {
+        // If department is just an ID number
+        departmentId = student.department;
+      }
+    }
+
+    // Also check if department is stored as a direct property
+    if (!departmentId && (student as any).department_id) {
+      departmentId = (student as any).department_id;
+    }
+
+    if (departmentId) {
+      counts[departmentId] = (counts[departmentId] || 0) + 1;
+    }
+  });
+  return counts;
+};
+
 const StudentManagement: React.FC<StudentManagementProps> = ({ activeTab }) => {
   const [students, setStudents] = useState<Student[]>([]);
+  const [nextPage, setNextPage] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState<boolean>(false);
   const [courses, setCourses] = useState<Course[]>([]);
   const [departments, setDepartments] = useState<any[]>([]);
 
@@ -60,44 +97,10 @@ const StudentManagement: React.FC<StudentManagementProps> = ({ activeTab }) => {
     setError(null);
     try {
       const response = await studentService.getAllStudents();
-      setStudents(response.data);
-
-      // Calculate counts per department with better error handling
-      const counts: Record<number, number> = {};
-      response.data.forEach((student: Student) => {
-        let departmentId: number | null = null;
-
-        // Handle different possible department structures
-        if (student.department) {
-          if (typeof student.department === 'object' && student.department !== null) {
-            // If department is an object, try different ID fields
-            if (student.department.department_id) {
-              departmentId = student.department.department_id;
-            } else if (student.department.id) {
-              departmentId = student.department.id;
-            } else if (student.department.departmentId) {
-              departmentId = student.department.departmentId;
-            }
-          } else if (typeof student.department === 'number') {
-            // If department is just an ID number
-            departmentId = student.department;
-          }
-        }
-
-        // Also check if department is stored as a direct property
-        if (!departmentId && (student as any).department_id) {
-          departmentId = (student as any).department_id;
-        }
-
-        if (departmentId) {
-          counts[departmentId] = (counts[departmentId] || 0) + 1;
-        }
-      });
-
-      console.log('Department counts calculated:', counts);
-      console.log('Sample student data:', response.data.slice(0, 2)); // Log first 2 students for debugging
-      setDepartmentCounts(counts);
-
+      // The directory is paged: show the first page and load the rest on demand
+      setStudents(response.data.results);
+      setNextPage(response.data.next);
+      setDepartmentCounts(countByDepartment(response.data.results));
     } catch (error: any) {
       setError(error.message || 'Failed to fetch students');
       console.error('Failed to fetch students:', error);
@@ -106,6 +109,25 @@ const StudentManagement: React.FC<StudentManagementProps> = ({ activeTab }) => {
     }
   }, []);
 
+  const loadMoreStudents = useCallback(async () => {
+    if (!nextPage) return;
+    setLoadingMore(true);
+    try {
+      const response = await studentService.getStudentPage(nextPage);
+      setStudents(prev => {
+        const updated = [...prev, ...response.data.results];
+        setDepartmentCounts(countByDepartment(updated));
+        return updated;
+      });
+      setNextPage(response.data.next);
+    } catch (error: any) {
+      setError(error.message || 'Failed to fetch students');
+      console.error('Failed to fetch more students:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [nextPage]);
+
   const fetchCourses = useCallback(async () => {
     try {
       const response = await courseService.getAllCourses();
@@ -511,6 +533,17 @@ const StudentManagement: React.FC<StudentManagementProps> = ({ activeTab }) => {
                 ))}
               </tbody>
             </table>
+            {nextPage && (
+              <div className="flex justify-center py-4">
+                <button
+                  onClick={loadMoreStudents}
+                  disabled={loadingMore}
+                  className="px-4 py-2 text-sm font-medium text-indigo-600 bg-indigo-50 hover:bg-indigo-100 rounded-lg focus:outline-none focus:ring-2 focus:ring-indigo-500 disabled:opacity-50"
+                >
+                  {loadingMore ? 'Loading...' : 'Load more students'}
+                </button>
+              </div>
+            )}
           </div>
         )}
 
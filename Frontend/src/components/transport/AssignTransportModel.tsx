@@ -27,7 +27,7 @@ const AssignTransportModal: React.FC<Props> = ({ isOpen, onClose, onSaved, initi
   const [saving, setSaving] = useState(false);
 
   useEffect(() => {
-    studentService.getAllStudents()
+    studentService.getEveryStudent()
       .then(r => setStudents(r.data))
       .catch(() => setStudents([]));
 
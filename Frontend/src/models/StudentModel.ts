@@ -14,7 +14,7 @@ export class StudentModel {
   async fetchStudents(departmentId: number, semesterId: number): Promise<Student[]> {
     // API call to fetch students
     const response = await fetch(`/api/students?department=${departmentId}&semester=${semesterId}`);
-    this.students = await response.json();
+    this.students = (await response.json()).results;
     return this.students;
   }
 
@@ -99,7 +99,7 @@ const AdminDashboard = () => {
     const fetchDashboardData = async () => {
       try {
         const [studentsRes, departmentsRes, coursesRes, instructorsRes] = await Promise.all([
-          apiStudentService.getAllStudents(),
+          apiStudentService.getEveryStudent(),
           departmentService.getAllDepartments(),
           courseService.getAllCourses(),
           instructorService.getAllInstructors(),
@@ -196,7 +196,7 @@ const AdminDashboard = () => {
         const response = await academicsService.getSemestersByDepartment(selectedDepartment);
         // Filter to only semesters that have students
         try {
-          const studentsResponse = await apiStudentService.getAllStudents({ department: selectedDepartment });
+          const studentsResponse = await apiStudentService.getEveryStudent({ department: selectedDepartment });
           const students = studentsResponse.data;
           const semesterIds = Array.from(new Set(
             students
@@ -237,7 +237,7 @@ const AdminDashboard = () => {
       try {
         setLoading(true);
         // Use server-side filtering instead of client-side filtering
-        const response = await apiStudentService.getAllStudents({
+        const response = await apiStudentService.getEveryStudent({
           department: selectedDepartment,
           semester: selectedSemester
         });
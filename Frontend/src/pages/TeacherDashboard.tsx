@@ -64,7 +64,7 @@ const TeacherDashboard = () => {
       try {
         const [coursesRes, studentsRes] = await Promise.all([
           courseService.getAllCourses(),
-          studentService.getAllStudents(),
+          studentService.getEveryStudent(),
         ]);
 
         // Filter courses assigned to current instructor (assuming instructor ID is available)
@@ -17,6 +17,8 @@ load_dotenv()  # ye .env file ko load karega
 
 from pathlib import Path
 
+from monitoring.structured_logging import parse_rates
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -66,6 +68,7 @@ REST_FRAMEWORK = {
 }
 
 MIDDLEWARE = [
+    'monitoring.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -73,7 +76,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    "corsheaders.middleware.CorsMiddleware"
+    "corsheaders.middleware.CorsMiddleware",
+    'academics.middleware.DeferredRecomputeMiddleware',
 ]
 
 ROOT_URLCONF = 'UMI_backend.urls'
@@ -130,6 +134,64 @@ DATABASES = {
 }
 
 
+# Cache (student dashboards etc.). LocMemCache is per process; point these at a
+# shared backend such as Redis when running several workers so invalidation is seen by all.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'umi-backend'),
+    }
+}
+
+# Request metrics (monitoring app). Set MONITORING_METRICS_DB to a SQLite file
+# path to aggregate metrics across worker processes; MONITORING_METRICS_TOKEN
+# protects the Prometheus endpoint with a bearer token (without one, only
+# admin users can read it).
+MONITORING_METRICS_DB = os.getenv('MONITORING_METRICS_DB') or None
+MONITORING_METRICS_FLUSH_SECONDS = int(os.getenv('MONITORING_METRICS_FLUSH_SECONDS', '5'))
+MONITORING_METRICS_TOKEN = os.getenv('MONITORING_METRICS_TOKEN') or None
+
+# Photo uploads: worker threads producing the WebP renditions
+# (academics.services.images); 0 processes them inline after commit.
+IMAGE_PROCESSING_WORKERS = int(os.getenv('IMAGE_PROCESSING_WORKERS', '2'))
+
+# Logging: JSON lines on stderr (LOG_FORMAT=plain for a readable console).
+# LOG_LEVEL applies to the project's apps; debug calls are skipped entirely
+# below it. LOG_SAMPLE_RATES keeps a fraction of the sub-WARNING records per
+# logger, e.g. "students.views=0.1,instructors=0.5".
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'monitoring.structured_logging.JsonFormatter'},
+        'plain': {'format': '%(asctime)s %(levelname)s %(name)s: %(message)s'},
+    },
+    'filters': {
+        'sampling': {
+            '()': 'monitoring.structured_logging.SamplingFilter',
+            'rates': parse_rates(os.getenv('LOG_SAMPLE_RATES')),
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': os.getenv('LOG_FORMAT', 'json'),
+            'filters': ['sampling'],
+        },
+    },
+    'root': {'handlers': ['console'], 'level': 'WARNING'},
+    'loggers': {
+        'django': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+        **{
+            app: {'handlers': ['console'], 'level': LOG_LEVEL, 'propagate': False}
+            for app in ('academics', 'students', 'instructors', 'register', 'messaging', 'library', 'transport', 'monitoring')
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -171,6 +233,15 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads are stored under their content hash (academics.storage) and served
+# by academics.media_views. Behind nginx, set MEDIA_ACCEL_REDIRECT to an
+# internal location aliased to MEDIA_ROOT, e.g. '/protected-media/'.
+STORAGES = {
+    'default': {'BACKEND': 'academics.storage.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+MEDIA_ACCEL_REDIRECT = os.getenv('MEDIA_ACCEL_REDIRECT') or None
+
 # Add media files serving in development
 if DEBUG:
     import mimetypes
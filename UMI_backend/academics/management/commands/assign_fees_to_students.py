@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from academics.models import Fee, FeeStructure
+from academics.services.deferred import deferred_recompute
 from students.models import Student
 from datetime import date, timedelta
 
@@ -18,42 +19,43 @@ class Command(BaseCommand):
         created_count = 0
         skipped_count = 0
 
-        for student in students_without_fees:
-            try:
-                # Check if there's an active fee structure for this department-semester
-                fee_structure = FeeStructure.objects.filter(
-                    department=student.department,
-                    semester=student.semester,
-                    is_active=True
-                ).first()
-
-                if fee_structure:
-                    # Calculate due date (30 days from enrollment or today if no enrollment date)
-                    due_date = student.enrollment_date + timedelta(days=30) if student.enrollment_date else date.today() + timedelta(days=30)
-
-                    # Create fee record
-                    Fee.objects.create(
-                        student=student,
+        with deferred_recompute():
+            for student in students_without_fees:
+                try:
+                    # Check if there's an active fee structure for this department-semester
+                    fee_structure = FeeStructure.objects.filter(
                         department=student.department,
                         semester=student.semester,
-                        amount=fee_structure.amount,
-                        due_date=due_date,
-                        paid_amount=0,
-                        status=Fee.UNPAID
-                    )
-                    created_count += 1
-                    self.stdout.write(
-                        self.style.SUCCESS(f'Created fee record for student {student.name} ({student.registration_number}) - ${fee_structure.amount}')
-                    )
-                else:
-                    skipped_count += 1
+                        is_active=True
+                    ).first()
+
+                    if fee_structure:
+                        # Calculate due date (30 days from enrollment or today if no enrollment date)
+                        due_date = student.enrollment_date + timedelta(days=30) if student.enrollment_date else date.today() + timedelta(days=30)
+
+                        # Create fee record
+                        Fee.objects.create(
+                            student=student,
+                            department=student.department,
+                            semester=student.semester,
+                            amount=fee_structure.amount,
+                            due_date=due_date,
+                            paid_amount=0,
+                            status=Fee.UNPAID
+                        )
+                        created_count += 1
+                        self.stdout.write(
+                            self.style.SUCCESS(f'Created fee record for student {student.name} ({student.registration_number}) - ${fee_structure.amount}')
+                        )
+                    else:
+                        skipped_count += 1
+                        self.stdout.write(
+                            self.style.WARNING(f'No active fee structure found for student {student.name} in {student.department.name} - {student.semester.name}')
+                        )
+                except Exception as e:
                     self.stdout.write(
-                        self.style.WARNING(f'No active fee structure found for student {student.name} in {student.department.name} - {student.semester.name}')
+                        self.style.ERROR(f'Error creating fee for student {student.name}: {e}')
                     )
-            except Exception as e:
-                self.stdout.write(
-                    self.style.ERROR(f'Error creating fee for student {student.name}: {e}')
-                )
 
         self.stdout.write(
             self.style.SUCCESS(f'Successfully created {created_count} fee records')
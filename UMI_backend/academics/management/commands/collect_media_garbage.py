@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from academics.storage import collect_garbage
+
+
+class Command(BaseCommand):
+    help = 'Delete media files that no record references (content-addressed files may be shared, so they are never deleted on update)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='List what would be deleted without deleting it')
+        parser.add_argument('--grace-hours', type=float, default=24,
+                            help='Keep unreferenced files newer than this, e.g. uploads still being processed')
+
+    def handle(self, *args, **options):
+        removed, freed = collect_garbage(
+            dry_run=options['dry_run'], grace=timedelta(hours=options['grace_hours'])
+        )
+        for name in removed:
+            self.stdout.write(name)
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {len(removed)} unreferenced files ({freed / 1024:.1f} KiB)'))
@@ -0,0 +1,62 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from academics.models import Department, Semester
+from academics.services.promotion import promote_department
+
+class Command(BaseCommand):
+    help = 'Promote all eligible students of a department semester in one transaction'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--department', type=int, required=True, help='department_id to promote')
+        parser.add_argument('--semester', type=int, required=True, help='semester_id the students are currently in')
+        parser.add_argument('--due-date', help='Due date (YYYY-MM-DD) for the next semester fees')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be done without making changes',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        try:
+            department = Department.objects.get(department_id=options['department'])
+            semester = Semester.objects.get(semester_id=options['semester'])
+        except (Department.DoesNotExist, Semester.DoesNotExist) as e:
+            raise CommandError(str(e))
+
+        due_date = None
+        if options.get('due_date'):
+            due_date = datetime.strptime(options['due_date'], '%Y-%m-%d').date()
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN MODE - No changes will be made'))
+
+        self.stdout.write(f'Evaluating students of {department.name} - {semester.name}...')
+        report = promote_department(
+            department.department_id,
+            semester.semester_id,
+            due_date=due_date,
+            dry_run=dry_run,
+            progress=lambda done, total: self.stdout.write(f'Promoted {done}/{total} students'),
+        )
+
+        for row in report['promoted']:
+            prefix = 'Would promote' if dry_run else 'Promoted'
+            self.stdout.write(f"{prefix} {row['student_id']} ({row['name']})")
+        for status, rows in report['skipped'].items():
+            for row in rows:
+                self.stdout.write(f"Skipping {row['student_id']} ({row['name']}) - {status}: {row['message']}")
+
+        if dry_run:
+            self.stdout.write(
+                self.style.SUCCESS(f"Dry run complete. Would promote {len(report['promoted'])} out of {report['total_students']} students.")
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Successfully promoted {len(report['promoted'])} out of {report['total_students']} students "
+                    f"({report['fees_cleared']} fees cleared, {report['fees_created']} fees created, "
+                    f"{report['courses_assigned']} course enrollments)."
+                )
+            )
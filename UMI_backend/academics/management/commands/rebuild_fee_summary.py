@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from academics.services.fee_summary import REBUILD_CHUNK_SIZE, check_summary, rebuild_summary
+
+class Command(BaseCommand):
+    help = 'Check the fee collection summary against the fees, or rebuild it from the fee ledger'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report summary buckets whose totals disagree with the fees',
+        )
+        parser.add_argument(
+            '--department',
+            type=int,
+            help='Only this department_id',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=REBUILD_CHUNK_SIZE,
+            help=f'Fees replayed per batch of queries (default {REBUILD_CHUNK_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            mismatches = check_summary(options.get('department'))
+            for (department_id, semester_id, status), (summary, fees) in sorted(mismatches.items()):
+                self.stdout.write(
+                    f"Department {department_id}, semester {semester_id}, {status}: "
+                    f"summary {summary['fee_count']} fees / {summary['balance']} balance, "
+                    f"fees {fees['fee_count']} / {fees['balance']}"
+                )
+            if mismatches:
+                self.stdout.write(self.style.WARNING(f'{len(mismatches)} summary buckets disagree; run without --check to rebuild.'))
+            else:
+                self.stdout.write(self.style.SUCCESS('The fee collection summary matches the fees.'))
+            return
+
+        written = rebuild_summary(options.get('department'), chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the fee collection summary ({written} buckets).'))
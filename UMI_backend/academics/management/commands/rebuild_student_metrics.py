@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from academics.models import Department
+from academics.services.student_metrics import rebuild_students
+from students.models import Student
+
+class Command(BaseCommand):
+    help = 'Rebuild attendance/GPA counters and the derived Student fields with grouped aggregates'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--department',
+            type=int,
+            help='Only rebuild students of this department_id',
+        )
+
+    def handle(self, *args, **options):
+        department_id = options.get('department')
+
+        if department_id:
+            departments = Department.objects.filter(department_id=department_id)
+        else:
+            departments = Department.objects.all()
+
+        total = 0
+        for department in departments:
+            updated = rebuild_students(Student.objects.filter(department=department))
+            total += len(updated)
+            self.stdout.write(f'Rebuilt metrics for {len(updated)} students in {department.name}')
+
+        if not department_id:
+            updated = rebuild_students(Student.objects.filter(department__isnull=True))
+            total += len(updated)
+            if updated:
+                self.stdout.write(f'Rebuilt metrics for {len(updated)} students without a department')
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully rebuilt metrics for {total} students'))
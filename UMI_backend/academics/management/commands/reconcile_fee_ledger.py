@@ -0,0 +1,51 @@
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from academics.models import Fee
+from academics.services.ledger import RECONCILE_CHUNK_SIZE, reconcile, repair
+
+class Command(BaseCommand):
+    help = 'Verify stored fee balances against the fee ledger and payments (optionally repair them)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Post adjustment entries and recompute mismatched fees from their payments',
+        )
+        parser.add_argument(
+            '--department',
+            type=int,
+            help='Only fees of this department_id',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=RECONCILE_CHUNK_SIZE,
+            help=f'Fees checked per batch of queries (default {RECONCILE_CHUNK_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        fees = Fee.objects.all()
+        if options.get('department'):
+            fees = fees.filter(department_id=options['department'])
+
+        reports = reconcile(fees, chunk_size=options['chunk_size'])
+        mismatched = repaired = 0
+        while chunk := list(islice(reports, options['chunk_size'])):
+            mismatched += len(chunk)
+            for report in chunk:
+                self.stdout.write(
+                    f"Fee {report['fee_id']}: {', '.join(report['problems'])} "
+                    f"(paid_amount {report['paid_amount']}, ledger {report['ledger']}, "
+                    f"payments {report['payments']}, balance {report['balance']}, status {report['status']})"
+                )
+            if options['fix']:
+                repaired += repair(chunk)
+
+        if not mismatched:
+            self.stdout.write(self.style.SUCCESS('All fees reconcile with the ledger.'))
+        elif options['fix']:
+            self.stdout.write(self.style.SUCCESS(f'Repaired {repaired} mismatched fees.'))
+        else:
+            self.stdout.write(self.style.WARNING(f'{mismatched} fees do not reconcile; run with --fix to repair them.'))
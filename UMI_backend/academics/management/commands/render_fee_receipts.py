@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from academics.models import Fee
+from academics.services.receipts import RENDERERS, write_receipts_zip
+
+class Command(BaseCommand):
+    help = 'Render the fee receipts of a department (optionally one semester) into a ZIP file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--department',
+            type=int,
+            required=True,
+            help='department_id whose fees get receipts',
+        )
+        parser.add_argument(
+            '--semester',
+            type=int,
+            help='Only fees of this semester_id',
+        )
+        parser.add_argument(
+            '--format',
+            choices=sorted(RENDERERS),
+            default='pdf',
+            help='Receipt format (default pdf)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Rendering processes (default 1: render in this process; 0 for one per CPU)',
+        )
+        parser.add_argument(
+            '--output',
+            help='ZIP file to write (default receipts-<department>[-<semester>].zip)',
+        )
+
+    def handle(self, *args, **options):
+        fees = Fee.objects.filter(department_id=options['department']).order_by('student_id', 'fee_id')
+        name = f"receipts-{options['department']}"
+        if options.get('semester'):
+            fees = fees.filter(semester_id=options['semester'])
+            name += f"-{options['semester']}"
+        if not fees.exists():
+            raise CommandError('No fees found for that department and semester')
+
+        output = options.get('output') or f'{name}.zip'
+        count = write_receipts_zip(fees, output, kind=options['format'], workers=options['workers'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {count} receipts to {output}.'))
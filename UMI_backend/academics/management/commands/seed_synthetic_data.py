@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from academics.models import Department
+from academics.services.seeding import SEED_BATCH_SIZE, seed_university
+
+class Command(BaseCommand):
+    help = 'Bulk-generate a synthetic university (students, attendance, results, fees, payments) for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--departments', type=int, default=4)
+        parser.add_argument('--semesters', type=int, default=8, help='Semesters per department')
+        parser.add_argument('--courses', type=int, default=5, help='Courses per semester')
+        parser.add_argument(
+            '--students',
+            type=int,
+            default=100,
+            help='Students per department semester (total = departments x semesters x students)',
+        )
+        parser.add_argument('--years', type=int, default=1, help='Years of attendance history')
+        parser.add_argument('--sessions-per-year', type=int, default=100, help='Attendance days per year')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; the same seed gives the same data')
+        parser.add_argument('--prefix', default='SD', help='Department code prefix for the generated departments')
+        parser.add_argument('--batch-size', type=int, default=SEED_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if Department.objects.filter(code__startswith=prefix).exists():
+            raise CommandError(f'Departments with code prefix "{prefix}" already exist - use another --prefix')
+
+        total = options['departments'] * options['semesters'] * options['students']
+        self.stdout.write(f'Generating {total} students in {options["departments"]} departments...')
+        started = time.monotonic()
+
+        def progress(done, departments, counts):
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f'Department {done}/{departments}: {counts["students"]} students, '
+                f'{counts["attendance"]} attendance rows, {counts["results"]} results, '
+                f'{counts["fees"]} fees, {counts["payments"]} payments ({elapsed:.1f}s)'
+            )
+
+        counts = seed_university(
+            departments=options['departments'],
+            semesters=options['semesters'],
+            courses=options['courses'],
+            students=options['students'],
+            years=options['years'],
+            sessions_per_year=options['sessions_per_year'],
+            seed=options['seed'],
+            prefix=prefix,
+            batch_size=options['batch_size'],
+            progress=progress,
+        )
+
+        elapsed = time.monotonic() - started
+        summary = ', '.join(f'{count} {name}' for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'Successfully generated {summary} in {elapsed:.1f}s'))
@@ -0,0 +1,135 @@
+# academics/media_views.py
+"""
+Serving of MEDIA_ROOT files with validators, long-lived caching and byte ranges.
+
+Content-addressed names (see academics.storage) never change content, so
+they are sent with a one-year immutable Cache-Control and their hash as the
+ETag; other files get a short max-age and a size/mtime ETag. With
+settings.MEDIA_ACCEL_REDIRECT set (e.g. '/protected-media/'), the response
+is handed to nginx via X-Accel-Redirect instead of being streamed by Python;
+otherwise full responses use FileResponse, which lets the WSGI server use
+sendfile.
+"""
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from .storage import is_content_addressed
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+MUTABLE_MAX_AGE = 60 * 60
+
+RANGE_CHUNK_SIZE = 64 * 1024
+
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _etag(name, stat):
+    if is_content_addressed(name):
+        return f'"{os.path.splitext(os.path.basename(name))[0]}"'
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def _not_modified(request, etag, mtime):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        return if_none_match.strip() == '*' or etag in [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return modified_since is not None and int(mtime) <= modified_since
+
+
+def parse_range(header, size):
+    """(start, end) inclusive for a single 'bytes=' range, None for no/unsupported ranges, False if unsatisfiable"""
+    match = _RANGE.match(header or '')
+    if not match or (not match.group(1) and not match.group(2)):
+        return None
+    start, end = match.groups()
+    if not start:
+        length = int(end)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as media:
+        media.seek(start)
+        while length > 0:
+            chunk = media.read(min(RANGE_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+@require_safe
+def serve_media(request, path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except Exception:
+        raise Http404('Invalid path')
+    if not os.path.isfile(full_path):
+        raise Http404('File not found')
+
+    stat = os.stat(full_path)
+    etag = _etag(path, stat)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': (
+            f'public, max-age={IMMUTABLE_MAX_AGE}, immutable' if is_content_addressed(path)
+            else f'public, max-age={MUTABLE_MAX_AGE}'
+        ),
+        'Accept-Ranges': 'bytes',
+    }
+    if _not_modified(request, etag, stat.st_mtime):
+        response = HttpResponseNotModified()
+        for header in ('ETag', 'Last-Modified', 'Cache-Control'):
+            response[header] = headers[header]
+        return response
+
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    accel_prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT', None)
+    if accel_prefix:
+        # nginx answers ranges and conditionals itself from the internal location
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + path.lstrip('/')
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if 'Range' in request.headers and (if_range is None or if_range.strip() == etag):
+        byte_range = parse_range(request.headers['Range'], stat.st_size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+
+    if byte_range:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            _read_range(full_path, start, length) if request.method == 'GET' else iter(()),
+            status=206, content_type=content_type
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Content-Length'] = str(length)
+    else:
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+    for header, value in headers.items():
+        response[header] = value
+    return response
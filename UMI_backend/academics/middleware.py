@@ -0,0 +1,16 @@
+from .services.deferred import deferred_recompute
+
+
+class DeferredRecomputeMiddleware:
+    """
+    Coalesce the student recomputations triggered by a request's writes so
+    each affected student is recomputed once, at the end of the request.
+    (Payments don't need this: the fee ledger applies them in O(1).)
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with deferred_recompute():
+            return self.get_response(request)
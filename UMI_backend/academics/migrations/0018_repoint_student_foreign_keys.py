@@ -0,0 +1,49 @@
+# Generated by Django 5.2.5 on 2026-10-17 08:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Student's primary key moved back to student_id in students 0017; rebuild
+    the foreign keys that were created against the old integer id column.
+    """
+
+    dependencies = [
+        ('academics', '0017_studentacademichistory'),
+        ('students', '0017_student_id_primary_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='fee',
+            name='student',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fees', to='students.student', db_constraint=False),
+        ),
+        migrations.AlterField(
+            model_name='fee',
+            name='student',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fees', to='students.student'),
+        ),
+        migrations.AlterField(
+            model_name='result',
+            name='student',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='students.student', db_constraint=False),
+        ),
+        migrations.AlterField(
+            model_name='result',
+            name='student',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='students.student'),
+        ),
+        migrations.AlterField(
+            model_name='studentacademichistory',
+            name='student',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='academic_history', to='students.student', db_constraint=False),
+        ),
+        migrations.AlterField(
+            model_name='studentacademichistory',
+            name='student',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='academic_history', to='students.student'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-17 09:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0018_repoint_student_foreign_keys'),
+        ('students', '0017_student_id_primary_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentPerformanceCounter',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='performance_counter', serialize=False, to='students.student')),
+                ('attendance_total', models.PositiveIntegerField(default=0)),
+                ('attendance_present', models.PositiveIntegerField(default=0)),
+                ('result_count', models.PositiveIntegerField(default=0)),
+                ('grade_points_total', models.FloatField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.5 on 2026-10-17 14:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def post_existing_payments(apps, schema_editor):
+    """Opening ledger: one PAYMENT entry per existing payment, so fees reconcile from the start"""
+    Payment = apps.get_model('academics', 'Payment')
+    FeeLedgerEntry = apps.get_model('academics', 'FeeLedgerEntry')
+    batch = []
+    for payment_id, fee_id, amount, transaction_id in (
+        Payment.objects.order_by('payment_id').values_list('payment_id', 'fee_id', 'amount', 'transaction_id').iterator(chunk_size=2000)
+    ):
+        batch.append(FeeLedgerEntry(fee_id=fee_id, payment_id=payment_id, kind='Payment',
+                                    amount=amount, transaction_id=transaction_id, description='Opening balance'))
+        if len(batch) >= 2000:
+            FeeLedgerEntry.objects.bulk_create(batch)
+            batch = []
+    FeeLedgerEntry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0019_studentperformancecounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeeLedgerEntry',
+            fields=[
+                ('entry_id', models.AutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('Payment', 'Payment'), ('Reversal', 'Reversal'), ('Adjustment', 'Adjustment'), ('Write-off', 'Write-off')], default='Payment', max_length=10)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('transaction_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('description', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('fee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_entries', to='academics.fee')),
+                ('payment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='academics.payment')),
+            ],
+            options={
+                'ordering': ['entry_id'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='payment',
+            constraint=models.UniqueConstraint(condition=models.Q(('transaction_id__gt', '')), fields=('transaction_id',), name='unique_payment_transaction_id'),
+        ),
+        migrations.RunPython(post_existing_payments, migrations.RunPython.noop),
+    ]
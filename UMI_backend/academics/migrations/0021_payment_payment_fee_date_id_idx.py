@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-17 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0020_feeledgerentry_payment_transaction_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['fee', 'payment_date', 'payment_id'], name='payment_fee_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 5.2.5 on 2026-10-17 16:05
+
+from collections import defaultdict
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def _status(amount, paid):
+    return 'Paid' if paid >= amount else 'Partial' if paid > 0 else 'Unpaid'
+
+
+def build_summary(apps, schema_editor):
+    """
+    Opening cube, replayed from the fee ledger as rebuild_summary() does:
+    each fee opens unpaid on its first ledger day and moves on every entry's
+    day; fees without entries are booked on the day of the migration.
+    """
+    Fee = apps.get_model('academics', 'Fee')
+    FeeLedgerEntry = apps.get_model('academics', 'FeeLedgerEntry')
+    FeeCollectionSummary = apps.get_model('academics', 'FeeCollectionSummary')
+    today = timezone.localdate()
+    buckets = defaultdict(lambda: [0, Decimal('0.00'), Decimal('0.00'), Decimal('0.00')])
+
+    def book(department_id, semester_id, day, amount, paid, sign):
+        bucket = buckets[(department_id, semester_id, _status(amount, paid), day)]
+        for index, value in enumerate((1, amount, paid, amount - paid)):
+            bucket[index] += sign * value
+
+    entries = defaultdict(list)
+    for fee_id, day, amount in (
+        FeeLedgerEntry.objects.annotate(day=TruncDate('created_at')).order_by('entry_id')
+        .values_list('fee_id', 'day', 'amount').iterator(chunk_size=2000)
+    ):
+        entries[fee_id].append((day, amount))
+
+    for fee_id, department_id, semester_id, amount, paid_amount in (
+        Fee.objects.filter(department__isnull=False, semester__isnull=False).order_by('fee_id')
+        .values_list('fee_id', 'department_id', 'semester_id', 'amount', 'paid_amount').iterator(chunk_size=2000)
+    ):
+        paid = None
+        for day, moved in entries.get(fee_id, ()):
+            if paid is None:
+                paid = Decimal('0.00')
+            else:
+                book(department_id, semester_id, day, amount, paid, -1)
+            paid += moved
+            book(department_id, semester_id, day, amount, paid, 1)
+        if paid != paid_amount:
+            if paid is not None:
+                book(department_id, semester_id, today, amount, paid, -1)
+            book(department_id, semester_id, today, amount, paid_amount, 1)
+
+    FeeCollectionSummary.objects.bulk_create([
+        FeeCollectionSummary(department_id=department_id, semester_id=semester_id, status=status, day=day,
+                             fee_count=values[0], amount=values[1], paid_amount=values[2], balance=values[3])
+        for (department_id, semester_id, status, day), values in buckets.items()
+        if any(values)
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0021_payment_payment_fee_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeeCollectionSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('Paid', 'Paid'), ('Unpaid', 'Unpaid'), ('Partial', 'Partial')], max_length=10)),
+                ('day', models.DateField()),
+                ('fee_count', models.IntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('paid_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('balance', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('department', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fee_summaries', to='academics.department')),
+                ('semester', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fee_summaries', to='academics.semester')),
+            ],
+            options={
+                'ordering': ['day'],
+                'indexes': [models.Index(fields=['day'], name='fee_summary_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('department', 'semester', 'status', 'day'), name='unique_fee_summary_bucket')],
+            },
+        ),
+        migrations.RunPython(build_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.5 on 2026-10-17 18:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_fee_department_semester(apps, schema_editor):
+    Fee = apps.get_model('academics', 'Fee')
+    Payment = apps.get_model('academics', 'Payment')
+    fee = Fee.objects.filter(fee_id=OuterRef('fee_id'))
+    Payment.objects.update(
+        department_id=Subquery(fee.values('department_id')[:1]),
+        semester_id=Subquery(fee.values('semester_id')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0022_feecollectionsummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='department',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='academics.department'),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='semester',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='academics.semester'),
+        ),
+        migrations.RunPython(copy_fee_department_semester, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['department', 'semester', 'payment_date', 'payment_id'], name='payment_dept_sem_date_id_idx'),
+        ),
+    ]
@@ -82,6 +82,22 @@ class Attendance(models.Model):
 
 
 # ---------- Result ----------
+GRADE_THRESHOLDS = (
+    (90, 'A+'), (85, 'A'), (80, 'A-'),
+    (75, 'B+'), (70, 'B'), (65, 'B-'),
+    (60, 'C+'), (55, 'C'), (50, 'C-'),
+    (45, 'D+'), (40, 'D'),
+)
+
+
+def grade_for_percentage(percentage):
+    """Letter grade for a percentage; anything below 40 is an F"""
+    for minimum, grade in GRADE_THRESHOLDS:
+        if percentage >= minimum:
+            return grade
+    return 'F'
+
+
 class Result(models.Model):
     result_id = models.AutoField(primary_key=True)
     student = models.ForeignKey("students.Student", on_delete=models.CASCADE, related_name="results")
@@ -150,31 +166,7 @@ class Result(models.Model):
 
         # Calculate grade based on percentage
         percentage = (self.obtained_marks / self.total_marks) * 100 if self.total_marks > 0 else 0
-
-        if percentage >= 90:
-            self.grade = 'A+'
-        elif percentage >= 85:
-            self.grade = 'A'
-        elif percentage >= 80:
-            self.grade = 'A-'
-        elif percentage >= 75:
-            self.grade = 'B+'
-        elif percentage >= 70:
-            self.grade = 'B'
-        elif percentage >= 65:
-            self.grade = 'B-'
-        elif percentage >= 60:
-            self.grade = 'C+'
-        elif percentage >= 55:
-            self.grade = 'C'
-        elif percentage >= 50:
-            self.grade = 'C-'
-        elif percentage >= 45:
-            self.grade = 'D+'
-        elif percentage >= 40:
-            self.grade = 'D'
-        else:
-            self.grade = 'F'
+        self.grade = grade_for_percentage(percentage)
 
         super().save(*args, **kwargs)
 
@@ -283,24 +275,9 @@ class Fee(models.Model):
         super().save(*args, **kwargs)
 
     def receipt_text(self):
-        """Generate a simple text receipt for the fee"""
-        student_name = self.student.name or f"{self.student.first_name} {self.student.last_name}".strip() or 'Unknown'
-        registration = self.student.registration_number or self.student.student_id or 'N/A'
-        department = self.student.department.name if self.student.department else 'N/A'
-        return f"""
-Fee Receipt
------------
-Student: {student_name}
-Registration: {registration}
-Department: {department}
-Semester: {self.semester.name if self.semester else 'N/A'}
-Amount: ${self.amount}
-Paid Amount: ${self.paid_amount}
-Balance: ${self.balance}
-Status: {self.status}
-Due Date: {self.due_date}
-Paid On: {self.paid_on if self.paid_on else 'N/A'}
-        """.strip()
+        """Generate a simple text receipt for the fee (see academics.services.receipts)"""
+        from academics.services.receipts import get_receipt
+        return get_receipt(self.pk, 'text')[1]
 
     def __str__(self):
         semester_name = self.semester.name if self.semester else "No Semester"
@@ -316,6 +293,10 @@ class Payment(models.Model):
 
     payment_id = models.AutoField(primary_key=True)
     fee = models.ForeignKey(Fee, on_delete=models.CASCADE, related_name="payments")
+    # Copies of the fee's department and semester (kept by save() and the Fee
+    # signals), so a department semester's payment history is one index range
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, null=True, blank=True, related_name="+", db_index=False)
+    semester = models.ForeignKey(Semester, on_delete=models.CASCADE, null=True, blank=True, related_name="+", db_index=False)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     payment_date = models.DateField(auto_now_add=True)
     payment_method = models.CharField(max_length=10, choices=PAYMENT_METHOD_CHOICES, default=CASH)
@@ -325,15 +306,70 @@ class Payment(models.Model):
 
     class Meta:
         ordering = ["-payment_date"]
+        constraints = [
+            # transaction_id is the idempotency key of a payment (bank/gateway reference)
+            models.UniqueConstraint(
+                fields=["transaction_id"],
+                condition=models.Q(transaction_id__gt=""),
+                name="unique_payment_transaction_id",
+            ),
+        ]
+        indexes = [
+            # A fee's payments, newest first (receipts)
+            models.Index(fields=["fee", "payment_date", "payment_id"], name="payment_fee_date_id_idx"),
+            # Keyset pagination of payment history (see academics.services.payment_history)
+            models.Index(fields=["department", "semester", "payment_date", "payment_id"], name="payment_dept_sem_date_id_idx"),
+        ]
 
     def save(self, *args, **kwargs):
+        if self.fee_id is not None:
+            self.department_id, self.semester_id = self.fee.department_id, self.fee.semester_id
         super().save(*args, **kwargs)
-        # Fee balance update is handled by signals to avoid double updates
+        # Fee balance update is handled by signals (academics.services.ledger) to avoid double updates
 
     def __str__(self):
         return f"Payment of ${self.amount} for {self.fee.student.name} on {self.payment_date}"
 
 
+# ---------- Fee Ledger ----------
+class FeeLedgerEntry(models.Model):
+    """
+    Append-only journal of a fee's paid amount. Each entry moves ``amount``
+    from the student's receivable to cash (negative for reversals), so a
+    fee's paid_amount always equals the sum of its entries; see
+    academics.services.ledger. Write-offs (balances cleared on promotion)
+    are the only entries without a payment behind them.
+    """
+    PAYMENT = "Payment"
+    REVERSAL = "Reversal"
+    ADJUSTMENT = "Adjustment"
+    WRITE_OFF = "Write-off"
+    KIND_CHOICES = [(PAYMENT, "Payment"), (REVERSAL, "Reversal"), (ADJUSTMENT, "Adjustment"), (WRITE_OFF, "Write-off")]
+
+    entry_id = models.AutoField(primary_key=True)
+    fee = models.ForeignKey(Fee, on_delete=models.CASCADE, related_name="ledger_entries")
+    payment = models.ForeignKey(Payment, on_delete=models.SET_NULL, null=True, blank=True, related_name="ledger_entries")
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default=PAYMENT)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    transaction_id = models.CharField(max_length=100, blank=True, null=True)
+    description = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["entry_id"]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Fee ledger entries are immutable; post a reversal or adjustment instead")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Fee ledger entries are immutable; post a reversal or adjustment instead")
+
+    def __str__(self):
+        return f"{self.kind} of ${self.amount} on fee {self.fee_id}"
+
+
 # ---------- Scholarship ----------
 class Scholarship(models.Model):
     scholarship_id = models.AutoField(primary_key=True)
@@ -360,3 +396,51 @@ class StudentAcademicHistory(models.Model):
 
     def __str__(self):
         return f"{self.student.name} - {self.semester.name} - GPA: {self.gpa}, CGPA: {self.cgpa}"
+
+
+# ---------- Student Performance Counters ----------
+class StudentPerformanceCounter(models.Model):
+    """
+    Running totals behind Student.attendance_percentage and Student.gpa.
+    Kept up to date with deltas from the Attendance/Result signals so a single
+    save never has to rescan the student's whole history.
+    """
+    student = models.OneToOneField("students.Student", on_delete=models.CASCADE, primary_key=True, related_name="performance_counter")
+    attendance_total = models.PositiveIntegerField(default=0)
+    attendance_present = models.PositiveIntegerField(default=0)
+    result_count = models.PositiveIntegerField(default=0)
+    grade_points_total = models.FloatField(default=0)
+
+    def __str__(self):
+        return f"{self.student_id} - {self.attendance_present}/{self.attendance_total} present, {self.result_count} results"
+
+
+# ---------- Fee Collection Summary ----------
+class FeeCollectionSummary(models.Model):
+    """
+    Fee analytics cube: the net change on ``day`` to the fees of a department
+    semester that are in ``status`` (how many, their amount, paid amount and
+    balance). Summing a key's rows up to a date gives its state on that
+    date. Kept up to date with deltas from every fee write; see
+    academics.services.fee_summary.
+    """
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, related_name="fee_summaries")
+    semester = models.ForeignKey(Semester, on_delete=models.CASCADE, related_name="fee_summaries")
+    status = models.CharField(max_length=10, choices=Fee.STATUS_CHOICES)
+    day = models.DateField()
+    fee_count = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    paid_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    balance = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ["day"]
+        constraints = [
+            models.UniqueConstraint(fields=["department", "semester", "status", "day"], name="unique_fee_summary_bucket"),
+        ]
+        indexes = [
+            models.Index(fields=["day"], name="fee_summary_day_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.department_id}/{self.semester_id} {self.status} on {self.day}: {self.fee_count:+d} fees"
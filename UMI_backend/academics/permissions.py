@@ -23,6 +23,27 @@ class IsAdminRoleOrReadOnly(BasePermission):
             getattr(request.user, 'role', None) in ['admin', 'principal', 'director']
         )
 
+class IsAdminRole(BasePermission):
+    """
+    Only admin users, reads included (finance figures, payment exports).
+    """
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated and (
+            request.user.is_staff or
+            getattr(request.user, 'role', None) in ['admin', 'principal', 'director']
+        ))
+
+class IsAdminRoleOrFeeStudent(IsAdminRole):
+    """
+    Admin users, or the student the fee belongs to; the object is a fee
+    receipt row (academics.services.receipts) with its student's user id.
+    """
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated)
+
+    def has_object_permission(self, request, view, obj):
+        return super().has_permission(request, view) or obj['student_user_id'] == request.user.pk
+
 class IsAdminOrInstructorForResultsAttendance(BasePermission):
     """
     Custom permission to allow only admin or instructor users to modify results and attendance.
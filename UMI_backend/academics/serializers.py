@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Attendance, Result, Fee, FeeStructure, Scholarship, Department, Semester, Course, Payment
+from .services.academic_standing import grade_to_points
 
 class DepartmentSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField(source='department_id', read_only=True)
@@ -179,14 +180,7 @@ class ResultSerializer(serializers.ModelSerializer):
 
     def get_gpa(self, obj):
         """Convert grade to GPA points"""
-        grade_map = {
-            'A+': 4.0, 'A': 4.0, 'A-': 3.7,
-            'B+': 3.3, 'B': 3.0, 'B-': 2.7,
-            'C+': 2.3, 'C': 2.0, 'C-': 1.7,
-            'D+': 1.3, 'D': 1.0,
-            'F': 0.0
-        }
-        return grade_map.get(obj.grade.upper(), 0.0)
+        return grade_to_points(obj.grade)
 
     def get_marks(self, obj):
         return f"{obj.obtained_marks}/{obj.total_marks}"
@@ -220,7 +214,7 @@ class PaymentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Payment
-        fields = "__all__"
+        exclude = ["department", "semester"]  # copies of the fee's
 
 
 class FeeSerializer(serializers.ModelSerializer):
@@ -0,0 +1,185 @@
+# academics/services/academic_standing.py
+from collections import defaultdict
+
+from django.db.models import Case, F, FloatField, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from academics.models import Fee, Result, Semester
+
+GRADE_POINTS = {
+    'A+': 4.0, 'A': 4.0, 'A-': 3.7,
+    'B+': 3.3, 'B': 3.0, 'B-': 2.7,
+    'C+': 2.3, 'C': 2.0, 'C-': 1.7,
+    'D+': 1.3, 'D': 1.0,
+    'F': 0.0
+}
+
+# Used when a result has no course to take credits from
+DEFAULT_CREDITS = 3
+
+# Final results failed in a row before a student is dropped
+CONSECUTIVE_FAILURE_LIMIT = 3
+
+
+def grade_to_points(grade):
+    """Convert letter grade to grade points"""
+    return GRADE_POINTS.get((grade or '').upper(), 0.0)
+
+
+def grade_points_expression():
+    """SQL CASE mapping Result.grade to grade points."""
+    return Case(
+        *[When(grade=grade, then=Value(points)) for grade, points in GRADE_POINTS.items()],
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def _summary(total_credits, grade_points):
+    total_credits = total_credits or 0
+    grade_points = round(grade_points or 0, 2)
+    cgpa = grade_points / total_credits if total_credits > 0 else 0.0
+    return {
+        'cgpa': round(cgpa, 2),
+        'total_credits': total_credits,
+        'grade_points': grade_points
+    }
+
+
+def weighted_gpa(results, *group_by):
+    """
+    Credit-weighted GPA over a Result queryset in one grouped query.
+    Returns {group key: {'cgpa', 'total_credits', 'grade_points'}}, where the
+    key is the value of the single ``group_by`` field, or a tuple for several.
+    """
+    group_by = group_by or ('student_id',)
+    rows = (
+        results.annotate(
+            points=grade_points_expression(),
+            credit_hours=Coalesce(F('course__credits'), Value(DEFAULT_CREDITS)),
+        )
+        .values(*group_by)
+        .annotate(
+            total_credits=Sum('credit_hours'),
+            grade_points=Sum(F('points') * F('credit_hours'), output_field=FloatField()),
+        )
+    )
+    standings = {}
+    for row in rows:
+        key = row[group_by[0]] if len(group_by) == 1 else tuple(row[field] for field in group_by)
+        standings[key] = _summary(row['total_credits'], row['grade_points'])
+    return standings
+
+
+def cgpa_for_students(students):
+    """CGPA over every result of each student in the queryset."""
+    standings = weighted_gpa(Result.objects.filter(student__in=students.values('pk')))
+    return {pk: standings.get(pk, _summary(0, 0)) for pk in students.values_list('pk', flat=True)}
+
+
+def semester_gpa_for_students(students, semester):
+    """GPA over each student's results for the courses of ``semester``."""
+    standings = weighted_gpa(
+        Result.objects.filter(student__in=students.values('pk'), course__semester=semester)
+    )
+    return {pk: standings.get(pk, _summary(0, 0)) for pk in students.values_list('pk', flat=True)}
+
+
+def has_consecutive_failures(grades, limit=CONSECUTIVE_FAILURE_LIMIT):
+    """True if ``grades`` (newest first) contain ``limit`` F grades in a row."""
+    failed_count = 0
+    for grade in grades:
+        if (grade or '').upper() == 'F':
+            failed_count += 1
+            if failed_count >= limit:
+                return True
+        else:
+            failed_count = 0  # Reset on pass
+    return False
+
+
+def promotion_status_for_students(students, check_fees=True):
+    """
+    Promotion decision for every student in the queryset with a fixed number
+    of queries: final grades, outstanding current-semester fees and the
+    department semesters are each fetched once.
+    """
+    students = list(students.select_related('semester'))
+    student_ids = [student.pk for student in students]
+
+    final_grades = defaultdict(list)
+    finals = (
+        Result.objects.filter(student_id__in=student_ids, exam_type__icontains='final')
+        .order_by('student_id', '-exam_date')
+        .values_list('student_id', 'grade')
+    )
+    for student_id, grade in finals:
+        final_grades[student_id].append(grade)
+
+    outstanding = {}
+    if check_fees:
+        fees = (
+            Fee.objects.filter(
+                student_id__in=student_ids,
+                semester_id=F('student__semester_id'),
+                status__in=[Fee.UNPAID, Fee.PARTIAL]
+            )
+            .values_list('student_id', 'balance')
+        )
+        for student_id, balance in fees:
+            outstanding.setdefault(student_id, balance)
+
+    semesters = {
+        (department_id, name): semester_id
+        for department_id, name, semester_id in Semester.objects.filter(
+            department_id__in={student.department_id for student in students}
+        ).values_list('department_id', 'name', 'semester_id')
+    }
+
+    statuses = {}
+    for student in students:
+        grades = final_grades.get(student.pk)
+        if not grades:
+            statuses[student.pk] = {'status': 'pending', 'message': 'No final results available'}
+        elif has_consecutive_failures(grades):
+            statuses[student.pk] = {
+                'status': 'dropped',
+                'message': f'Student dropped due to {CONSECUTIVE_FAILURE_LIMIT} consecutive failures',
+                'action': 'drop_student'
+            }
+        elif student.pk in outstanding:
+            statuses[student.pk] = {
+                'status': 'blocked',
+                'message': f'Cannot progress - outstanding fee payment of ${outstanding[student.pk]} required',
+                'action': 'fee_payment_required'
+            }
+        else:
+            statuses[student.pk] = _next_semester_status(student, semesters)
+    return statuses
+
+
+def _next_semester_status(student, semesters):
+    if student.semester:
+        try:
+            next_name = f"Semester {int(student.semester.name.split()[-1]) + 1}"
+        except (ValueError, IndexError):
+            next_name = None
+        next_semester_id = semesters.get((student.department_id, next_name))
+        if next_semester_id:
+            return {
+                'status': 'promote',
+                'message': f'Promote to {next_name}',
+                'next_semester_id': next_semester_id,
+                'action': 'promote_student'
+            }
+    return {'status': 'current', 'message': 'Student remains in current semester'}
+
+
+def academic_standing(students, check_fees=True):
+    """CGPA and promotion status for each student, e.g. for ranking screens."""
+    cgpa = cgpa_for_students(students)
+    promotion = promotion_status_for_students(students, check_fees=check_fees)
+    return {
+        pk: {'cgpa': cgpa[pk], 'promotion_status': promotion[pk]}
+        for pk in cgpa
+    }
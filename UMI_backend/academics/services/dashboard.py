@@ -0,0 +1,122 @@
+# academics/services/dashboard.py
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count, Prefetch, Q
+from django.utils import timezone
+
+from academics.models import Attendance, Result
+from students.models import Student
+
+DASHBOARD_CACHE_TIMEOUT = 15 * 60
+
+
+def dashboard_cache_key(student_id):
+    return f"student-dashboard:{student_id}"
+
+
+def invalidate_student_dashboards(student_ids):
+    cache.delete_many([dashboard_cache_key(student_id) for student_id in student_ids])
+
+
+def invalidate_student_dashboards_on_commit(student_ids):
+    # Only once the write commits: a read inside the transaction would cache the old state again
+    student_ids = list(student_ids)
+    transaction.on_commit(lambda: invalidate_student_dashboards(student_ids))
+
+
+def build_student_dashboard(student_id):
+    """
+    Dashboard payload for one student: the student row (with department,
+    semester and attendance counts) in one query, plus one query each for
+    results (joined with their course) and fees.
+    """
+    student = (
+        Student.objects.filter(student_id=student_id)
+        .select_related('department', 'semester')
+        .annotate(
+            total_classes=Count('attendances'),
+            present_classes=Count('attendances', filter=Q(attendances__status=Attendance.PRESENT)),
+        )
+        .prefetch_related(
+            Prefetch('results', queryset=Result.objects.select_related('course')),
+            'fees',
+        )
+        .first()
+    )
+    if not student:
+        return None
+
+    student_info = {
+        "student_id": student.student_id,
+        "name": student.name,
+        "email": student.email,
+        "phone": student.phone,
+        "department": student.department.name if student.department else None,
+        "semester": student.semester.name if student.semester else None,
+        "cgpa": student.cgpa,
+        "gpa": student.gpa,
+        "attendance_percentage": student.attendance_percentage,
+    }
+
+    total_classes = student.total_classes
+    present_classes = student.present_classes
+    attendance_summary = {
+        "total_classes": total_classes,
+        "present_classes": present_classes,
+        "percentage": round((present_classes / total_classes) * 100, 2) if total_classes > 0 else 0
+    }
+
+    result_data = [
+        {
+            "course": res.course.name if res.course else None,
+            "grade": res.grade,
+            "marks": res.obtained_marks,
+            "total_marks": res.total_marks,
+            "percentage": res.percentage,
+        }
+        for res in student.results.all()
+    ]
+
+    fee_data = [
+        {
+            "amount": f.amount,
+            "paid_amount": f.paid_amount,
+            "status": f.status,
+            "balance": f.balance,
+            "due_date": f.due_date,
+        }
+        for f in student.fees.all()
+    ]
+
+    return {
+        "student_info": student_info,
+        "attendance_summary": attendance_summary,
+        "results": result_data,
+        "fees": fee_data,
+    }
+
+
+def get_student_dashboard(student_id):
+    """
+    Cached dashboard entry: {'data', 'etag', 'last_modified'}, or None if the
+    student doesn't exist. Entries are dropped by the academics signals
+    whenever the student's attendance, results, fees or payments change.
+    """
+    key = dashboard_cache_key(student_id)
+    entry = cache.get(key)
+    if entry is None:
+        data = build_student_dashboard(student_id)
+        if data is None:
+            return None
+        payload = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder).encode()
+        entry = {
+            'data': data,
+            'etag': hashlib.md5(payload).hexdigest(),
+            'last_modified': timezone.now(),
+        }
+        cache.set(key, entry, DASHBOARD_CACHE_TIMEOUT)
+    return entry
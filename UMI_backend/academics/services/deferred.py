@@ -0,0 +1,81 @@
+# academics/services/deferred.py
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+
+_state = threading.local()
+
+
+def _pending():
+    if not hasattr(_state, "depth"):
+        _state.depth = 0
+        _reset()
+    return _state
+
+
+def _reset():
+    _state.students = set()
+    _state.final_results = set()
+
+
+def is_deferred():
+    return _pending().depth > 0
+
+
+def defer_student(student_id):
+    """Queue a metrics rebuild for the student. Returns False when not deferring."""
+    state = _pending()
+    if not state.depth:
+        return False
+    state.students.add(student_id)
+    return True
+
+
+def defer_final_results(student_id, semester_id):
+    """Queue the final-result check for a student/semester. Returns False when not deferring."""
+    state = _pending()
+    if not state.depth:
+        return False
+    state.final_results.add((student_id, semester_id))
+    return True
+
+
+@contextmanager
+def deferred_recompute():
+    """
+    Collect the students touched by Attendance and Result signals and
+    recompute each of them once when the outermost block exits
+    (after commit, if a transaction is open) instead of once per row.
+
+        with transaction.atomic(), deferred_recompute():
+            for row in rows:
+                Attendance.objects.update_or_create(...)
+    """
+    state = _pending()
+    state.depth += 1
+    try:
+        yield
+    finally:
+        state.depth -= 1
+        if not state.depth:
+            students, final_results = state.students, state.final_results
+            _reset()
+            if students or final_results:
+                transaction.on_commit(lambda: flush(students, final_results))
+
+
+def flush(students, final_results):
+    from academics.signals_updated import process_final_results
+    from academics.services.student_metrics import rebuild_students
+    from students.models import Student
+
+    if students:
+        rebuild_students(Student.objects.filter(pk__in=students))
+    if final_results:
+        semesters_by_student = {}
+        for student_id, semester_id in final_results:
+            semesters_by_student.setdefault(student_id, set()).add(semester_id)
+        for student in Student.objects.filter(pk__in=semesters_by_student).select_related('semester'):
+            if student.semester_id in semesters_by_student[student.pk]:
+                process_final_results(student, student.semester)
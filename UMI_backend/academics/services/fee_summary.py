@@ -0,0 +1,314 @@
+# academics/services/fee_summary.py
+"""
+Fee collection cube (FeeCollectionSummary): for every department
+semester, fee status and day, the net change that day in the number of
+fees in that status and in their amount, paid amount and balance.
+
+Every fee write moves the fee's contribution from the bucket of its old
+row to the bucket of its new one (record_changes), so a payment costs one
+or two single-row UPDATEs, and finance dashboards sum a handful of
+buckets instead of scanning fees and payments: the state on any date is
+the sum of a key's rows up to that date.
+
+Writers: the Fee signals (save/delete), the ledger (payments, reversals,
+rebuilds), promotion (write-offs and new fees) and bulk admissions.
+rebuild_summary() replays the ledger when the cube needs rebuilding.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DateField, F, Sum
+from django.db.models.functions import Trunc, TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+from academics.models import Fee, FeeCollectionSummary, FeeLedgerEntry
+
+SUMMARY_FIELDS = ('fee_count', 'amount', 'paid_amount', 'balance')
+FEE_FIELDS = ('fee_id', 'department_id', 'semester_id', 'status', 'amount', 'paid_amount', 'balance')
+REBUILD_CHUNK_SIZE = 2000
+SUMMARY_BATCH_SIZE = 500
+
+ANALYTICS_DEFAULT_DAYS = 30
+ANALYTICS_INTERVALS = ('day', 'week', 'month')
+
+
+MONEY_FIELDS = ('amount', 'paid_amount', 'balance')
+
+
+def fee_row(fee):
+    """The fields of a Fee instance the cube is built from (amounts may still be floats before a save)"""
+    row = {name: getattr(fee, name) for name in FEE_FIELDS}
+    for name in MONEY_FIELDS:
+        row[name] = Decimal(str(row[name] or 0))
+    return row
+
+
+def snapshot(fees):
+    """{fee_id: row} for a Fee queryset, row-locked when inside a transaction"""
+    return {row['fee_id']: row for row in fees.select_for_update().values(*FEE_FIELDS)}
+
+
+def contribution(row):
+    """(bucket key, deltas) one fee row adds to the cube; None for fees outside a department semester"""
+    if row is None or not row['department_id'] or not row['semester_id']:
+        return None
+    return (row['department_id'], row['semester_id'], row['status']), {
+        'fee_count': 1, 'amount': row['amount'], 'paid_amount': row['paid_amount'], 'balance': row['balance'],
+    }
+
+
+def _empty_bucket():
+    return dict.fromkeys(SUMMARY_FIELDS, 0)
+
+
+def collect(changes, day, buckets):
+    """Add the deltas of (before, after) fee rows to ``buckets``, keyed (department, semester, status, day)"""
+    for before, after in changes:
+        for row, sign in ((before, -1), (after, 1)):
+            found = contribution(row)
+            if found:
+                key, deltas = found
+                bucket = buckets[(*key, day)]
+                for name, value in deltas.items():
+                    bucket[name] += sign * value
+    return buckets
+
+
+def record_changes(changes, day=None):
+    """
+    Move fees from the bucket of their ``before`` row to that of their
+    ``after`` row ((before, after) pairs; None before an insert or after a
+    delete), on ``day`` (today by default). One UPDATE per bucket that
+    changed, plus an INSERT for a bucket's first change of the day.
+    """
+    buckets = collect(changes, day or timezone.localdate(), defaultdict(_empty_bucket))
+    for (department_id, semester_id, status, day), deltas in buckets.items():
+        deltas = {name: value for name, value in deltas.items() if value}
+        if deltas:
+            _apply(department_id, semester_id, status, day, deltas)
+
+
+def _apply(department_id, semester_id, status, day, deltas):
+    key = {'department_id': department_id, 'semester_id': semester_id, 'status': status, 'day': day}
+    bucket = FeeCollectionSummary.objects.filter(**key)
+    increments = {name: F(name) + value for name, value in deltas.items()}
+    if bucket.update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            FeeCollectionSummary.objects.create(**key, **deltas)
+    except IntegrityError:
+        # A concurrent writer opened the bucket first
+        bucket.update(**increments)
+
+
+def rebuild_summary(department_id=None, chunk_size=REBUILD_CHUNK_SIZE):
+    """
+    Rebuild the cube of one department (all by default) by replaying the
+    fee ledger: a fee opens unpaid on the day of its first ledger entry and
+    moves on the day of every entry; whatever the ledger doesn't explain
+    (fees without entries, changed amounts) is booked today. Two queries
+    per ``chunk_size`` fees, then the department's buckets are replaced.
+    Returns the number of buckets written.
+    """
+    from academics.services.ledger import moved
+
+    fees = Fee.objects.filter(department__isnull=False, semester__isnull=False)
+    summaries = FeeCollectionSummary.objects.all()
+    if department_id:
+        fees = fees.filter(department_id=department_id)
+        summaries = summaries.filter(department_id=department_id)
+    fees = fees.order_by('fee_id')
+
+    today = timezone.localdate()
+    buckets = defaultdict(_empty_bucket)
+    last_id = 0
+    while chunk := list(fees.filter(fee_id__gt=last_id).values(*FEE_FIELDS)[:chunk_size]):
+        last_id = chunk[-1]['fee_id']
+        entries = defaultdict(list)
+        for fee_id, day, amount in (
+            FeeLedgerEntry.objects.filter(fee_id__in=[fee['fee_id'] for fee in chunk])
+            .annotate(day=TruncDate('created_at')).order_by('entry_id').values_list('fee_id', 'day', 'amount')
+        ):
+            entries[fee_id].append((day, amount))
+
+        for fee in chunk:
+            state = None
+            for day, amount in entries.get(fee['fee_id'], ()):
+                if state is None:
+                    state = {**fee, 'status': Fee.UNPAID, 'paid_amount': Decimal('0.00'), 'balance': fee['amount']}
+                    collect([(None, state)], day, buckets)
+                after = moved(state, amount)
+                collect([(state, after)], day, buckets)
+                state = after
+            if state != fee:
+                collect([(state, fee)], today, buckets)
+
+    rows = [
+        FeeCollectionSummary(department_id=bucket[0], semester_id=bucket[1], status=bucket[2], day=bucket[3], **deltas)
+        for bucket, deltas in buckets.items()
+        if any(deltas.values())
+    ]
+    with transaction.atomic():
+        summaries.delete()
+        FeeCollectionSummary.objects.bulk_create(rows, batch_size=SUMMARY_BATCH_SIZE)
+    return len(rows)
+
+
+def check_summary(department_id=None):
+    """
+    Compare the cube's current totals with the fees themselves (one grouped
+    query each); returns {(department, semester, status): (cube, fees)} for
+    every bucket key that disagrees.
+    """
+    fees = Fee.objects.filter(department__isnull=False, semester__isnull=False)
+    summaries = FeeCollectionSummary.objects.all()
+    if department_id:
+        fees = fees.filter(department_id=department_id)
+        summaries = summaries.filter(department_id=department_id)
+    key = ('department_id', 'semester_id', 'status')
+    sums = {name: Sum(name) for name in SUMMARY_FIELDS if name != 'fee_count'}
+    expected = {
+        tuple(row[name] for name in key): {name: row[name] for name in SUMMARY_FIELDS}
+        for row in fees.values(*key).annotate(fee_count=Count('fee_id'), **sums).order_by()
+    }
+    actual = {
+        tuple(row[name] for name in key): {name: row[name] for name in SUMMARY_FIELDS}
+        for row in summaries.values(*key).annotate(fee_count=Sum('fee_count'), **sums).order_by()
+    }
+    empty = _empty_bucket()
+    return {
+        bucket: (actual.get(bucket, empty), expected.get(bucket, empty))
+        for bucket in expected.keys() | actual.keys()
+        if actual.get(bucket, empty) != expected.get(bucket, empty)
+    }
+
+
+# ---------- Analytics ----------
+
+def parse_day(params, name, default):
+    value = params.get(name)
+    if not value:
+        return default
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: 'Expected a date as YYYY-MM-DD'})
+    return parsed
+
+
+def collection_rate(paid_amount, amount):
+    return round(float(paid_amount) / float(amount) * 100, 2) if amount else 0.0
+
+
+def _totals(status_rows):
+    """Totals and per-status figures from rows of cumulative sums by status"""
+    totals = _empty_bucket()
+    by_status = {}
+    for row in status_rows:
+        figures = {name: row[name] or 0 for name in SUMMARY_FIELDS}
+        by_status[row['status']] = figures
+        for name in SUMMARY_FIELDS:
+            totals[name] += figures[name]
+    totals['collection_rate'] = collection_rate(totals['paid_amount'], totals['amount'])
+    return totals, by_status
+
+
+def _periods(start, end, interval):
+    if interval == 'month':
+        start = start.replace(day=1)
+    elif interval == 'week':
+        start -= timedelta(days=start.weekday())
+    period = start
+    while period <= end:
+        yield period
+        if interval == 'month':
+            period = (period.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            period += timedelta(days=7 if interval == 'week' else 1)
+
+
+def collection_report(department_id=None, semester_id=None, date_from=None, date_to=None, interval='day'):
+    """
+    Finance dashboard figures from the cube, in three grouped queries:
+    totals and per-status figures as of ``date_to``; a breakdown one level
+    down (departments, then a department's semesters); and a time series
+    from ``date_from`` to ``date_to`` by ``interval`` with what was billed
+    and collected in each period and the standing totals at its end.
+    """
+    date_to = date_to or timezone.localdate()
+    date_from = date_from or date_to - timedelta(days=ANALYTICS_DEFAULT_DAYS - 1)
+    scope = FeeCollectionSummary.objects.order_by()
+    if department_id:
+        scope = scope.filter(department_id=department_id)
+    if semester_id:
+        scope = scope.filter(semester_id=semester_id)
+    sums = {name: Sum(name) for name in SUMMARY_FIELDS}
+
+    as_of = scope.filter(day__lte=date_to)
+    totals, by_status = _totals(as_of.values('status').annotate(**sums))
+
+    breakdown = []
+    if not semester_id:
+        level = ('semester_id', 'semester__name') if department_id else ('department_id', 'department__name')
+        groups = {}
+        for row in as_of.values(*level, 'status').annotate(**sums).order_by(level[0]):
+            groups.setdefault((row[level[0]], row[level[1]]), []).append(row)
+        for (group_id, name), rows in groups.items():
+            group_totals, group_by_status = _totals(rows)
+            breakdown.append({level[0]: group_id, 'name': name, **group_totals,
+                              'status_counts': {status: figures['fee_count'] for status, figures in group_by_status.items()}})
+
+    changes = defaultdict(dict)
+    for row in (
+        scope.filter(day__range=(date_from, date_to))
+        .annotate(period=Trunc('day', interval, output_field=DateField()))
+        .values('period', 'status').annotate(**sums)
+    ):
+        changes[row['period']][row['status']] = {name: row[name] or 0 for name in SUMMARY_FIELDS}
+
+    # Standing figures before the range: what stands at date_to less what changed within it
+    standing = {status: dict(figures) for status, figures in by_status.items()}
+    for period_changes in changes.values():
+        for status, figures in period_changes.items():
+            bucket = standing.setdefault(status, _empty_bucket())
+            for name in SUMMARY_FIELDS:
+                bucket[name] -= figures[name]
+
+    series = []
+    for period in _periods(date_from, date_to, interval):
+        period_changes = changes.get(period, {})
+        for status, figures in period_changes.items():
+            for name in SUMMARY_FIELDS:
+                standing[status][name] += figures[name]
+        amount = sum(figures['amount'] for figures in standing.values())
+        paid_amount = sum(figures['paid_amount'] for figures in standing.values())
+        series.append({
+            'period': period,
+            'billed': sum(figures['amount'] for figures in period_changes.values()),
+            'collected': sum(figures['paid_amount'] for figures in period_changes.values()),
+            'fee_count': sum(figures['fee_count'] for figures in standing.values()),
+            'amount': amount,
+            'paid_amount': paid_amount,
+            'balance': sum(figures['balance'] for figures in standing.values()),
+            'collection_rate': collection_rate(paid_amount, amount),
+            'status_counts': {status: figures['fee_count'] for status, figures in standing.items() if figures['fee_count']},
+        })
+
+    return {
+        'department_id': department_id,
+        'semester_id': semester_id,
+        'date_from': date_from,
+        'date_to': date_to,
+        'interval': interval,
+        'totals': totals,
+        'by_status': by_status,
+        'breakdown': breakdown,
+        'series': series,
+    }
@@ -0,0 +1,198 @@
+# academics/services/images.py
+"""
+Photo upload pipeline shared by student and instructor uploads.
+
+The request only checks the upload (by decoding its header, not by trusting
+the declared content type) and parks the raw bytes under a pending name.
+After the transaction commits, a worker pool decodes the image, applies
+and drops the EXIF orientation and metadata, and writes WebP renditions:
+a capped full-size image, a medium one and a thumbnail. Each file is named
+after the SHA-256 of its bytes, so a URL always serves the same content
+and can be cached forever, and identical photos are stored once.
+
+The model's ``image`` field points at the full rendition and
+``image_renditions`` holds {'thumbnail': name, 'medium': name}, or
+{'pending': name} while processing and {'error': message} if it failed.
+Pending files are shared by identical uploads, so they are never deleted
+here; academics.storage.collect_garbage removes them once no record points
+at them and the grace period has passed.
+"""
+import hashlib
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'GIF': 'gif', 'WEBP': 'webp'}
+
+MAX_UPLOAD_BYTES = 5 * 1024 * 1024
+
+# Decoded size limit, so a small file can't expand into gigabytes of pixels
+MAX_PIXELS = 40_000_000
+
+# Longest side of each rendition, in pixels
+RENDITIONS = {'full': 1600, 'medium': 480, 'thumbnail': 128}
+
+WEBP_QUALITY = 80
+
+_executor = None
+
+
+def validate_image(upload):
+    """Return the decoded format of ``upload`` or raise a ValidationError"""
+    if upload.size > MAX_UPLOAD_BYTES:
+        raise serializers.ValidationError('File size too large. Maximum size is 5MB')
+    try:
+        with Image.open(upload) as image:
+            image_format = image.format
+            width, height = image.size
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise serializers.ValidationError('Invalid image file. Only JPEG, PNG, GIF and WebP images are allowed')
+    finally:
+        upload.seek(0)
+    if image_format not in ALLOWED_FORMATS:
+        raise serializers.ValidationError('Invalid file type. Only JPEG, PNG, GIF and WebP images are allowed')
+    if width * height > MAX_PIXELS:
+        raise serializers.ValidationError('Image dimensions are too large')
+    return image_format
+
+
+def _hashed_name(directory, data, extension):
+    return f"{directory}/{hashlib.sha256(data).hexdigest()[:32]}.{extension}"
+
+
+def store_content_addressed(directory, data, extension):
+    """Save ``data`` under its content hash unless an identical file is already stored"""
+    name = _hashed_name(directory, data, extension)
+    if not default_storage.exists(name):
+        default_storage.save(name, ContentFile(data))
+    return name
+
+
+def accept_upload(instance, upload):
+    """
+    Validate ``upload`` for ``instance`` (a model with ``image`` and
+    ``image_renditions``), park it and schedule the renditions for after
+    the current transaction commits.
+    """
+    image_format = validate_image(upload)
+    directory = instance._meta.get_field('image').upload_to.rstrip('/')
+    pending = store_content_addressed(f"{directory}/pending", upload.read(), ALLOWED_FORMATS[image_format])
+
+    instance.image_renditions = {'pending': pending}
+    type(instance).objects.filter(pk=instance.pk).update(image_renditions=instance.image_renditions)
+    label, pk = instance._meta.label, instance.pk
+    _photo_changed(label, pk)
+    transaction.on_commit(lambda: schedule(process_image, label, pk, pending))
+    return pending
+
+
+def _photo_changed(label, pk):
+    # The photo is written with QuerySet.update(), which sends no post_save,
+    # so drop the cached payloads that show it once the write commits
+    if label == 'students.Student':
+        from students.services.profile import invalidate_student_profiles_on_commit
+        invalidate_student_profiles_on_commit([pk])
+
+
+def schedule(function, *args):
+    """Run ``function`` on the worker pool, or inline when IMAGE_PROCESSING_WORKERS is 0"""
+    global _executor
+    workers = getattr(settings, 'IMAGE_PROCESSING_WORKERS', 2)
+    if workers <= 0:
+        return function(*args)
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image-processing')
+    return _executor.submit(_in_worker, function, *args)
+
+
+def _in_worker(function, *args):
+    close_old_connections()
+    try:
+        return function(*args)
+    except Exception:
+        logger.exception('Image processing failed for %s', args)
+    finally:
+        close_old_connections()
+
+
+def render(data):
+    """{'full'|'medium'|'thumbnail': WebP bytes} for the image in ``data``, without metadata"""
+    with Image.open(io.BytesIO(data)) as source:
+        source.seek(0)  # first frame of animated images
+        image = ImageOps.exif_transpose(source)
+        image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+
+    renditions = {}
+    for name, size in RENDITIONS.items():
+        rendition = image.copy()
+        rendition.thumbnail((size, size), Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        # A fresh image carries no EXIF/XMP, and none is passed to save()
+        rendition.save(output, 'WEBP', quality=WEBP_QUALITY, method=4)
+        renditions[name] = output.getvalue()
+    return renditions
+
+
+def process_image(label, pk, pending):
+    model = apps.get_model(label)
+    directory = model._meta.get_field('image').upload_to.rstrip('/')
+    # A newer upload may have replaced this one while it waited in the queue
+    if not model.objects.filter(pk=pk, image_renditions__pending=pending).exists():
+        return None
+
+    try:
+        with default_storage.open(pending, 'rb') as pending_file:
+            renditions = render(pending_file.read())
+    except Exception as e:
+        logger.warning('Could not process image %s for %s %s: %s', pending, label, pk, e)
+        model.objects.filter(pk=pk, image_renditions__pending=pending).update(
+            image_renditions={'error': 'The image could not be processed'}
+        )
+        _photo_changed(label, pk)
+        return None
+
+    names = {name: store_content_addressed(directory, data, 'webp') for name, data in renditions.items()}
+    updated = model.objects.filter(pk=pk, image_renditions__pending=pending).update(
+        image=names['full'],
+        image_renditions={'thumbnail': names['thumbnail'], 'medium': names['medium']},
+    )
+    if updated:
+        _photo_changed(label, pk)
+    logger.debug('Processed image for %s %s', label, pk, extra={'renditions': names})
+    return names if updated else None
+
+
+def rendition_urls(instance, request=None):
+    """Serializer helper: {'status', 'thumbnail', 'medium'} with absolute URLs when ``request`` is given"""
+    renditions = instance.image_renditions or {}
+
+    def url(name):
+        if not name:
+            return None
+        location = default_storage.url(name)
+        return request.build_absolute_uri(location) if request is not None else location
+
+    if 'pending' in renditions:
+        status = 'processing'
+    elif 'error' in renditions:
+        status = 'failed'
+    elif renditions:
+        status = 'ready'
+    else:
+        status = 'ready' if instance.image else 'none'
+    fallback = instance.image.name if instance.image else None
+    return {
+        'status': status,
+        'thumbnail': url(renditions.get('thumbnail') or fallback),
+        'medium': url(renditions.get('medium') or fallback),
+    }
@@ -0,0 +1,250 @@
+# academics/services/ledger.py
+"""
+Fee ledger: every change to a fee's paid amount is an immutable
+FeeLedgerEntry, and the fee's paid_amount/balance/status are moved by the
+same amount with one conditional UPDATE on F() expressions, so recording a
+payment is one insert plus one update no matter how many payments the fee
+already has, and concurrent payments can't overwrite each other.
+
+Every move is also booked in the fee collection cube
+(academics.services.fee_summary) from the fee's row before the move.
+
+reconcile() checks in bulk that stored fees, their ledger and their
+payments still agree; repair() brings the ledger and the fee back in line
+with the payments (keeping write-offs).
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, OuterRef, Subquery, Sum, Value, When
+
+from academics.models import Fee, FeeLedgerEntry, Payment
+from academics.services import fee_summary
+from academics.services.dashboard import invalidate_student_dashboards_on_commit
+
+RECONCILE_CHUNK_SIZE = 2000
+
+LEDGER_BATCH_SIZE = 1000
+
+
+def status_for(amount, paid):
+    if paid >= amount:
+        return Fee.PAID
+    if paid > 0:
+        return Fee.PARTIAL
+    return Fee.UNPAID
+
+
+def apply_total_paid(fee, total_paid):
+    """Set paid_amount, balance and status on ``fee`` for the given payment total."""
+    fee.paid_amount = total_paid
+    fee.balance = fee.amount - total_paid
+    fee.status = status_for(fee.amount, total_paid)
+
+
+def moved(row, amount):
+    """A fee_summary row after moving its paid_amount by ``amount``, as _move() does in SQL"""
+    paid = row['paid_amount'] + amount
+    return {**row, 'paid_amount': paid, 'balance': row['amount'] - paid, 'status': status_for(row['amount'], paid)}
+
+
+def _move(fees, amount, on=None):
+    """
+    Add ``amount`` (a value, or an expression over the fee row) to the
+    paid_amount of ``fees`` in one UPDATE; returns the number of fees updated.
+    """
+    paid = F('paid_amount') + amount
+    return fees.update(
+        paid_amount=paid,
+        balance=F('amount') - paid,
+        status=Case(
+            When(amount__lte=paid, then=Value(Fee.PAID)),
+            When(paid_amount__gt=-amount, then=Value(Fee.PARTIAL)),
+            default=Value(Fee.UNPAID),
+        ),
+        # paid_on is set the first time the fee is settled and then kept, as before
+        paid_on=Case(
+            When(paid_on__isnull=True, amount__lte=paid, then=Value(on)),
+            default=F('paid_on'),
+        ) if on else F('paid_on'),
+    )
+
+
+def post(fee_id, amount, kind=FeeLedgerEntry.PAYMENT, payment=None, transaction_id=None, description='', on=None):
+    """Post one ledger entry and move the fee by ``amount``; returns the entry, or None if the fee is gone"""
+    with transaction.atomic():
+        before = fee_summary.snapshot(Fee.objects.filter(pk=fee_id)).get(fee_id)
+        if before is None:
+            return None
+        _move(Fee.objects.filter(pk=fee_id), amount, on)
+        fee_summary.record_changes([(before, moved(before, amount))])
+        return FeeLedgerEntry.objects.create(
+            fee_id=fee_id, payment=payment, kind=kind, amount=amount,
+            transaction_id=transaction_id, description=description,
+        )
+
+
+def record_payment(payment):
+    return post(payment.fee_id, payment.amount, payment=payment,
+                transaction_id=payment.transaction_id, on=payment.payment_date)
+
+
+def record_payment_change(payment, previous_fee_id, previous_amount):
+    """Entries for an edited payment: the difference, or a move between fees"""
+    if previous_fee_id == payment.fee_id:
+        if previous_amount != payment.amount:
+            post(payment.fee_id, payment.amount - previous_amount, FeeLedgerEntry.ADJUSTMENT, payment=payment,
+                 transaction_id=payment.transaction_id, description='Payment amount changed')
+        return
+    post(previous_fee_id, -previous_amount, FeeLedgerEntry.REVERSAL, payment=payment,
+         transaction_id=payment.transaction_id, description=f'Payment moved to fee {payment.fee_id}')
+    record_payment(payment)
+
+
+def record_payment_deleted(fee_id, payment_id, amount, transaction_id=None):
+    return post(fee_id, -amount, FeeLedgerEntry.REVERSAL, transaction_id=transaction_id,
+                description=f'Payment {payment_id} deleted')
+
+
+def record_existing_payments(payments, batch_size=LEDGER_BATCH_SIZE):
+    """
+    Ledger entries for payments whose fees were already updated by the
+    caller (bulk imports, seeding): bulk inserts only, the fees are not moved.
+    """
+    return FeeLedgerEntry.objects.bulk_create([
+        FeeLedgerEntry(fee_id=payment.fee_id, payment_id=payment.pk, kind=FeeLedgerEntry.PAYMENT,
+                       amount=payment.amount, transaction_id=payment.transaction_id)
+        for payment in payments
+    ], batch_size=batch_size)
+
+
+def lock_fees(fee_ids):
+    """Row-lock fees (inside a transaction) before posting entries for them in bulk; returns their rows"""
+    return fee_summary.snapshot(Fee.objects.filter(fee_id__in=fee_ids))
+
+
+def move_by_entries(entries, locked, on=None):
+    """
+    Move every fee of freshly inserted ledger ``entries`` (see
+    record_existing_payments) by the sum of its entries, with a single
+    UPDATE whose amount is a grouped subquery over the entries' id range.
+    The fees must have been locked with lock_fees() before the entries were
+    inserted, so no other posting for them can fall inside that range;
+    ``locked`` is what lock_fees() returned.
+    """
+    if not entries:
+        return 0
+    totals = {}
+    for entry in entries:
+        totals[entry.fee_id] = totals.get(entry.fee_id, Decimal('0.00')) + entry.amount
+    fee_summary.record_changes([(locked[fee_id], moved(locked[fee_id], total)) for fee_id, total in totals.items()])
+    entry_ids = [entry.pk for entry in entries]
+    amount = Subquery(
+        # A range rather than IN (...): SQLite rebuilds an IN list for every correlated row
+        FeeLedgerEntry.objects.filter(fee_id=OuterRef('fee_id'), entry_id__range=(min(entry_ids), max(entry_ids)))
+        .order_by().values('fee_id').annotate(total=Sum('amount')).values('total'),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+    return _move(Fee.objects.filter(fee_id__in={entry.fee_id for entry in entries}), amount, on)
+
+
+def record_write_offs(balances, description, batch_size=LEDGER_BATCH_SIZE):
+    """WRITE_OFF entries for {fee_id: cleared balance} of fees the caller already marked paid"""
+    return FeeLedgerEntry.objects.bulk_create([
+        FeeLedgerEntry(fee_id=fee_id, kind=FeeLedgerEntry.WRITE_OFF, amount=balance, description=description)
+        for fee_id, balance in balances.items() if balance
+    ], batch_size=batch_size)
+
+
+def rebuild_from_ledger(fee_ids):
+    """Set paid_amount, balance and status of several fees from their ledger: one grouped SUM and one bulk update"""
+    with transaction.atomic():
+        fees = list(Fee.objects.select_for_update().filter(fee_id__in=fee_ids))
+        totals = _sums(FeeLedgerEntry.objects.filter(fee_id__in=fee_ids))
+        changes = []
+        for fee in fees:
+            before = fee_summary.fee_row(fee)
+            apply_total_paid(fee, totals.get(fee.fee_id) or Decimal('0.00'))
+            changes.append((before, fee_summary.fee_row(fee)))
+        Fee.objects.bulk_update(fees, ['paid_amount', 'balance', 'status'], batch_size=500)
+        fee_summary.record_changes(changes)
+    invalidate_student_dashboards_on_commit({fee.student_id for fee in fees})
+    return fees
+
+
+def _sums(queryset):
+    return dict(queryset.values('fee_id').annotate(total=Sum('amount')).values_list('fee_id', 'total'))
+
+
+def reconcile(fees=None, chunk_size=RECONCILE_CHUNK_SIZE):
+    """
+    Yield a report for every fee of ``fees`` (all fees by default) whose
+    stored paid_amount, balance or status disagrees with its ledger, or
+    whose ledger (write-offs aside) disagrees with its payments. Three
+    queries per ``chunk_size`` fees: the fees, their ledger sums by kind
+    and their payment sums.
+    """
+    fees = (fees if fees is not None else Fee.objects.all()).order_by('fee_id')
+    last_id = 0
+    while True:
+        chunk = list(
+            fees.filter(fee_id__gt=last_id)
+            .values_list('fee_id', 'amount', 'paid_amount', 'balance', 'status')[:chunk_size]
+        )
+        if not chunk:
+            return
+        last_id = chunk[-1][0]
+        fee_ids = [row[0] for row in chunk]
+        ledger, written_off = {}, {}
+        for fee_id, kind, total in (
+            FeeLedgerEntry.objects.filter(fee_id__in=fee_ids)
+            .values('fee_id', 'kind').annotate(total=Sum('amount')).values_list('fee_id', 'kind', 'total')
+        ):
+            ledger[fee_id] = ledger.get(fee_id, Decimal('0.00')) + total
+            if kind == FeeLedgerEntry.WRITE_OFF:
+                written_off[fee_id] = total
+        payments = _sums(Payment.objects.filter(fee_id__in=fee_ids))
+        for fee_id, amount, paid_amount, balance, status in chunk:
+            ledger_total = ledger.get(fee_id) or Decimal('0.00')
+            payment_total = payments.get(fee_id) or Decimal('0.00')
+            written_off_total = written_off.get(fee_id) or Decimal('0.00')
+            problems = []
+            if ledger_total - written_off_total != payment_total:
+                problems.append('ledger')
+            if paid_amount != ledger_total:
+                problems.append('paid_amount')
+            if balance != amount - paid_amount:
+                problems.append('balance')
+            if status != status_for(amount, paid_amount):
+                problems.append('status')
+            if problems:
+                yield {
+                    'fee_id': fee_id,
+                    'problems': problems,
+                    'paid_amount': paid_amount,
+                    'ledger': ledger_total,
+                    'written_off': written_off_total,
+                    'payments': payment_total,
+                    'balance': balance,
+                    'status': status,
+                }
+
+
+def repair(reports):
+    """
+    Treat payments as the source of truth for reconcile() reports: post
+    ADJUSTMENT entries for the ledger differences (bulk insert), then
+    recompute the fees from their ledger. Returns the number of fees repaired.
+    """
+    reports = list(reports)
+    if not reports:
+        return 0
+    with transaction.atomic():
+        FeeLedgerEntry.objects.bulk_create([
+            FeeLedgerEntry(fee_id=report['fee_id'], kind=FeeLedgerEntry.ADJUSTMENT,
+                           amount=difference, description='Reconciliation')
+            for report in reports
+            if (difference := report['payments'] + report['written_off'] - report['ledger'])
+        ], batch_size=LEDGER_BATCH_SIZE)
+        rebuild_from_ledger([report['fee_id'] for report in reports])
+    return len(reports)
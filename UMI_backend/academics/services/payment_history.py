@@ -0,0 +1,126 @@
+# academics/services/payment_history.py
+"""
+Payment history of a department semester, newest first, read with keyset
+pagination on (payment_date, payment_id). Payments carry their fee's
+department and semester, so a page is one seek into the index on
+(department, semester, payment_date, payment_id) right after the last row
+of the previous page, reading only the rows it returns: page 500 costs the
+same as page 1, and payments recorded meanwhile never shift a page.
+
+export_rows() streams the same rows for CSV/NDJSON downloads without
+holding them in memory.
+"""
+import base64
+import binascii
+import csv
+import json
+from datetime import date
+
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils.encoders import JSONEncoder
+
+from academics.models import Payment
+
+HISTORY_PAGE_SIZE = 100
+HISTORY_MAX_PAGE_SIZE = 1000
+EXPORT_CHUNK_SIZE = 2000
+
+# Output key -> field path, in column order
+HISTORY_FIELDS = {
+    'payment_id': 'payment_id',
+    'student_name': 'fee__student__name',
+    'student_id': 'fee__student_id',
+    'semester': 'fee__semester__name',
+    'department': 'fee__department__name',
+    'fee_amount': 'fee__amount',
+    'payment_date': 'payment_date',
+    'amount_paid': 'amount',
+    'payment_method': 'payment_method',
+    'transaction_id': 'transaction_id',
+    'notes': 'notes',
+    'remaining_balance': 'fee__balance',
+    'fee_status': 'fee__status',
+}
+
+
+def parse_filters(params):
+    """date_from/date_to (inclusive, YYYY-MM-DD) from query params"""
+    filters = {}
+    for param, lookup in (('date_from', 'payment_date__gte'), ('date_to', 'payment_date__lte')):
+        value = params.get(param)
+        if not value:
+            continue
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({param: 'Expected a date as YYYY-MM-DD'})
+        filters[lookup] = parsed
+    return filters
+
+
+def history_queryset(department_id, semester_id, **filters):
+    return (
+        Payment.objects.filter(department_id=department_id, semester_id=semester_id, **filters)
+        .order_by('-payment_date', '-payment_id')
+        .values_list(*HISTORY_FIELDS.values())
+    )
+
+
+def encode_cursor(payment_date, payment_id):
+    return base64.urlsafe_b64encode(f'{payment_date.isoformat()}:{payment_id}'.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """(payment_date, payment_id) of the last row of the previous page"""
+    try:
+        day, payment_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(':')
+        return date.fromisoformat(day), int(payment_id)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValidationError({'cursor': 'Invalid cursor'})
+
+
+def page_size(value):
+    try:
+        size = int(value) if value else HISTORY_PAGE_SIZE
+    except ValueError:
+        raise ValidationError({'page_size': 'Expected a number'})
+    return max(1, min(size, HISTORY_MAX_PAGE_SIZE))
+
+
+def history_page(queryset, cursor=None, size=HISTORY_PAGE_SIZE):
+    """(rows, next_cursor) for one page; next_cursor is None on the last page"""
+    if cursor:
+        payment_date, payment_id = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(payment_date__lt=payment_date) | Q(payment_date=payment_date, payment_id__lt=payment_id)
+        )
+    # One row more than asked for tells whether there is a next page
+    rows = [dict(zip(HISTORY_FIELDS, row)) for row in queryset[:size + 1]]
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    return rows, encode_cursor(rows[-1]['payment_date'], rows[-1]['payment_id'])
+
+
+class _Echo:
+    """File-like object for csv.writer that hands back each line instead of buffering it"""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, export_format, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the rows of ``queryset`` as CSV lines (with a header) or NDJSON lines"""
+    rows = queryset.iterator(chunk_size=chunk_size)
+    if export_format == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(HISTORY_FIELDS)
+        for row in rows:
+            yield writer.writerow(row)
+    else:
+        for row in rows:
+            yield json.dumps(dict(zip(HISTORY_FIELDS, row)), cls=JSONEncoder) + '\n'
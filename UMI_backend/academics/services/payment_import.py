@@ -0,0 +1,155 @@
+# academics/services/payment_import.py
+from collections import defaultdict
+from decimal import Decimal
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers
+
+from academics.models import Fee, Payment
+from academics.services.dashboard import invalidate_student_dashboards_on_commit
+from academics.services.ledger import lock_fees, move_by_entries, record_existing_payments
+from students.services.admissions import clean_row
+
+PAYMENT_IMPORT_CHUNK_SIZE = 1000
+
+
+class PaymentRowSerializer(serializers.Serializer):
+    """One line of a bank statement; the fee is found by fee_id, or by student (and semester)"""
+    transaction_id = serializers.CharField(max_length=100)
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+    fee_id = serializers.IntegerField(required=False)
+    student_id = serializers.CharField(max_length=20, required=False)
+    semester_id = serializers.IntegerField(required=False)
+    payment_method = serializers.ChoiceField(choices=[choice for choice, _ in Payment.PAYMENT_METHOD_CHOICES],
+                                             required=False, default=Payment.ONLINE)
+    notes = serializers.CharField(required=False)
+
+    def validate(self, data):
+        if 'fee_id' not in data and 'student_id' not in data:
+            raise serializers.ValidationError("Either 'fee_id' or 'student_id' is required")
+        return data
+
+
+def _match_fee(data, fees_by_id, fees_by_student):
+    """
+    (fee, None) for a row, or (None, reason). Fee rows carry the paid
+    amount so far, rows matched earlier in the chunk included.
+    """
+    if 'fee_id' in data:
+        fee = fees_by_id.get(data['fee_id'])
+        if fee is None:
+            return None, f"Fee {data['fee_id']} does not exist"
+        if 'student_id' in data and fee['student_id'] != data['student_id']:
+            return None, f"Fee {data['fee_id']} does not belong to student {data['student_id']}"
+        return fee, None
+
+    candidates = fees_by_student.get(data['student_id'], [])
+    if not candidates:
+        return None, f"Student {data['student_id']} has no fees"
+    if 'semester_id' in data:
+        candidates = [fee for fee in candidates if fee['semester_id'] == data['semester_id']]
+        if not candidates:
+            return None, f"Student {data['student_id']} has no fee for semester {data['semester_id']}"
+    # The oldest fee that is still open, as the accounts office applies them
+    outstanding = [fee for fee in candidates if fee['paid_amount'] < fee['amount']]
+    if not outstanding:
+        return None, f"Student {data['student_id']} has no outstanding fee"
+    return min(outstanding, key=lambda fee: (fee['due_date'], fee['fee_id'])), None
+
+
+def import_payments(rows, chunk_size=PAYMENT_IMPORT_CHUNK_SIZE):
+    """
+    Record payments from an iterable of bank statement rows, ``chunk_size``
+    rows at a time. Each chunk costs a fixed number of queries: one lookup
+    of already-recorded transaction IDs, one lookup of the fees the rows
+    point at (by fee_id or student_id), and, in one transaction, a lock on
+    those fees, the Payment bulk insert, the ledger bulk insert, a single
+    grouped UPDATE that moves every affected fee and one UPDATE per fee
+    collection bucket touched.
+
+    Returns {'total_rows', 'created', 'amount', 'fees_updated', 'duplicates',
+    'unmatched', 'errors'}; duplicates, unmatched and errors list rows by
+    their 1-based number in the file.
+    """
+    report = {
+        'total_rows': 0, 'created': 0, 'amount': Decimal('0.00'), 'fees_updated': 0,
+        'duplicates': [], 'unmatched': [], 'errors': [],
+    }
+    seen = {}
+    # One serializer validates every row: binding fresh fields per row costs more than the inserts
+    row_serializer = PaymentRowSerializer()
+
+    numbered = enumerate(rows, start=1)
+    while chunk := list(islice(numbered, chunk_size)):
+        report['total_rows'] += len(chunk)
+        valid = []
+        for number, row in chunk:
+            try:
+                data = row_serializer.run_validation(clean_row(row))
+            except serializers.ValidationError as e:
+                report['errors'].append({'row': number, 'errors': e.detail})
+                continue
+            if data['transaction_id'] in seen:
+                report['duplicates'].append({'row': number, 'transaction_id': data['transaction_id'],
+                                             'duplicate_of_row': seen[data['transaction_id']]})
+                continue
+            seen[data['transaction_id']] = number
+            valid.append((number, data))
+
+        recorded = dict(
+            Payment.objects.filter(transaction_id__in=[data['transaction_id'] for _, data in valid])
+            .values_list('transaction_id', 'payment_id')
+        )
+        fee_ids = {data['fee_id'] for _, data in valid if 'fee_id' in data}
+        student_ids = {data['student_id'] for _, data in valid if 'fee_id' not in data}
+        fees_by_id, fees_by_student = {}, defaultdict(list)
+        if fee_ids or student_ids:
+            for fee in Fee.objects.filter(Q(fee_id__in=fee_ids) | Q(student_id__in=student_ids)).values(
+                'fee_id', 'student_id', 'department_id', 'semester_id', 'amount', 'paid_amount', 'due_date'
+            ):
+                fees_by_id[fee['fee_id']] = fee
+                fees_by_student[fee['student_id']].append(fee)
+
+        payments = []
+        for number, data in valid:
+            if data['transaction_id'] in recorded:
+                report['duplicates'].append({'row': number, 'transaction_id': data['transaction_id'],
+                                             'payment_id': recorded[data['transaction_id']]})
+                continue
+            fee, reason = _match_fee(data, fees_by_id, fees_by_student)
+            if fee is None:
+                report['unmatched'].append({'row': number, 'transaction_id': data['transaction_id'], 'reason': reason})
+                continue
+            # A later row of the same student goes to the next open fee once this one is settled
+            fee['paid_amount'] += data['amount']
+            payments.append((number, Payment(
+                fee_id=fee['fee_id'], department_id=fee['department_id'], semester_id=fee['semester_id'],
+                amount=data['amount'], payment_method=data['payment_method'],
+                transaction_id=data['transaction_id'], notes=data.get('notes'),
+            ), fee['student_id']))
+
+        if payments:
+            try:
+                _record_chunk(payments)
+            except IntegrityError as e:
+                # Another request recorded one of these transaction IDs meanwhile; nothing of the chunk was kept
+                report['errors'].extend({'row': number, 'errors': {'non_field_errors': [str(e)]}} for number, _, _ in payments)
+            else:
+                report['created'] += len(payments)
+                report['amount'] += sum(payment.amount for _, payment, _ in payments)
+                report['fees_updated'] += len({payment.fee_id for _, payment, _ in payments})
+
+    for key in ('duplicates', 'unmatched', 'errors'):
+        report[key].sort(key=lambda entry: entry['row'])
+    return report
+
+
+def _record_chunk(payments):
+    with transaction.atomic():
+        locked = lock_fees({payment.fee_id for _, payment, _ in payments})
+        created = Payment.objects.bulk_create([payment for _, payment, _ in payments])
+        move_by_entries(record_existing_payments(created), locked, on=timezone.localdate())
+    invalidate_student_dashboards_on_commit({student_id for _, _, student_id in payments})
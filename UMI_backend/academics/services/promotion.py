@@ -0,0 +1,135 @@
+# academics/services/promotion.py
+from datetime import date
+
+from django.db import transaction
+from django.db.models import F
+
+from academics.models import Course, Fee, FeeStructure, Semester
+from academics.services import fee_summary
+from academics.services.academic_standing import promotion_status_for_students
+from academics.services.dashboard import invalidate_student_dashboards_on_commit
+from academics.services.ledger import moved, record_write_offs
+from students.models import Student
+from students.services.profile import invalidate_student_profiles_on_commit
+
+PROMOTION_BATCH_SIZE = 500
+
+
+def plan_department_promotion(department_id, semester_id):
+    """
+    Evaluate every student of a department/semester with the academic standing
+    rules. Returns (eligible, skipped): eligible is a list of
+    (student_id, name, next_semester_id), skipped maps a status
+    ('dropped', 'blocked', 'pending', 'current') to the students left behind.
+    """
+    students = Student.objects.filter(department_id=department_id, semester_id=semester_id)
+    names = dict(students.values_list('student_id', 'name'))
+    statuses = promotion_status_for_students(students)
+
+    eligible = []
+    skipped = {}
+    for student_id, decision in sorted(statuses.items()):
+        if decision['status'] == 'promote':
+            eligible.append((student_id, names[student_id], decision['next_semester_id']))
+        else:
+            skipped.setdefault(decision['status'], []).append({
+                'student_id': student_id,
+                'name': names[student_id],
+                'message': decision['message']
+            })
+    return eligible, skipped
+
+
+def promote_department(department_id, semester_id, due_date=None, dry_run=False, progress=None):
+    """
+    Promote every eligible student of a department/semester in one transaction:
+    clear the current semester fee, move the student, create the next semester
+    fee and enroll them in the next semester's courses, all with bulk queries
+    per batch of PROMOTION_BATCH_SIZE students.
+
+    ``progress`` is called with (done, total) after each batch. With
+    ``dry_run`` nothing is written and the report only lists the decisions.
+    """
+    eligible, skipped = plan_department_promotion(department_id, semester_id)
+    report = {
+        'department_id': department_id,
+        'semester_id': semester_id,
+        'dry_run': dry_run,
+        'total_students': len(eligible) + sum(len(rows) for rows in skipped.values()),
+        'promoted': [
+            {'student_id': student_id, 'name': name, 'next_semester_id': next_semester_id}
+            for student_id, name, next_semester_id in eligible
+        ],
+        'skipped': skipped,
+        'fees_cleared': 0,
+        'fees_created': 0,
+        'courses_assigned': 0
+    }
+    if dry_run or not eligible:
+        return report
+
+    due_date = due_date or date(2025, 1, 1)
+    by_next_semester = {}
+    for student_id, _, next_semester_id in eligible:
+        by_next_semester.setdefault(next_semester_id, []).append(student_id)
+
+    done = 0
+    with transaction.atomic():
+        for next_semester_id, student_ids in by_next_semester.items():
+            next_semester = Semester.objects.get(semester_id=next_semester_id)
+            amount = FeeStructure.get_default_amount_for_semester(next_semester)
+            course_ids = list(Course.objects.filter(semester=next_semester).values_list('course_id', flat=True))
+
+            for start in range(0, len(student_ids), PROMOTION_BATCH_SIZE):
+                batch = student_ids[start:start + PROMOTION_BATCH_SIZE]
+                counts = _promote_batch(batch, department_id, semester_id, next_semester, amount, course_ids, due_date)
+                for key, value in counts.items():
+                    report[key] += value
+                done += len(batch)
+                if progress:
+                    progress(done, len(eligible))
+
+        promoted_ids = [student_id for student_id, _, _ in eligible]
+        invalidate_student_dashboards_on_commit(promoted_ids)
+        invalidate_student_profiles_on_commit(promoted_ids)
+    return report
+
+
+def _promote_batch(student_ids, department_id, semester_id, next_semester, amount, course_ids, due_date):
+    # Clear any outstanding balance on the current semester fee (no carry-over)
+    outstanding = Fee.objects.filter(student_id__in=student_ids, semester_id=semester_id).exclude(status=Fee.PAID)
+    before = fee_summary.snapshot(outstanding)
+    fees_cleared = outstanding.update(paid_amount=F('amount'), balance=0, status=Fee.PAID)
+    record_write_offs({fee_id: row['amount'] - row['paid_amount'] for fee_id, row in before.items()}, 'Cleared on promotion')
+    fee_summary.record_changes([(row, moved(row, row['amount'] - row['paid_amount'])) for row in before.values()])
+
+    Student.objects.filter(student_id__in=student_ids).update(semester=next_semester)
+
+    has_fee = set(
+        Fee.objects.filter(student_id__in=student_ids, semester=next_semester).values_list('student_id', flat=True)
+    )
+    new_fees = Fee.objects.bulk_create([
+        Fee(
+            student_id=student_id,
+            department_id=department_id,
+            semester=next_semester,
+            amount=amount,
+            paid_amount=0,
+            balance=amount,
+            status=Fee.UNPAID,
+            due_date=due_date
+        )
+        for student_id in student_ids if student_id not in has_fee
+    ])
+    fee_summary.record_changes([(None, fee_summary.fee_row(fee)) for fee in new_fees])
+
+    # Replace enrollments with the next semester's courses
+    enrollments = Student.courses.through
+    enrollments.objects.filter(student_id__in=student_ids).delete()
+    assigned = enrollments.objects.bulk_create([
+        enrollments(student_id=student_id, course_id=course_id)
+        for student_id in student_ids
+        for course_id in course_ids
+    ])
+
+    return {'fees_cleared': fees_cleared, 'fees_created': len(new_fees), 'courses_assigned': len(assigned)}
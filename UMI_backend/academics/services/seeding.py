@@ -0,0 +1,214 @@
+# academics/services/seeding.py
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import F, FloatField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Round
+
+from academics.models import (
+    Attendance, Course, Department, Fee, FeeStructure, Payment, Result, Semester, grade_for_percentage
+)
+from academics.services import fee_summary
+from academics.services.academic_standing import DEFAULT_CREDITS, grade_points_expression
+from academics.services.ledger import record_existing_payments
+from academics.services.student_metrics import rebuild_students
+from students.models import Student
+from students.services.search import index_students
+
+SEED_BATCH_SIZE = 1000
+
+SEED_COUNTS = ('departments', 'semesters', 'courses', 'students', 'attendance', 'results', 'fees', 'payments')
+
+
+def _school_days(years, sessions_per_year, start=date(2023, 9, 1)):
+    """``sessions_per_year`` weekdays per year, spread evenly from ``start``"""
+    days = []
+    for year in range(years):
+        day = start.replace(year=start.year + year)
+        while len(days) < (year + 1) * sessions_per_year:
+            if day.weekday() < 5:
+                days.append(day)
+            day += timedelta(days=2)
+    return days
+
+
+def bulk_insert(model, objects, batch_size=SEED_BATCH_SIZE):
+    """
+    bulk_create an iterable of unsaved instances one batch at a time, so
+    generators of millions of rows never sit in memory at once. Returns the
+    created instances only when ``objects`` is a list, otherwise the count.
+    """
+    if isinstance(objects, list):
+        return model.objects.bulk_create(objects, batch_size=batch_size)
+    objects = iter(objects)
+    created = 0
+    while batch := list(islice(objects, batch_size)):
+        model.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def _final_result(rng, student_id, course, exam_date):
+    marks = {
+        'quiz1_marks': rng.randint(1, 5),
+        'quiz2_marks': rng.randint(1, 5),
+        'assignment1_marks': rng.randint(1, 5),
+        'assignment2_marks': rng.randint(1, 5),
+        'mid_term_marks': rng.randint(5, 25),
+        'final_marks': rng.randint(15, 60),
+    }
+    obtained = sum(marks.values())
+    return Result(
+        student_id=student_id, course=course, exam_type='Final', exam_date=exam_date,
+        total_marks=100, obtained_marks=obtained, grade=grade_for_percentage(obtained), **marks
+    )
+
+
+def seed_university(departments=2, semesters=2, courses=3, students=20, years=1,
+                    sessions_per_year=20, seed=0, prefix='SD', batch_size=SEED_BATCH_SIZE, progress=None):
+    """
+    Create a synthetic university with bulk inserts: ``students`` per
+    department semester, each with attendance over ``years`` years, a final
+    result for every course of their current and earlier semesters, a fee per
+    semester and payments against it.
+
+    Rows are generated from ``random.Random(seed)`` so the same arguments
+    always produce the same data, and inserted in batches of ``batch_size``
+    with one transaction per department. bulk_create sends no model signals,
+    so the derived student fields (attendance percentage, GPA, CGPA) are
+    rebuilt set-wise once per department instead. ``progress`` is called
+    with (department index, departments, counts so far). Returns row counts.
+    """
+    rng = random.Random(seed)
+    school_days = _school_days(years, sessions_per_year)
+    counts = dict.fromkeys(SEED_COUNTS, 0)
+
+    for d in range(1, departments + 1):
+        code = f"{prefix}{d:03d}"
+        with transaction.atomic():
+            department = Department.objects.create(
+                name=f"Synthetic Department {code}", code=code, num_semesters=semesters
+            )
+            semester_list = bulk_insert(Semester, [
+                Semester(name=f"Semester {s}", semester_code=f"{code}S{s}", program=department.name,
+                         capacity=students, department=department)
+                for s in range(1, semesters + 1)
+            ])
+            bulk_insert(FeeStructure, [
+                FeeStructure(department=department, semester=semester,
+                             amount=FeeStructure.get_default_amount_for_semester(semester))
+                for semester in semester_list
+            ])
+            course_lists = [
+                bulk_insert(Course, [
+                    Course(name=f"{semester.semester_code} Course {c}", code=f"{semester.semester_code}C{c}",
+                           credits=rng.choice([2, 3, 4]), semester=semester)
+                    for c in range(1, courses + 1)
+                ])
+                for semester in semester_list
+            ]
+            counts['departments'] += 1
+            counts['semesters'] += len(semester_list)
+            counts['courses'] += sum(len(course_list) for course_list in course_lists)
+
+            for index, semester in enumerate(semester_list):
+                for start in range(0, students, batch_size):
+                    student_list = bulk_insert(Student, [
+                        Student(
+                            student_id=f"{code.lower()}s{index + 1}n{n:06d}",
+                            name=f"Student {code}-{index + 1}-{n}",
+                            email=f"{code.lower()}.{index + 1}.{n}@synthetic.test",
+                            phone=f"0300{rng.randint(1000000, 9999999)}",
+                            date_of_birth=date(2000, 1, 1) + timedelta(days=rng.randint(0, 2000)),
+                            department=department,
+                            semester=semester,
+                        )
+                        for n in range(start + 1, min(start + batch_size, students) + 1)
+                    ], batch_size)
+                    counts['students'] += len(student_list)
+                    index_students([student.pk for student in student_list])
+                    history = _seed_student_history(
+                        rng, department, semester_list[:index + 1], course_lists[:index + 1],
+                        student_list, school_days, batch_size
+                    )
+                    for key, value in history.items():
+                        counts[key] += value
+
+            rebuild_department_standing(department)
+        if progress:
+            progress(d, departments, counts)
+    return counts
+
+
+def _seed_student_history(rng, department, semesters, course_lists, students, school_days, batch_size):
+    enrollments = Student.courses.through
+    bulk_insert(enrollments, (
+        enrollments(student_id=student.pk, course_id=course.course_id)
+        for student in students for course in course_lists[-1]
+    ), batch_size)
+
+    attendance = bulk_insert(Attendance, (
+        Attendance(student_id=student.pk, date=day,
+                   status=rng.choices([Attendance.PRESENT, Attendance.ABSENT, Attendance.LATE], [85, 10, 5])[0])
+        for student in students for day in school_days
+    ), batch_size)
+
+    results = bulk_insert(Result, (
+        _final_result(rng, student.pk, course, school_days[-1] - timedelta(days=120 * (len(semesters) - index)))
+        for student in students
+        for index, course_list in enumerate(course_lists)
+        for course in course_list
+    ), batch_size)
+
+    amounts = [Decimal(str(FeeStructure.get_default_amount_for_semester(semester))) for semester in semesters]
+    fees = []
+    for student in students:
+        for index, semester in enumerate(semesters):
+            amount = amounts[index]
+            current = index == len(semesters) - 1
+            paid = rng.choice([Decimal('0'), amount / 2, amount]) if current else amount
+            status = Fee.PAID if paid >= amount else Fee.PARTIAL if paid > 0 else Fee.UNPAID
+            fees.append(Fee(
+                student_id=student.pk, department=department, semester=semester, amount=amount,
+                paid_amount=paid, balance=amount - paid, status=status,
+                due_date=date(2023, 10, 1) + timedelta(days=180 * index),
+            ))
+    fees = bulk_insert(Fee, fees, batch_size)
+
+    payments = bulk_insert(Payment, [
+        payment
+        for fee in fees if fee.paid_amount > 0
+        for payment in (
+            Payment(fee=fee, department=department, semester=fee.semester,
+                    amount=(fee.paid_amount / 2).quantize(Decimal('0.01')), payment_method=Payment.CASH),
+            Payment(fee=fee, department=department, semester=fee.semester,
+                    amount=fee.paid_amount - (fee.paid_amount / 2).quantize(Decimal('0.01')), payment_method=Payment.ONLINE),
+        )
+    ], batch_size)
+    # The fees above already carry their paid amounts; only the ledger is missing
+    record_existing_payments(payments, batch_size)
+    fee_summary.record_changes([(None, fee_summary.fee_row(fee)) for fee in fees])
+
+    return {'attendance': attendance, 'results': results, 'fees': len(fees), 'payments': len(payments)}
+
+
+def rebuild_department_standing(department):
+    """Set-based rebuild of attendance percentage, GPA and CGPA for a department's students"""
+    students = Student.objects.filter(department=department)
+    rebuild_students(students)
+    cgpa = (
+        Result.objects.filter(student=OuterRef('pk'), exam_type__icontains='final')
+        .annotate(
+            points=grade_points_expression(),
+            credit_hours=Coalesce(F('course__credits'), Value(DEFAULT_CREDITS)),
+        )
+        .values('student')
+        .annotate(cgpa=Round(
+            Sum(F('points') * F('credit_hours'), output_field=FloatField()) / Sum('credit_hours'), 2
+        ))
+        .values('cgpa')
+    )
+    students.update(cgpa=Coalesce(Subquery(cgpa), Value(0.0)))
@@ -0,0 +1,174 @@
+# academics/services/student_metrics.py
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+
+from academics.models import Attendance, Result, StudentPerformanceCounter
+from academics.services.dashboard import invalidate_student_dashboards_on_commit
+from students.models import Student
+from students.services.profile import invalidate_student_profiles_on_commit
+
+# (minimum percentage, grade points) used for the AI gpa field
+GPA_POINT_BANDS = ((85, 4.0), (75, 3.5), (65, 3.0), (55, 2.5), (50, 2.0))
+
+COUNTER_FIELDS = ("attendance_total", "attendance_present", "result_count", "grade_points_total")
+
+
+def percentage_to_points(percentage):
+    for threshold, points in GPA_POINT_BANDS:
+        if percentage >= threshold:
+            return points
+    return 0.0
+
+
+def attendance_rate(total, present):
+    return round((present / total) * 100, 2) if total else 0.0
+
+
+def average_points(count, points_total):
+    return round(points_total / count, 2) if count else 0.0
+
+
+def derived_fields(counter):
+    """Student fields computed from a counter row."""
+    return {
+        "attendance_percentage": attendance_rate(counter.attendance_total, counter.attendance_present),
+        "gpa": average_points(counter.result_count, counter.grade_points_total),
+    }
+
+
+def contribution(instance):
+    """
+    What a single Attendance or Result row adds to its student's counters,
+    as (student_id, deltas).
+    """
+    if isinstance(instance, Attendance):
+        return instance.student_id, {
+            "attendance_total": 1,
+            "attendance_present": 1 if instance.status == Attendance.PRESENT else 0,
+        }
+    return instance.student_id, {
+        "result_count": 1,
+        "grade_points_total": percentage_to_points(instance.percentage),
+    }
+
+
+def apply_change(previous, current):
+    """
+    Move a row's contribution from ``previous`` to ``current`` (either may be
+    None for inserts/deletes). Returns {student_id: derived fields} for every
+    student that was touched.
+    """
+    changes = {}
+    if previous:
+        student_id, deltas = previous
+        bucket = changes.setdefault(student_id, {})
+        for name, value in deltas.items():
+            bucket[name] = bucket.get(name, 0) - value
+    if current:
+        student_id, deltas = current
+        bucket = changes.setdefault(student_id, {})
+        for name, value in deltas.items():
+            bucket[name] = bucket.get(name, 0) + value
+
+    updated = {}
+    for student_id, deltas in changes.items():
+        values = apply_delta(student_id, **deltas)
+        if values is not None:
+            updated[student_id] = values
+    return updated
+
+
+def apply_delta(student_id, **deltas):
+    """
+    Add ``deltas`` to the student's counters and refresh the derived Student
+    fields. A student without a counter row yet is seeded with a full rebuild.
+    """
+    deltas = {name: value for name, value in deltas.items() if value}
+    if not deltas:
+        return None
+
+    with transaction.atomic():
+        updated = StudentPerformanceCounter.objects.filter(student_id=student_id).update(
+            **{name: F(name) + value for name, value in deltas.items()}
+        )
+        if not updated:
+            return rebuild_students(Student.objects.filter(pk=student_id)).get(student_id)
+
+        counter = StudentPerformanceCounter.objects.get(student_id=student_id)
+        values = derived_fields(counter)
+        Student.objects.filter(pk=student_id).update(**values)
+    invalidate_student_profiles_on_commit([student_id])
+    return values
+
+
+def _points_expression():
+    percentage = Case(
+        When(total_marks__gt=0, then=F("obtained_marks") / F("total_marks") * 100.0),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+    return percentage, Case(
+        *[When(pct__gte=threshold, then=Value(points)) for threshold, points in GPA_POINT_BANDS],
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def rebuild_students(students):
+    """
+    Recompute counters and derived fields for a Student queryset using one
+    grouped aggregate per source table. Returns {student_id: derived fields}.
+    """
+    student_ids = students.values("pk")
+
+    attendance_rows = (
+        Attendance.objects.filter(student__in=student_ids)
+        .values("student_id")
+        .annotate(
+            attendance_total=Count("attendance_id"),
+            attendance_present=Count("attendance_id", filter=Q(status=Attendance.PRESENT)),
+        )
+    )
+    percentage, points = _points_expression()
+    result_rows = (
+        Result.objects.filter(student__in=student_ids)
+        .annotate(pct=percentage)
+        .annotate(grade_points=points)
+        .values("student_id")
+        .annotate(result_count=Count("result_id"), grade_points_total=Sum("grade_points"))
+    )
+
+    counters = {
+        pk: StudentPerformanceCounter(student_id=pk)
+        for pk in students.values_list("pk", flat=True)
+    }
+    for row in attendance_rows:
+        counter = counters[row["student_id"]]
+        counter.attendance_total = row["attendance_total"]
+        counter.attendance_present = row["attendance_present"]
+    for row in result_rows:
+        counter = counters[row["student_id"]]
+        counter.result_count = row["result_count"]
+        counter.grade_points_total = row["grade_points_total"] or 0.0
+
+    updated = {pk: derived_fields(counter) for pk, counter in counters.items()}
+    with transaction.atomic():
+        StudentPerformanceCounter.objects.bulk_create(
+            counters.values(),
+            update_conflicts=True,
+            unique_fields=["student"],
+            update_fields=list(COUNTER_FIELDS),
+            batch_size=500,
+        )
+        Student.objects.bulk_update(
+            [Student(pk=pk, **values) for pk, values in updated.items()],
+            ["attendance_percentage", "gpa"],
+            batch_size=500,
+        )
+    invalidate_student_dashboards_on_commit(updated)
+    invalidate_student_profiles_on_commit(updated)
+    return updated
+
+
+def rebuild_department(department_id):
+    return rebuild_students(Student.objects.filter(department_id=department_id))
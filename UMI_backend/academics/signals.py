@@ -1,3 +1,5 @@
+import logging
+
 from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from django.db.models import Avg, Q, Sum
@@ -5,6 +7,8 @@ from .models import Attendance, Result, Fee, FeeStructure, Scholarship
 from students.models import Student
 from datetime import date, timedelta
 
+logger = logging.getLogger(__name__)
+
 # GPA calculate
 def compute_gpa(student):
     pts = []
@@ -75,4 +79,4 @@ def create_student_fee(sender, instance, created, **kwargs):
                 )
         except Exception as e:
             # Log the error but don't prevent student creation
-            print(f"Error creating fee for student {instance.student_id}: {e}")
\ No newline at end of file
+            logger.exception("Error creating fee for student %s: %s", instance.student_id, e)
\ No newline at end of file
@@ -1,43 +1,60 @@
-from django.db.models.signals import post_save, post_delete, m2m_changed
+import logging
+
+from django.db.models.signals import post_save, post_delete, pre_save, m2m_changed
 from django.dispatch import receiver
-from django.db.models import Avg, Q, Sum
-from .models import Attendance, Result, Fee, FeeStructure, Scholarship, Payment
+from django.db.models import Avg, Q
+from .models import Attendance, Department, Result, Fee, FeeStructure, Scholarship, Semester, Payment
+from .services.academic_standing import cgpa_for_students, semester_gpa_for_students
+from .services.dashboard import invalidate_student_dashboards_on_commit
+from .services import fee_summary, ledger
+from .services.deferred import defer_final_results, defer_student, is_deferred
+from .services.student_metrics import apply_change, contribution, rebuild_students
 from students.models import Student
 from datetime import date, timedelta
-from decimal import Decimal
-
-# GPA calculate
-def compute_gpa(student):
-    pts = []
-    for r in student.results.all():
-        pct = r.percentage
-        if pct >= 85: pts.append(4.0)
-        elif pct >= 75: pts.append(3.5)
-        elif pct >= 65: pts.append(3.0)
-        elif pct >= 55: pts.append(2.5)
-        elif pct >= 50: pts.append(2.0)
-        else: pts.append(0.0)
-    return round(sum(pts)/len(pts), 2) if pts else 0.0
-
-# Attendance %
-def compute_attendance_rate(student):
-    total = student.attendances.count()
-    if total == 0: return 0.0
-    present = student.attendances.filter(status=Attendance.PRESENT).count()
-    return round((present / total) * 100, 2)
-
-# Refresh student AI fields
+
+logger = logging.getLogger(__name__)
+
+# Refresh student AI fields (full recompute; the signals below apply deltas instead)
 def refresh_student_ai(student):
-    student.attendance_percentage = compute_attendance_rate(student)
-    student.gpa = compute_gpa(student)
-    student.save(update_fields=["attendance_percentage", "gpa"])
+    values = rebuild_students(Student.objects.filter(pk=student.pk))[student.pk]
+    for field, value in values.items():
+        setattr(student, field, value)
+
+def _sync_cached_student(instance, updated):
+    # Keep an already-loaded instance.student in step so a later full
+    # student.save() doesn't write stale AI fields back.
+    if type(instance).student.is_cached(instance) and instance.student_id in updated:
+        for field, value in updated[instance.student_id].items():
+            setattr(instance.student, field, value)
 
 # Signals
+@receiver(pre_save, sender=Attendance)
+@receiver(pre_save, sender=Result)
+def remember_previous_contribution(sender, instance, **kwargs):
+    instance._previous_contribution = None
+    if is_deferred():
+        return  # the whole student is rebuilt on flush
+    if not instance._state.adding and instance.pk:
+        previous = sender.objects.filter(pk=instance.pk).first()
+        if previous:
+            instance._previous_contribution = contribution(previous)
+
 @receiver(post_save, sender=Attendance)
 @receiver(post_save, sender=Result)
-@receiver(post_save, sender=Fee)
 def update_student_ai(sender, instance, **kwargs):
-    refresh_student_ai(instance.student)
+    if defer_student(instance.student_id):
+        return
+    updated = apply_change(getattr(instance, '_previous_contribution', None), contribution(instance))
+    _sync_cached_student(instance, updated)
+
+@receiver(post_delete, sender=Attendance)
+@receiver(post_delete, sender=Result)
+def remove_student_ai_contribution(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Student):
+        return  # Student itself is being deleted along with its counters
+    if defer_student(instance.student_id):
+        return
+    apply_change(contribution(instance), None)
 
 @receiver(m2m_changed, sender=Scholarship.students.through)
 def update_student_scholarship(sender, instance, **kwargs):
@@ -77,40 +94,60 @@ def create_student_fee(sender, instance, created, **kwargs):
                 )
         except Exception as e:
             # Log the error but don't prevent student creation
-            print(f"Error creating fee for student {instance.student_id}: {e}")
-
-# Update fee balance when payments are created or deleted
-@receiver([post_save, post_delete], sender=Payment)
-def update_fee_balance(sender, instance, **kwargs):
-    """
-    Update the fee's paid_amount and status when payments are created, updated, or deleted.
-    """
-    from django.db import transaction
+            logger.exception("Error creating fee for student %s: %s", instance.student_id, e)
+
+# Fee ledger: each payment write posts an entry and moves the fee with one
+# F() update (academics.services.ledger) instead of re-summing its payments
+@receiver(pre_save, sender=Payment)
+def remember_previous_payment(sender, instance, **kwargs):
+    instance._previous_payment = None
+    if not instance._state.adding and instance.pk:
+        instance._previous_payment = sender.objects.filter(pk=instance.pk).values_list('fee_id', 'amount').first()
+
+@receiver(post_save, sender=Payment)
+def post_payment_to_ledger(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_payment', None)
+    if created or previous is None:
+        ledger.record_payment(instance)
+    else:
+        ledger.record_payment_change(instance, *previous)
+    invalidate_student_dashboards_on_commit([instance.fee.student_id])
+
+@receiver(post_delete, sender=Payment)
+def reverse_deleted_payment(sender, instance, origin=None, **kwargs):
+    if not (isinstance(origin, Payment) or getattr(origin, 'model', None) is Payment):
+        return  # a cascade (fee, student, department, ...) deletes the fee along with its payments and ledger
+    ledger.record_payment_deleted(instance.fee_id, instance.pk, instance.amount, instance.transaction_id)
+    invalidate_student_dashboards_on_commit([instance.fee.student_id])
+
+# Fee collection cube: saves and deletes move the fee between buckets
+# (academics.services.fee_summary); ledger moves book themselves
+@receiver(pre_save, sender=Fee)
+def remember_previous_fee(sender, instance, update_fields=None, **kwargs):
+    instance._previous_fee_row = None
+    if update_fields is not None and not set(update_fields) & set(fee_summary.FEE_FIELDS):
+        instance._previous_fee_row = False  # nothing the cube shows is being saved
+    elif not instance._state.adding and instance.pk:
+        instance._previous_fee_row = sender.objects.filter(pk=instance.pk).values(*fee_summary.FEE_FIELDS).first()
 
-    with transaction.atomic():
-        # Use select_for_update to prevent race conditions
-        fee = Fee.objects.select_for_update().get(fee_id=instance.fee.fee_id)
-
-        # Calculate total paid amount from all payments for this fee
-        total_paid = fee.payments.aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-        # Update fee's paid_amount
-        fee.paid_amount = total_paid
-
-        # Calculate balance (keep as Decimal for precision)
-        fee.balance = fee.amount - total_paid
-
-        # Update status based on payment amount
-        if total_paid >= fee.amount:
-            fee.status = Fee.PAID
-            if not fee.paid_on and sender == post_save and kwargs.get('created', False):
-                fee.paid_on = instance.payment_date.date()
-        elif total_paid > 0:
-            fee.status = Fee.PARTIAL
-        else:
-            fee.status = Fee.UNPAID
+@receiver(post_save, sender=Fee)
+def book_fee_in_summary(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_fee_row', None)
+    if previous is not False:
+        fee_summary.record_changes([(previous, fee_summary.fee_row(instance))])
 
-        fee.save(update_fields=['paid_amount', 'balance', 'status', 'paid_on'])
+@receiver(post_save, sender=Fee)
+def move_fee_payments(sender, instance, **kwargs):
+    # Payments carry a copy of their fee's department and semester
+    previous = getattr(instance, '_previous_fee_row', None)
+    if previous and (previous['department_id'], previous['semester_id']) != (instance.department_id, instance.semester_id):
+        Payment.objects.filter(fee_id=instance.pk).update(department_id=instance.department_id, semester_id=instance.semester_id)
+
+@receiver(post_delete, sender=Fee)
+def remove_fee_from_summary(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, (Department, Semester)) or getattr(origin, 'model', None) in (Department, Semester):
+        return  # the summary buckets are deleted along with the department or semester
+    fee_summary.record_changes([(fee_summary.fee_row(instance), None)])
 
 # Signal for final result submission, CGPA calculation, and automatic promotion
 @receiver(post_save, sender=Result)
@@ -122,11 +159,19 @@ def handle_final_result_submission(sender, instance, created, **kwargs):
     if not instance.exam_type or 'final' not in instance.exam_type.lower():
         return
 
+    semester_id = instance.course.semester_id if instance.course else None
+    if semester_id and defer_final_results(instance.student_id, semester_id):
+        return
+
     student = instance.student
     semester = instance.course.semester if instance.course else None
     if not semester or semester != student.semester:
         return
 
+    process_final_results(student, semester)
+
+def process_final_results(student, semester):
+    """Run the end-of-semester GPA/CGPA, history and promotion step for a student."""
     # Check if all courses for the semester have final results
     semester_courses = semester.courses.all()
     final_results = Result.objects.filter(
@@ -138,13 +183,15 @@ def handle_final_result_submission(sender, instance, created, **kwargs):
     if final_results.count() != semester_courses.count():
         return  # Not all finals submitted yet
 
-    # All finals submitted, calculate semester GPA
-    semester_gpa = compute_gpa(student)  # Uses existing compute_gpa
+    # All finals submitted: credit-weighted semester GPA and CGPA, as the
+    # results view reports them (academics.services.academic_standing)
+    this_student = Student.objects.filter(pk=student.pk)
+    semester_gpa = semester_gpa_for_students(this_student, semester)[student.pk]['cgpa']
 
     # Update student GPA and CGPA
     student.gpa = semester_gpa
     student.previous_cgpa = student.cgpa
-    student.cgpa = (student.previous_cgpa + semester_gpa) / 2  # Simple average; can be weighted later
+    student.cgpa = cgpa_for_students(this_student)[student.pk]['cgpa']
     student.save(update_fields=['gpa', 'cgpa', 'previous_cgpa'])
 
     # Create academic history record
@@ -173,3 +220,15 @@ def handle_final_result_submission(sender, instance, created, **kwargs):
         if fee:
             fee.due_date = date.today() + timedelta(days=30)
             fee.save(update_fields=['due_date'])
+
+# Drop cached student dashboards whenever something they show changes.
+# Payments are covered by the ledger receivers above.
+@receiver([post_save, post_delete], sender=Attendance)
+@receiver([post_save, post_delete], sender=Result)
+@receiver([post_save, post_delete], sender=Fee)
+def invalidate_dashboard(sender, instance, **kwargs):
+    invalidate_student_dashboards_on_commit([instance.student_id])
+
+@receiver([post_save, post_delete], sender=Student)
+def invalidate_dashboard_for_student(sender, instance, **kwargs):
+    invalidate_student_dashboards_on_commit([instance.student_id])
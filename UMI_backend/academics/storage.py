@@ -0,0 +1,113 @@
+# academics/storage.py
+"""
+Content-addressed media storage (settings.STORAGES['default']).
+
+Every saved file is renamed to the SHA-256 of its bytes inside the
+directory it was uploaded to (``student_images/<hash>.jpg``), so
+identical uploads share one file and a stored name never changes content,
+which lets academics.media_views serve it with an immutable Cache-Control.
+Nothing is deleted when a record stops pointing at a file, since other
+records may share it; collect_garbage() removes files no record references.
+"""
+import hashlib
+import os
+import re
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import models
+from django.utils import timezone
+
+HASH_LENGTH = 32
+
+_HASHED_STEM = re.compile(rf'^[0-9a-f]{{{HASH_LENGTH}}}$')
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks() if hasattr(content, 'chunks') else iter(lambda: content.read(64 * 1024), b''):
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def is_content_addressed(name):
+    """True for names produced by ContentAddressedStorage (or the image pipeline)"""
+    return bool(_HASHED_STEM.match(os.path.splitext(os.path.basename(name))[0]))
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def _save(self, name, content):
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        hashed = os.path.join(directory, f"{content_hash(content)}{extension}").replace('\\', '/')
+        if self.exists(hashed):
+            return hashed
+        return super()._save(hashed, content)
+
+
+def _file_fields():
+    for model in apps.get_models():
+        for field in model._meta.get_fields():
+            if isinstance(field, models.FileField):
+                yield model, field
+
+
+def media_directories():
+    """Top-level upload directories of every FileField"""
+    directories = set()
+    for _, field in _file_fields():
+        if isinstance(field.upload_to, str) and field.upload_to.strip('/'):
+            directories.add(field.upload_to.strip('/').split('/')[0])
+    return sorted(directories)
+
+
+def referenced_media():
+    """Every stored name some record points at, including image renditions"""
+    names = set()
+    for model, field in _file_fields():
+        names.update(
+            model._default_manager.exclude(**{field.name: ''}).exclude(**{f'{field.name}__isnull': True})
+            .values_list(field.name, flat=True)
+        )
+        if any(f.name == 'image_renditions' for f in model._meta.get_fields()):
+            for renditions in model._default_manager.exclude(image_renditions={}).values_list('image_renditions', flat=True):
+                names.update(value for value in (renditions or {}).values() if isinstance(value, str))
+    return names
+
+
+def _walk(storage, directory):
+    subdirectories, files = storage.listdir(directory)
+    for filename in files:
+        yield f"{directory}/{filename}"
+    for subdirectory in subdirectories:
+        yield from _walk(storage, f"{directory}/{subdirectory}")
+
+
+def collect_garbage(dry_run=False, grace=timedelta(hours=24), storage=None):
+    """
+    Delete files under the upload directories that no record references
+    and that are older than ``grace`` (so uploads still being saved or
+    processed are left alone). Returns (names, bytes) of what was removed,
+    or would be with ``dry_run``.
+    """
+    storage = storage or default_storage
+    referenced = referenced_media()
+    cutoff = timezone.now() - grace
+    removed, freed = [], 0
+    for directory in media_directories():
+        if not storage.exists(directory):
+            continue
+        for name in _walk(storage, directory):
+            if name in referenced or storage.get_modified_time(name) > cutoff:
+                continue
+            size = storage.size(name)
+            if not dry_run:
+                storage.delete(name)
+            removed.append(name)
+            freed += size
+    return removed, freed
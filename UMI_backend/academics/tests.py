@@ -1,9 +1,31 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from .models import Department
+from datetime import date
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Sum
+from .models import (
+    Department, Semester, Course, Attendance, Result, Fee, FeeCollectionSummary, FeeLedgerEntry, Payment, StudentPerformanceCounter
+)
+from .services.academic_standing import (
+    cgpa_for_students, has_consecutive_failures, promotion_status_for_students, semester_gpa_for_students
+)
+from .services.deferred import deferred_recompute
+from .services.ledger import reconcile
+from .services.promotion import promote_department
+from .services.seeding import seed_university
+from .services.student_metrics import rebuild_department
+from .storage import collect_garbage
+from students.models import Student
 
 User = get_user_model()
 
@@ -123,3 +145,877 @@ class DepartmentAPITestCase(APITestCase):
         url = reverse('department-detail', kwargs={'pk': self.department.pk})
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class StudentPerformanceCounterTests(TestCase):
+    def setUp(self):
+        self.department = Department.objects.create(name='Computer Science', code='CS')
+        self.semester = Semester.objects.create(name='Semester 1', semester_code='S1', program='BCS', department=self.department)
+        self.course = Course.objects.create(name='Intro to CS', code='CS101', semester=self.semester)
+        self.student = Student.objects.create(
+            name='John Doe',
+            email='john@example.com',
+            phone='123',
+            date_of_birth=date(2000, 1, 1),
+            department=self.department,
+            semester=self.semester,
+        )
+
+    def mark(self, day, status):
+        return Attendance.objects.create(student=self.student, date=date(2025, 1, day), status=status)
+
+    def test_attendance_deltas(self):
+        self.mark(1, Attendance.PRESENT)
+        self.mark(2, Attendance.PRESENT)
+        absent = self.mark(3, Attendance.ABSENT)
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.attendance_percentage, 66.67)
+
+        absent.status = Attendance.PRESENT
+        absent.save()
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.attendance_percentage, 100.0)
+
+        self.mark(4, Attendance.LATE).delete()
+        counter = StudentPerformanceCounter.objects.get(student=self.student)
+        self.assertEqual((counter.attendance_present, counter.attendance_total), (3, 3))
+
+    def test_result_deltas(self):
+        result = Result.objects.create(student=self.student, course=self.course, exam_type='Mid', mid_term_marks=25)
+        Result.objects.create(student=self.student, course=self.course, exam_type='Mid', mid_term_marks=10)
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.gpa, 2.0)
+
+        result.delete()
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.gpa, 0.0)
+
+    def test_attendance_save_uses_constant_queries(self):
+        self.mark(1, Attendance.PRESENT)
+        with self.assertNumQueries(6):
+            self.mark(2, Attendance.ABSENT)
+
+    def test_rebuild_department_matches_incremental_counters(self):
+        for day in range(1, 6):
+            self.mark(day, Attendance.PRESENT if day % 2 else Attendance.ABSENT)
+        Result.objects.create(student=self.student, course=self.course, exam_type='Mid', mid_term_marks=20)
+        incremental = StudentPerformanceCounter.objects.get(student=self.student)
+
+        StudentPerformanceCounter.objects.all().delete()
+        Student.objects.filter(pk=self.student.pk).update(attendance_percentage=0, gpa=0)
+        updated = rebuild_department(self.department.department_id)
+
+        rebuilt = StudentPerformanceCounter.objects.get(student=self.student)
+        self.assertEqual(
+            (rebuilt.attendance_total, rebuilt.attendance_present, rebuilt.result_count, rebuilt.grade_points_total),
+            (incremental.attendance_total, incremental.attendance_present, incremental.result_count, incremental.grade_points_total),
+        )
+        self.assertEqual(updated[self.student.pk], {'attendance_percentage': 60.0, 'gpa': 3.5})
+
+
+class DeferredRecomputeTests(TestCase):
+    def setUp(self):
+        self.department = Department.objects.create(name='Computer Science', code='CS')
+        self.semester = Semester.objects.create(name='Semester 1', semester_code='S1', program='BCS', department=self.department)
+        self.student = Student.objects.create(
+            name='Jane Doe',
+            email='jane@example.com',
+            phone='123',
+            date_of_birth=date(2000, 1, 1),
+            department=self.department,
+            semester=self.semester,
+        )
+
+    def test_attendance_recomputed_once_on_exit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with deferred_recompute():
+                for day in range(1, 5):
+                    Attendance.objects.create(student=self.student, date=date(2025, 1, day), status=Attendance.PRESENT if day > 1 else Attendance.ABSENT)
+                self.assertFalse(StudentPerformanceCounter.objects.filter(student=self.student).exists())
+
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.attendance_percentage, 75.0)
+        self.assertEqual(StudentPerformanceCounter.objects.get(student=self.student).attendance_total, 4)
+
+    def test_payments_are_applied_immediately_by_the_ledger(self):
+        fee = Fee.objects.filter(student=self.student).first()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic(), deferred_recompute():
+                Payment.objects.create(fee=fee, amount=Decimal('1000.00'))
+                Payment.objects.create(fee=fee, amount=Decimal('500.00'))
+                fee.refresh_from_db()
+                self.assertEqual(fee.paid_amount, Decimal('1500.00'))
+
+        self.assertEqual(len(callbacks), 2)  # only the two dashboard invalidations
+        fee.refresh_from_db()
+        self.assertEqual(fee.paid_amount, Decimal('1500.00'))
+        self.assertEqual(fee.balance, fee.amount - Decimal('1500.00'))
+        self.assertEqual(fee.status, Fee.PARTIAL)
+
+
+class FeeLedgerTests(APITestCase):
+    def setUp(self):
+        self.department = Department.objects.create(name='Computer Science', code='CS')
+        self.semester = Semester.objects.create(name='Semester 1', semester_code='S1', program='BCS', department=self.department)
+        self.student = Student.objects.create(
+            name='Jane Doe', email='jane@example.com', phone='123', date_of_birth=date(2000, 1, 1),
+            department=self.department, semester=self.semester,
+        )
+        Fee.objects.filter(student=self.student).delete()
+        self.fee = Fee.objects.create(student=self.student, semester=self.semester, amount=Decimal('1000.00'), due_date=date(2025, 1, 1))
+        self.admin = User.objects.create_user(username='admin', email='admin@example.com', password='pass', role='admin')
+
+    def assertFee(self, paid, status):
+        self.fee.refresh_from_db()
+        self.assertEqual((self.fee.paid_amount, self.fee.balance, self.fee.status),
+                         (Decimal(paid), Decimal('1000.00') - Decimal(paid), status))
+
+    def test_payment_is_one_insert_and_one_update(self):
+        Payment.objects.create(fee=self.fee, amount=Decimal('100.00'))
+        payment = Payment(fee=self.fee, amount=Decimal('900.00'), payment_method=Payment.ONLINE)
+        # payment insert, then savepoint, fee row, fee UPDATE, ledger INSERT, release
+        # (no department on this fee, so the collection summary isn't involved)
+        with self.assertNumQueries(6):
+            payment.save()
+        self.assertFee('1000.00', Fee.PAID)
+        self.assertEqual(self.fee.paid_on, payment.payment_date)
+        self.assertEqual(list(self.fee.ledger_entries.values_list('kind', 'amount')),
+                         [(FeeLedgerEntry.PAYMENT, Decimal('100.00')), (FeeLedgerEntry.PAYMENT, Decimal('900.00'))])
+
+    def test_edits_and_deletes_post_entries(self):
+        payment = Payment.objects.create(fee=self.fee, amount=Decimal('400.00'))
+        payment.amount = Decimal('300.00')
+        payment.save()
+        self.assertFee('300.00', Fee.PARTIAL)
+        payment.delete()
+        self.assertFee('0.00', Fee.UNPAID)
+        self.assertEqual(list(self.fee.ledger_entries.values_list('kind', 'amount')), [
+            (FeeLedgerEntry.PAYMENT, Decimal('400.00')),
+            (FeeLedgerEntry.ADJUSTMENT, Decimal('-100.00')),
+            (FeeLedgerEntry.REVERSAL, Decimal('-300.00')),
+        ])
+        entry = self.fee.ledger_entries.first()
+        entry.amount = Decimal('1.00')
+        with self.assertRaises(ValueError):
+            entry.save()
+        self.assertEqual(list(reconcile()), [])
+
+    def test_transaction_id_makes_payment_creation_idempotent(self):
+        self.client.force_authenticate(self.admin)
+        url = f'/api/academics/fees/{self.fee.fee_id}/payments/'
+        data = {'amount': '250.00', 'payment_method': 'Online', 'transaction_id': 'BANK-1'}
+        first = self.client.post(url, data, format='json')
+        retry = self.client.post(url, data, format='json')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_200_OK)
+        self.assertEqual(retry.data['payment_id'], first.data['payment_id'])
+        self.assertFee('250.00', Fee.PARTIAL)
+
+        other = Fee.objects.create(student=self.student, amount=Decimal('500.00'), due_date=date(2025, 6, 1))
+        conflict = self.client.post(f'/api/academics/fees/{other.fee_id}/payments/', data, format='json')
+        self.assertEqual(conflict.status_code, status.HTTP_409_CONFLICT)
+
+    def test_reconcile_command_reports_and_repairs_drift(self):
+        from io import StringIO
+        from django.core.management import call_command
+        Payment.objects.create(fee=self.fee, amount=Decimal('600.00'))
+        Payment.objects.bulk_create([Payment(fee=self.fee, amount=Decimal('100.00'))])  # no signal, no entry
+        Fee.objects.filter(pk=self.fee.pk).update(balance=Decimal('1.00'))
+
+        reports = list(reconcile())
+        self.assertEqual(reports[0]['problems'], ['ledger', 'balance'])
+        out = StringIO()
+        call_command('reconcile_fee_ledger', stdout=out)
+        self.assertIn('1 fees do not reconcile', out.getvalue())
+
+        call_command('reconcile_fee_ledger', '--fix', stdout=StringIO())
+        self.assertFee('700.00', Fee.PARTIAL)
+        self.assertEqual(list(reconcile()), [])
+
+    def test_promotion_write_offs_reconcile(self):
+        from .services.promotion import _promote_batch
+        Payment.objects.create(fee=self.fee, amount=Decimal('200.00'))
+        next_semester = Semester.objects.create(name='Semester 2', semester_code='S2', program='BCS', department=self.department)
+        _promote_batch([self.student.pk], self.department.department_id, self.semester.semester_id,
+                       next_semester, Decimal('1000.00'), [], date(2025, 6, 1))
+        self.assertFee('1000.00', Fee.PAID)
+        self.assertEqual(self.fee.ledger_entries.get(kind=FeeLedgerEntry.WRITE_OFF).amount, Decimal('800.00'))
+        self.assertEqual(list(reconcile()), [])
+
+    def test_cascading_deletes_do_not_reverse_payments(self):
+        Payment.objects.create(fee=self.fee, amount=Decimal('200.00'))
+        other = Fee.objects.create(student=self.student, department=self.department, semester=self.semester,
+                                   amount=Decimal('500.00'), due_date=date(2025, 6, 1))
+        Payment.objects.create(fee=other, amount=Decimal('100.00'))
+        self.semester.delete()
+        self.assertFalse(Fee.objects.filter(pk=other.pk).exists())
+        self.assertFalse(FeeLedgerEntry.objects.filter(fee_id=other.pk).exists())
+        self.department.delete()
+        self.student.delete()
+        self.assertFalse(Fee.objects.exists())
+        self.assertFalse(FeeLedgerEntry.objects.exists())
+
+
+class PaymentImportTests(APITestCase):
+    def setUp(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        self.file = SimpleUploadedFile
+        self.department = Department.objects.create(name='Computer Science', code='CS')
+        self.semester = Semester.objects.create(name='Semester 1', semester_code='S1', program='BCS', department=self.department)
+        self.students = Student.objects.bulk_create([
+            Student(student_id=f'cs{i:05d}', name=f'Student {i}', email=f'student{i}@example.com', phone='123',
+                    date_of_birth=date(2000, 1, 1), department=self.department, semester=self.semester)
+            for i in range(300)
+        ])
+        self.fees = Fee.objects.bulk_create([
+            Fee(student=student, department=self.department, semester=self.semester, amount=Decimal('1000.00'),
+                balance=Decimal('1000.00'), due_date=date(2025, 1, 1))
+            for student in self.students
+        ])
+        self.client.force_authenticate(User.objects.create_user(username='admin', email='admin@example.com', password='pass', role='admin'))
+
+    def upload(self, lines):
+        content = '\n'.join(['transaction_id,amount,student_id,fee_id'] + lines).encode()
+        return self.client.post('/api/academics/fees/payments/import/',
+                                {'file': self.file('statement.csv', content)}, format='multipart')
+
+    def test_import_is_a_fixed_number_of_queries_per_chunk(self):
+        from .services.payment_import import import_payments
+        rows = [{'transaction_id': f'TX{i}', 'amount': '400.00', 'student_id': student.pk}
+                for i, student in enumerate(self.students)]
+        rows += [{'transaction_id': f'TY{i}', 'amount': '600.00', 'fee_id': str(fee.pk)} for i, fee in enumerate(self.fees[:100])]
+        # recorded IDs, fees, then savepoint, fee lock, payments (4 INSERTs within SQLite's
+        # variable limit) and ledger (3), one fee UPDATE, release; plus an UPDATE per
+        # summary bucket touched (3), each opened here with a savepointed INSERT
+        with self.assertNumQueries(25):
+            report = import_payments(rows)
+        self.assertEqual((report['created'], report['fees_updated']), (400, 300))
+        self.assertEqual(Fee.objects.filter(status=Fee.PAID).count(), 100)
+        self.assertEqual(Fee.objects.filter(status=Fee.PARTIAL, balance=Decimal('600.00')).count(), 200)
+        self.assertEqual(list(reconcile()), [])
+
+    def test_duplicates_unmatched_and_errors_are_reported(self):
+        Payment.objects.create(fee=self.fees[0], amount=Decimal('100.00'), transaction_id='TX-OLD')
+        response = self.upload([
+            f'TX-1,250.00,{self.students[1].pk},',
+            f'TX-1,250.00,{self.students[1].pk},',
+            f'TX-OLD,100.00,{self.students[0].pk},',
+            'TX-2,50.00,nobody,',
+            f'TX-3,50.00,{self.students[2].pk},999999',
+            f'TX-4,-5,{self.students[3].pk},',
+        ])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual([row['row'] for row in response.data['duplicates']], [2, 3])
+        self.assertEqual([row['row'] for row in response.data['unmatched']], [4, 5])
+        self.assertEqual([row['row'] for row in response.data['errors']], [6])
+
+        # Re-sending the statement records nothing twice
+        again = self.upload([f'TX-1,250.00,{self.students[1].pk},'])
+        self.assertEqual(again.data['created'], 0)
+        self.fees[1].refresh_from_db()
+        self.assertEqual(self.fees[1].paid_amount, Decimal('250.00'))
+
+    def test_rows_of_one_student_move_on_to_the_next_open_fee(self):
+        student = self.students[0]
+        later = Fee.objects.create(student=student, department=self.department, semester=self.semester,
+                                   amount=Decimal('1000.00'), due_date=date(2025, 6, 1))
+        response = self.upload([f'TX-1,1000.00,{student.pk},', f'TX-2,400.00,{student.pk},'])
+        self.assertEqual(response.data['created'], 2)
+        self.fees[0].refresh_from_db()
+        later.refresh_from_db()
+        self.assertEqual((self.fees[0].paid_amount, self.fees[0].status), (Decimal('1000.00'), Fee.PAID))
+        self.assertEqual((later.paid_amount, later.status), (Decimal('400.00'), Fee.PARTIAL))
+
+
+class PaymentHistoryTests(APITestCase):
+    def setUp(self):
+        self.department = Department.objects.create(name='Computer Science', code='CS')
+        self.semester = Semester.objects.create(name='Semester 1', semester_code='S1', program='BCS', department=self.department)
+        student = Student.objects.create(student_id='cs001', name='Ali', email='ali@example.com', phone='123',
+                                         date_of_birth=date(2000, 1, 1), department=self.department, semester=self.semester)
+        fee = Fee.objects.get(student=student)
+        Payment.objects.bulk_create([
+            Payment(fee=fee, department=self.department, semester=self.semester, amount=Decimal('10.00'),
+                    transaction_id=f'TX{i}')
+            for i in range(25)
+        ])
+        # Five payments a day, so pages have to break ties on payment_id
+        for i, payment in enumerate(Payment.objects.order_by('payment_id')):
+            Payment.objects.filter(pk=payment.pk).update(payment_date=date(2025, 3, 1) + timedelta(days=i // 5))
+        self.url = f'/api/academics/departments/{self.department.department_id}/semesters/{self.semester.semester_id}/payments/'
+        self.client.force_authenticate(User.objects.create_user(username='admin', email='admin@example.com', password='pass', role='admin'))
+
+    def test_pages_follow_the_cursor_without_gaps_or_repeats(self):
+        first = self.client.get(self.url, {'page_size': 10}).data
+        self.assertEqual(first['total_payments'], 25)
+        seen = [row['payment_id'] for row in first['payments']]
+        cursor = first['next_cursor']
+        while cursor:
+            with self.assertNumQueries(1):
+                page = self.client.get(self.url, {'page_size': 10, 'cursor': cursor}).data
+            self.assertNotIn('total_payments', page)
+            seen += [row['payment_id'] for row in page['payments']]
+            cursor = page['next_cursor']
+        expected = list(Payment.objects.order_by('-payment_date', '-payment_id').values_list('payment_id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_date_filters_and_bad_parameters(self):
+        data = self.client.get(self.url, {'date_from': '2025-03-02', 'date_to': '2025-03-03'}).data
+        self.assertEqual(data['total_payments'], 10)
+        self.assertEqual({row['payment_date'] for row in data['payments']}, {date(2025, 3, 2), date(2025, 3, 3)})
+        self.assertEqual(self.client.get(self.url, {'date_from': '03/02/2025'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'cursor': 'nonsense'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_exports_stream_every_matching_payment(self):
+        response = self.client.get(self.url, {'export': 'csv', 'date_from': '2025-03-05'})
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['payment_id', 'student_name', 'student_id'])
+        self.assertEqual(len(lines), 6)
+        response = self.client.get(self.url, {'export': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 25)
+
+    def test_payments_follow_their_fee_and_history_is_admin_only(self):
+        fee = Fee.objects.get(student_id='cs001')
+        Payment.objects.create(fee=fee, amount=Decimal('5.00'))
+        self.assertEqual(self.client.get(self.url).data['total_payments'], 26)
+        other = Semester.objects.create(name='Semester 2', semester_code='S2', program='BCS', department=self.department)
+        fee.semester = other
+        fee.save()
+        moved_url = f'/api/academics/departments/{self.department.department_id}/semesters/{other.semester_id}/payments/'
+        self.assertEqual(self.client.get(moved_url).data['total_payments'], 26)
+        self.assertEqual(self.client.get(self.url).data['total_payments'], 0)
+
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(moved_url, {'export': 'csv'}).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class FeeReceiptTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.department = Department.objects.create(name='Computer Science', code='CS')
+        self.semester = Semester.objects.create(name='Semester 1', semester_code='S1', program='BCS', department=self.department)
+        self.students = [
+            Student.objects.create(student_id=f'cs00{i}', name=f'Student (#{i})', email=f's{i}@example.com', phone='123',
+                                   date_of_birth=date(2000, 1, 1), department=self.department, semester=self.semester)
+            for i in range(3)
+        ]
+        self.fee = Fee.objects.get(student=self.students[0])
+        self.url = f'/api/academics/fees/{self.fee.fee_id}/receipt/'
+        self.client.force_authenticate(User.objects.create_user(username='admin', email='admin@example.com', password='pass', role='admin'))
+
+    def test_receipt_is_one_query_and_follows_payments(self):
+        with self.assertNumQueries(1):
+            receipt = self.client.get(self.url).data['receipt']
+        self.assertIn('Department: Computer Science', receipt)
+        self.assertNotIn('Last Payment', receipt)
+
+        Payment.objects.create(fee=self.fee, amount=Decimal('200.00'), transaction_id='TX-1')
+        receipt = self.fee.receipt_text()
+        self.assertIn('Paid Amount: $200.00', receipt)
+        self.assertIn('(Cash, ref TX-1)', receipt)
+
+    def test_pdf_receipt_is_cached_until_the_fee_changes(self):
+        from .services import receipts
+        first = self.client.get(self.url, {'export': 'pdf'})
+        self.assertEqual(first['Content-Type'], 'application/pdf')
+        self.assertTrue(first.content.startswith(b'%PDF-1.4') and first.content.endswith(b'%%EOF\n'))
+        self.assertIn(b'(Student: Student \\(#0\\))', first.content)
+        data = receipts.receipts(Fee.objects.filter(pk=self.fee.pk))[0]
+        self.assertEqual(cache.get(receipts.receipt_cache_key('pdf', data)), first.content)
+
+        Payment.objects.create(fee=self.fee, amount=Decimal('200.00'))
+        changed = receipts.receipts(Fee.objects.filter(pk=self.fee.pk))[0]
+        self.assertNotEqual(receipts.receipt_cache_key('pdf', changed), receipts.receipt_cache_key('pdf', data))
+        self.assertIn(b'Paid Amount: $200.00', self.client.get(self.url, {'export': 'pdf'}).content)
+
+    def test_receipt_is_only_for_admins_and_the_fee_student(self):
+        # Student users are linked to the student with their email
+        owner = User.objects.create_user(username='cs000', email='s0@example.com', password='pass', role='student')
+        other = User.objects.create_user(username='cs001', email='s1@example.com', password='pass', role='student')
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get(self.url, {'export': 'pdf'}).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(owner)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+    def test_bulk_receipts_are_rendered_by_a_process_pool_into_a_zip(self):
+        import io
+        import zipfile
+        from .services.receipts import write_receipts_zip
+        output = io.BytesIO()
+        count = write_receipts_zip(Fee.objects.filter(semester=self.semester).order_by('fee_id'), output, workers=2)
+        self.assertEqual(count, 3)
+        with zipfile.ZipFile(output) as archive:
+            self.assertEqual(sorted(archive.namelist()), [f'cs00{i}-fee{Fee.objects.get(student_id=f"cs00{i}").pk}.pdf' for i in range(3)])
+            self.assertTrue(all(archive.read(name).startswith(b'%PDF') for name in archive.namelist()))
+
+    def test_pool_is_fed_bounded_batches(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from .services.receipts import _receipt, _render_in_pool, load_receipts
+        read = []
+
+        def jobs():
+            for _ in range(5):
+                for row in load_receipts(Fee.objects.order_by('fee_id')):
+                    read.append(row['fee_id'])
+                    yield 'text', _receipt(row)
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            files = _render_in_pool(pool, jobs(), chunk_size=2, in_flight=2)
+            first = next(files)
+            # Two batches of two were submitted before the first result was taken
+            self.assertEqual(len(read), 4)
+            self.assertEqual(len([first, *files]), 15)
+
+
+class FeeCollectionSummaryTests(APITestCase):
+    def setUp(self):
+        self.department = Department.objects.create(name='Computer Science', code='CS')
+        self.semester = Semester.objects.create(name='Semester 1', semester_code='S1', program='BCS', department=self.department)
+        self.students = [
+            Student.objects.create(student_id=f'cs00{i}', name=f'Student {i}', email=f's{i}@example.com', phone='123',
+                                   date_of_birth=date(2000, 1, 1), department=self.department, semester=self.semester)
+            for i in range(3)
+        ]
+        self.fees = [Fee.objects.get(student=student) for student in self.students]
+        self.client.force_authenticate(User.objects.create_user(username='admin', email='admin@example.com', password='pass', role='admin'))
+
+    def test_fee_writes_keep_the_summary_in_step(self):
+        from .services.fee_summary import check_summary, rebuild_summary
+        Payment.objects.create(fee=self.fees[0], amount=Decimal('1000.00'))
+        payment = Payment.objects.create(fee=self.fees[1], amount=Decimal('30000.00'))
+        payment.amount = Decimal('20000.00')
+        payment.save()
+        Payment.objects.create(fee=self.fees[2], amount=Decimal('500.00')).delete()
+        fee = Fee.objects.get(pk=self.fees[2].pk)
+        fee.amount = Decimal('28000.00')
+        fee.save()
+        self.students[0].delete()
+        self.assertEqual(check_summary(), {})
+
+        statuses = dict(FeeCollectionSummary.objects.values('status').annotate(n=Sum('fee_count')).values_list('status', 'n'))
+        self.assertEqual(statuses, {Fee.UNPAID: 1, Fee.PARTIAL: 1, Fee.PAID: 0})
+        rebuild_summary()
+        self.assertEqual(check_summary(), {})
+
+    def test_a_payment_moves_one_bucket_once_the_day_is_open(self):
+        Payment.objects.create(fee=self.fees[0], amount=Decimal('100.00'))
+        payment = Payment(fee=self.fees[0], amount=Decimal('200.00'))
+        # payment insert, then savepoint, fee row, fee UPDATE, Partial bucket UPDATE, ledger INSERT, release
+        with self.assertNumQueries(7):
+            payment.save()
+
+    def test_analytics_time_series_and_drill_down(self):
+        from .services.fee_summary import fee_row, record_changes
+        other = Department.objects.create(name='Mathematics', code='MA')
+        other_semester = Semester.objects.create(name='Semester 1', semester_code='M1', program='BSM', department=other)
+        Student.objects.create(student_id='ma001', name='Maths Student', email='m@example.com', phone='123',
+                               date_of_birth=date(2000, 1, 1), department=other, semester=other_semester)
+        FeeCollectionSummary.objects.all().delete()
+        # Book the three CS fees on March 1st and two payments on the 3rd and 10th
+        rows = [fee_row(fee) for fee in self.fees]
+        record_changes([(None, row) for row in rows], date(2025, 3, 1))
+        half = {**rows[0], 'status': Fee.PARTIAL, 'paid_amount': Decimal('15000.00'), 'balance': Decimal('15000.00')}
+        record_changes([(rows[0], half)], date(2025, 3, 3))
+        record_changes([(half, {**half, 'status': Fee.PAID, 'paid_amount': Decimal('30000.00'), 'balance': Decimal('0.00')})],
+                       date(2025, 3, 10))
+
+        url = '/api/academics/analytics/fees/'
+        with self.assertNumQueries(3):
+            data = self.client.get(url, {'date_from': '2025-03-01', 'date_to': '2025-03-05'}).data
+        self.assertEqual((data['totals']['fee_count'], data['totals']['paid_amount']), (3, Decimal('15000.00')))
+        self.assertEqual(data['totals']['collection_rate'], round(15000 / 90000 * 100, 2))
+        self.assertEqual([(day['period'], day['collected'], day['balance']) for day in data['series']], [
+            (date(2025, 3, 1), 0, Decimal('90000.00')),
+            (date(2025, 3, 2), 0, Decimal('90000.00')),
+            (date(2025, 3, 3), Decimal('15000.00'), Decimal('75000.00')),
+            (date(2025, 3, 4), 0, Decimal('75000.00')),
+            (date(2025, 3, 5), 0, Decimal('75000.00')),
+        ])
+        self.assertEqual([group['name'] for group in data['breakdown']], ['Computer Science'])
+
+        data = self.client.get(url, {'department_id': self.department.department_id, 'interval': 'week',
+                                     'date_from': '2025-03-01', 'date_to': '2025-03-31'}).data
+        self.assertEqual(data['by_status'][Fee.PAID]['fee_count'], 1)
+        self.assertEqual(data['breakdown'][0]['semester_id'], self.semester.semester_id)
+        self.assertEqual(data['series'][0]['period'], date(2025, 2, 24))
+        self.assertEqual(sum(week['collected'] for week in data['series']), Decimal('30000.00'))
+        self.assertEqual(self.client.get(url, {'interval': 'year'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.force_authenticate(User.objects.create_user(username='teacher', password='pass', role='instructor'))
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class StudentDashboardTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.department = Department.objects.create(name='Computer Science', code='CS')
+        self.semester = Semester.objects.create(name='Semester 1', semester_code='S1', program='BCS', department=self.department)
+        self.student = Student.objects.create(
+            name='John Doe',
+            email='john@example.com',
+            phone='123',
+            date_of_birth=date(2000, 1, 1),
+            department=self.department,
+            semester=self.semester,
+        )
+        for i in range(3):
+            course = Course.objects.create(name=f'Course {i}', code=f'CS10{i}', semester=self.semester)
+            Result.objects.create(student=self.student, course=course, exam_type='Mid', mid_term_marks=20)
+        Attendance.objects.create(student=self.student, date=date(2025, 1, 1), status=Attendance.PRESENT)
+        Attendance.objects.create(student=self.student, date=date(2025, 1, 2), status=Attendance.ABSENT)
+        self.url = f'/api/academics/dashboard/{self.student.student_id}/'
+        cache.clear()
+
+    def test_dashboard_queries_and_cache_hit(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertEqual(response.data['attendance_summary'], {'total_classes': 2, 'present_classes': 1, 'percentage': 50.0})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+    def test_etag_revalidation_and_invalidation(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.create(student=self.student, date=date(2025, 1, 3), status=Attendance.PRESENT)
+            # Kept until the write commits, so a concurrent read can't cache the old state again
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['attendance_summary']['total_classes'], 3)
+
+    def test_unknown_student(self):
+        self.assertEqual(self.client.get('/api/academics/dashboard/nobody/').status_code, status.HTTP_404_NOT_FOUND)
+
+
+class AcademicStandingTests(TestCase):
+    def setUp(self):
+        self.department = Department.objects.create(name='Computer Science', code='CS')
+        self.semester = Semester.objects.create(name='Semester 1', semester_code='S1', program='BCS', department=self.department)
+        self.next_semester = Semester.objects.create(name='Semester 2', semester_code='S2', program='BCS', department=self.department)
+        self.major = Course.objects.create(name='Data Structures', code='CS201', credits=4, semester=self.semester)
+        self.minor = Course.objects.create(name='Ethics', code='HU101', credits=2, semester=self.semester)
+        self.students = [
+            Student.objects.create(
+                name=f'Student {i}',
+                email=f'student{i}@example.com',
+                phone='123',
+                date_of_birth=date(2000, 1, 1),
+                department=self.department,
+                semester=self.semester,
+            )
+            for i in range(3)
+        ]
+        Fee.objects.filter(student__in=self.students).update(status=Fee.PAID, balance=0)
+
+    def add_results(self, student, *rows):
+        Result.objects.bulk_create([
+            Result(student=student, course=course, exam_type=exam_type, exam_date=date(2025, 1, day),
+                   grade=grade, total_marks=100, obtained_marks=0)
+            for course, exam_type, grade, day in rows
+        ])
+
+    def test_cgpa_is_weighted_by_course_credits(self):
+        first, second, third = self.students
+        self.add_results(first, (self.major, 'Final', 'A', 1), (self.minor, 'Final', 'C', 2))
+        self.add_results(second, (self.minor, 'Final', 'B', 1))
+
+        standings = cgpa_for_students(Student.objects.filter(department=self.department))
+
+        self.assertEqual(standings[first.pk], {'cgpa': 3.33, 'total_credits': 6, 'grade_points': 20.0})
+        self.assertEqual(standings[second.pk], {'cgpa': 3.0, 'total_credits': 2, 'grade_points': 6.0})
+        self.assertEqual(standings[third.pk], {'cgpa': 0, 'total_credits': 0, 'grade_points': 0})
+
+    def test_semester_gpa_only_counts_courses_of_that_semester(self):
+        student = self.students[0]
+        later = Course.objects.create(name='Compilers', code='CS301', credits=3, semester=self.next_semester)
+        self.add_results(student, (self.major, 'Final', 'B', 1), (later, 'Final', 'F', 2))
+
+        gpa = semester_gpa_for_students(Student.objects.filter(pk=student.pk), self.semester)
+
+        self.assertEqual(gpa[student.pk]['cgpa'], 3.0)
+        self.assertEqual(gpa[student.pk]['total_credits'], 4)
+
+    def test_promotion_status_for_department_in_fixed_queries(self):
+        promoted, dropped, blocked = self.students
+        self.add_results(promoted, (self.major, 'Final', 'F', 1), (self.minor, 'Final', 'B', 2))
+        self.add_results(dropped, *[(self.major, 'Final', 'F', day) for day in (1, 2, 3)])
+        self.add_results(blocked, (self.major, 'Final', 'A', 1))
+        Fee.objects.filter(student=blocked).update(status=Fee.UNPAID, balance=Decimal('500.00'))
+
+        with self.assertNumQueries(4):
+            statuses = promotion_status_for_students(Student.objects.filter(department=self.department))
+
+        self.assertEqual(statuses[promoted.pk]['status'], 'promote')
+        self.assertEqual(statuses[promoted.pk]['next_semester_id'], self.next_semester.semester_id)
+        self.assertEqual(statuses[dropped.pk]['status'], 'dropped')
+        self.assertEqual(statuses[blocked.pk]['status'], 'blocked')
+
+    def test_final_results_record_the_weighted_gpa(self):
+        from .models import StudentAcademicHistory
+        from .signals_updated import process_final_results
+        student = self.students[0]
+        earlier = Course.objects.create(name='Calculus', code='MA101', credits=3)
+        self.add_results(student, (earlier, 'Final', 'F', 1), (self.major, 'Final', 'A', 2), (self.minor, 'Final', 'C', 3))
+
+        process_final_results(student, self.semester)
+
+        student.refresh_from_db()
+        self.assertEqual((student.gpa, student.cgpa), (3.33, 2.22))
+        history = StudentAcademicHistory.objects.get(student=student)
+        self.assertEqual((history.gpa, history.cgpa), (3.33, 2.22))
+        self.assertEqual(student.semester, self.next_semester)
+
+    def test_has_consecutive_failures(self):
+        self.assertTrue(has_consecutive_failures(['A', 'F', 'F', 'F']))
+        self.assertFalse(has_consecutive_failures(['F', 'F', 'B', 'F']))
+
+
+class DepartmentPromotionTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.department = Department.objects.create(name='Computer Science', code='CS')
+        self.semester = Semester.objects.create(name='Semester 1', semester_code='S1', program='BCS', department=self.department)
+        self.next_semester = Semester.objects.create(name='Semester 2', semester_code='S2', program='BCS', department=self.department)
+        self.course = Course.objects.create(name='Data Structures', code='CS201', semester=self.semester)
+        self.next_courses = [
+            Course.objects.create(name=f'Course {i}', code=f'CS30{i}', semester=self.next_semester)
+            for i in range(2)
+        ]
+        self.students = []
+        for i in range(4):
+            student = Student.objects.create(
+                name=f'Student {i}',
+                email=f'student{i}@example.com',
+                phone='123',
+                date_of_birth=date(2000, 1, 1),
+                department=self.department,
+                semester=self.semester,
+            )
+            student.courses.set([self.course])
+            self.students.append(student)
+        Fee.objects.filter(student__in=self.students).update(status=Fee.PAID, paid_amount=F('amount'), balance=0)
+
+        eligible, second, dropped, blocked = self.students
+        Result.objects.bulk_create(
+            [Result(student=s, course=self.course, exam_type='Final', grade='B', total_marks=100, obtained_marks=70)
+             for s in (eligible, second, blocked)]
+            + [Result(student=dropped, course=self.course, exam_type='Final', exam_date=date(2025, 1, day),
+                      grade='F', total_marks=100, obtained_marks=10) for day in (1, 2, 3)]
+        )
+        Fee.objects.filter(student=blocked).update(status=Fee.UNPAID, paid_amount=0, balance=F('amount'))
+        self.url = f'/api/academics/departments/{self.department.department_id}/semesters/{self.semester.semester_id}/promotion/'
+        self.admin = User.objects.create_user(username='admin', email='admin@example.com', password='pass', role='admin')
+
+    def test_dry_run_reports_without_changes(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.force_authenticate(User.objects.create_user(username='teacher', password='pass', role='instructor'))
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['student_id'] for row in response.data['promoted']], [s.pk for s in self.students[:2]])
+        self.assertEqual(response.data['skipped']['dropped'][0]['student_id'], self.students[2].pk)
+        self.assertEqual(response.data['skipped']['blocked'][0]['student_id'], self.students[3].pk)
+        self.assertFalse(Student.objects.filter(semester=self.next_semester).exists())
+
+    def test_promotion_moves_students_fees_and_courses(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(self.url, {'due_date': '2025-06-01'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['fees_created'], 2)
+        self.assertEqual(response.data['courses_assigned'], 4)
+        promoted = Student.objects.filter(semester=self.next_semester)
+        self.assertEqual(set(promoted.values_list('pk', flat=True)), {s.pk for s in self.students[:2]})
+        for student in promoted:
+            self.assertEqual(set(student.courses.all()), set(self.next_courses))
+            fee = Fee.objects.get(student=student, semester=self.next_semester)
+            self.assertEqual(fee.status, Fee.UNPAID)
+            self.assertEqual(fee.balance, fee.amount)
+            self.assertEqual(fee.due_date, date(2025, 6, 1))
+        self.assertEqual(Student.objects.get(pk=self.students[3].pk).semester, self.semester)
+
+    def test_promotion_runs_in_fixed_queries(self):
+        # includes reading the balances to write off and opening the new semester's summary bucket
+        with self.assertNumQueries(20):
+            promote_department(self.department.department_id, self.semester.semester_id)
+
+
+class StudentFeeStatusListTests(APITestCase):
+    def setUp(self):
+        self.department = Department.objects.create(name='Computer Science', code='CS')
+        self.semester = Semester.objects.create(name='Semester 1', semester_code='S1', program='BCS', department=self.department)
+        self.courses = [
+            Course.objects.create(name=f'Course {i}', code=f'CS10{i}', semester=self.semester)
+            for i in range(3)
+        ]
+        self.url = f'/api/academics/departments/{self.department.department_id}/semesters/{self.semester.semester_id}/students/fees/'
+        self.created = 0
+
+    def enroll(self, count):
+        """Bulk-create ``count`` students with courses, a fee and two payments each."""
+        students = Student.objects.bulk_create([
+            Student(
+                student_id=f'cs{self.created + i:05d}',
+                name=f'Student {self.created + i}',
+                email=f'student{self.created + i}@example.com',
+                phone='123',
+                date_of_birth=date(2000, 1, 1),
+                department=self.department,
+                semester=self.semester,
+            )
+            for i in range(count)
+        ])
+        self.created += count
+        Student.courses.through.objects.bulk_create([
+            Student.courses.through(student_id=student.pk, course_id=course.course_id)
+            for student in students for course in self.courses
+        ])
+        fees = Fee.objects.bulk_create([
+            Fee(student=student, department=self.department, semester=self.semester, amount=Decimal('30000.00'),
+                paid_amount=Decimal('1000.00'), balance=Decimal('29000.00'), status=Fee.PARTIAL, due_date=date(2025, 1, 1))
+            for student in students
+        ])
+        Payment.objects.bulk_create([
+            Payment(fee=fee, amount=Decimal('500.00'))
+            for fee in fees for _ in range(2)
+        ])
+
+    def fetch(self, expected_queries):
+        with self.assertNumQueries(expected_queries):
+            return self.client.get(self.url, {'page_size': 1000})
+
+    def test_query_count_is_flat_from_10_to_5000_students(self):
+        # count, students, courses, fees, payments
+        self.enroll(10)
+        response = self.fetch(5)
+        self.assertEqual(response.data['total_students'], 10)
+        self.assertEqual(len(response.data['students'][0]['courses']), 3)
+        self.assertEqual(len(response.data['students'][0]['fee_info']['payments']), 2)
+
+        self.enroll(4990)
+        response = self.fetch(5)
+        self.assertEqual(response.data['total_students'], 5000)
+        self.assertEqual(len(response.data['students']), 1000)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_student_without_fee_gets_placeholder(self):
+        Student.objects.bulk_create([
+            Student(student_id='cs99999', name='No Fee', email='nofee@example.com', phone='123',
+                    date_of_birth=date(2000, 1, 1), department=self.department, semester=self.semester)
+        ])
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['students'][0]['fee_info']['status'], 'No Fee Record')
+
+    def test_empty_class_returns_404(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class SyntheticSeedingTests(TestCase):
+    def test_seed_is_deterministic_and_rebuilds_derived_fields(self):
+        counts = seed_university(departments=1, semesters=2, courses=2, students=3, sessions_per_year=4, prefix='AA')
+        seed_university(departments=1, semesters=2, courses=2, students=3, sessions_per_year=4, prefix='BB')
+
+        self.assertEqual(counts['students'], 6)
+        self.assertEqual(counts['attendance'], 24)
+        self.assertEqual(counts['fees'], 9)
+        first = list(Result.objects.filter(student__department__code='AA001').order_by('result_id').values_list('grade', flat=True))
+        second = list(Result.objects.filter(student__department__code='BB001').order_by('result_id').values_list('grade', flat=True))
+        self.assertNotEqual(first, [])
+        self.assertEqual(first, second)
+
+        student = Student.objects.filter(department__code='AA001').first()
+        present = student.attendances.filter(status=Attendance.PRESENT).count()
+        self.assertEqual(student.attendance_percentage, round(present / 4 * 100, 2))
+        self.assertAlmostEqual(student.cgpa, cgpa_for_students(Student.objects.filter(pk=student.pk))[student.pk]['cgpa'], delta=0.01)
+
+
+class MediaStorageTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def save(self, name, content):
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+        return default_storage.save(name, ContentFile(content))
+
+    def test_identical_content_is_stored_once(self):
+        first = self.save("student_images/one.JPG", b"same bytes")
+        second = self.save("student_images/two.jpg", b"same bytes")
+        other = self.save("student_images/three.jpg", b"other bytes")
+        self.assertEqual(first, second)
+        self.assertRegex(first, r"^student_images/[0-9a-f]{32}\.jpg$")
+        self.assertNotEqual(first, other)
+        self.assertEqual(len(os.listdir(os.path.join(self.media_root, "student_images"))), 2)
+
+    def test_conditional_and_range_requests(self):
+        name = self.save("student_images/photo.png", b"0123456789")
+        response = self.client.get(f"/media/{name}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
+        self.assertIn("immutable", response["Cache-Control"])
+        etag = response["ETag"]
+
+        self.assertEqual(self.client.get(f"/media/{name}", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        response = self.client.get(f"/media/{name}", HTTP_RANGE="bytes=2-4")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 2-4/10")
+        self.assertEqual(b"".join(response.streaming_content), b"234")
+
+        response = self.client.get(f"/media/{name}", HTTP_RANGE="bytes=-3")
+        self.assertEqual(b"".join(response.streaming_content), b"789")
+
+        # A stale If-Range validator gets the whole file
+        response = self.client.get(f"/media/{name}", HTTP_RANGE="bytes=2-4", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.client.get(f"/media/{name}", HTTP_RANGE="bytes=20-").status_code, 416)
+        self.assertEqual(self.client.get("/media/../manage.py").status_code, 404)
+
+        with override_settings(MEDIA_ACCEL_REDIRECT="/protected-media/"):
+            response = self.client.get(f"/media/{name}")
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected-media/{name}")
+        self.assertEqual(response.content, b"")
+
+    def test_garbage_collection_keeps_referenced_and_recent_files(self):
+        department = Department.objects.create(name="Computer Science", code="CS")
+        student = Student.objects.create(name="Ali", email="ali@example.com", phone="1",
+                                         date_of_birth=date(2000, 1, 1), department=department)
+        kept = self.save("student_images/kept.jpg", b"referenced")
+        thumbnail = self.save("student_images/thumb.webp", b"thumbnail")
+        Student.objects.filter(pk=student.pk).update(image=kept, image_renditions={"thumbnail": thumbnail})
+        orphan = self.save("student_images/orphan.jpg", b"orphan")
+
+        removed, _ = collect_garbage()
+        self.assertEqual(removed, [])  # within the grace period
+
+        removed, freed = collect_garbage(dry_run=True, grace=timedelta(0))
+        self.assertEqual((removed, freed), ([orphan], 6))
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, orphan)))
+
+        collect_garbage(grace=timedelta(0))
+        remaining = {f"student_images/{name}" for name in os.listdir(os.path.join(self.media_root, "student_images"))}
+        self.assertEqual(remaining, {kept, thumbnail})
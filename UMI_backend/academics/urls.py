@@ -5,10 +5,14 @@ from .views import (
     DepartmentCourseResultsView,
     DepartmentCoursesView,
     StudentPromotionActionView,
+    DepartmentPromotionView,
     StudentFeeStatusListView,
     StudentFeesListView,
     PaymentListCreateView,
+    PaymentImportView,
     DepartmentSemesterPaymentHistoryView,
+    FeeReceiptView,
+    FeeCollectionAnalyticsView,
     
     
 )
@@ -26,6 +30,7 @@ urlpatterns = [
     path("students/<str:student_id>/results/professional/", StudentResultListCreateEnhanced.as_view()),
     path("departments/<int:department_id>/courses/<int:course_id>/results/professional/", DepartmentCourseResultsView.as_view()),
     path("students/<str:student_id>/promotion/professional/", StudentPromotionActionView.as_view()),
+    path("departments/<int:department_id>/semesters/<int:semester_id>/promotion/", DepartmentPromotionView.as_view()),
 
     # Fee management endpoints for individual students
     path("students/<str:student_id>/fees/", StudentFeesListView.as_view()),
@@ -36,6 +41,9 @@ urlpatterns = [
     # Fee management endpoints
     path("departments/<int:department_id>/semesters/<int:semester_id>/students/fees/", StudentFeeStatusListView.as_view()),
     path("fees/<int:fee_id>/payments/", PaymentListCreateView.as_view()),
+    path("fees/payments/import/", PaymentImportView.as_view()),
+    path("fees/<int:fee_id>/receipt/", FeeReceiptView.as_view()),
+    path("analytics/fees/", FeeCollectionAnalyticsView.as_view()),
     path("departments/<int:department_id>/semesters/<int:semester_id>/payments/", DepartmentSemesterPaymentHistoryView.as_view()),
     path("dashboard/<int:student_id>/", StudentDashboardView, name="student-dashboard"),
 
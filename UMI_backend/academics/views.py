@@ -1,15 +1,34 @@
+import logging
+
 from rest_framework import generics
 from .models import Department, Semester, Course, Attendance, Result, Fee, Scholarship
 from .serializers import DepartmentSerializer, SemesterSerializer, CourseSerializer, AttendanceSerializer, ResultSerializer, FeeSerializer, ScholarshipSerializer
-from .permissions import IsAdminOrInstructorForResultsAttendance, IsAdminRoleOrReadOnly, AllowAnyReadOnly, FeePaymentRequired
+from .permissions import (
+    IsAdminOrInstructorForResultsAttendance, IsAdminRole, IsAdminRoleOrFeeStudent, IsAdminRoleOrReadOnly, AllowAnyReadOnly,
+    FeePaymentRequired,
+)
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Avg, Count, Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.pagination import PageNumberPagination
+from django.db.models import Avg, Count, Prefetch, Q
 from students.models import Student
 from students.serializers import StudentSerializer
-from .models import Payment
+from students.services.admissions import iter_upload_rows
+from .models import FeeLedgerEntry, Payment
 from .serializers import PaymentSerializer
+from .services.academic_standing import academic_standing
+from .services import fee_summary, ledger, payment_history, receipts
+from .services.deferred import deferred_recompute
+from .services.payment_import import import_payments
+from .services.promotion import promote_department
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from monitoring.structured_logging import request_keys
+
+logger = logging.getLogger(__name__)
 
 
 class StudentResultListCreateEnhanced(generics.ListCreateAPIView):
@@ -33,22 +52,28 @@ class StudentResultListCreateEnhanced(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         serializer.save(student_id=self.kwargs["student_id"])
 
+    def create(self, request, *args, **kwargs):
+        """Accept one result or a list of results; a list is saved in one transaction
+        with the student's GPA/final-result processing run once at the end."""
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic(), deferred_recompute():
+            self.perform_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
         serializer = self.get_serializer(queryset, many=True)
 
-        # Calculate CGPA and promotion status
+        # Calculate CGPA and promotion status (promotion checks fee payment)
         student_id = self.kwargs["student_id"]
         student = Student.objects.get(student_id=student_id)
-
-        # Get all results for CGPA calculation
-        all_results = Result.objects.filter(student_id=student_id)
-
-        # Calculate CGPA
-        cgpa_data = self.calculate_cgpa(all_results)
-
-        # Check promotion/dropping logic with fee validation
-        promotion_data = self.check_promotion_logic(student, all_results)
+        standing = academic_standing(Student.objects.filter(pk=student.pk))[student.pk]
+        cgpa_data = standing['cgpa']
+        promotion_data = standing['promotion_status']
 
         # Get all assigned courses for the student (only enrolled courses)
         assigned_courses = student.courses.all()
@@ -63,104 +88,6 @@ class StudentResultListCreateEnhanced(generics.ListCreateAPIView):
 
         return Response(response_data)
 
-    def calculate_cgpa(self, results):
-        """Calculate CGPA from all results"""
-        if not results:
-            return {'cgpa': 0.0, 'total_credits': 0, 'grade_points': 0}
-
-        total_grade_points = 0
-        total_credits = 0
-
-        for result in results:
-            # Get course credits (assuming 3 credits default)
-            credits = getattr(result, 'course_credits', 3) if hasattr(result, 'course_credits') else 3
-
-            # Convert grade to grade points
-            grade_points = self.grade_to_points(result.grade)
-            total_grade_points += grade_points * credits
-            total_credits += credits
-
-        cgpa = total_grade_points / total_credits if total_credits > 0 else 0
-
-        return {
-            'cgpa': round(cgpa, 2),
-            'total_credits': total_credits,
-            'grade_points': total_grade_points
-        }
-
-    def grade_to_points(self, grade):
-        """Convert letter grade to grade points"""
-        grade_map = {
-            'A+': 4.0, 'A': 4.0, 'A-': 3.7,
-            'B+': 3.3, 'B': 3.0, 'B-': 2.7,
-            'C+': 2.3, 'C': 2.0, 'C-': 1.7,
-            'D+': 1.3, 'D': 1.0,
-            'F': 0.0
-        }
-        return grade_map.get(grade.upper(), 0.0)
-
-    def check_promotion_logic(self, student, results):
-        """Check if student should be promoted or dropped"""
-        from .models import Fee
-
-        # Get final exam results (assuming exam_type contains 'final')
-        final_results = results.filter(exam_type__icontains='final')
-
-        if not final_results:
-            return {'status': 'pending', 'message': 'No final results available'}
-
-        # Check for consecutive failures
-        failed_count = 0
-        for result in final_results.order_by('-exam_date'):
-            if result.grade.upper() == 'F':
-                failed_count += 1
-                if failed_count >= 3:
-                    # Drop student
-                    return {
-                        'status': 'dropped',
-                        'message': 'Student dropped due to 3 consecutive failures',
-                        'action': 'drop_student'
-                    }
-            else:
-                failed_count = 0  # Reset on pass
-
-        # Check current semester fee payment
-        current_fee = Fee.objects.filter(
-            student=student,
-            semester=student.semester,
-            status__in=['Unpaid', 'Partial']
-        ).first()
-
-        if current_fee:
-            return {
-                'status': 'blocked',
-                'message': f'Cannot progress - outstanding fee payment of ${current_fee.balance} required',
-                'action': 'fee_payment_required'
-            }
-
-        # If no 3 consecutive failures and fees paid, promote to next semester
-        current_semester = student.semester
-        if current_semester:
-            next_semester_num = current_semester.name.split()[-1]  # Extract number from "Semester X"
-            try:
-                next_semester_num = int(next_semester_num) + 1
-                next_semester = Semester.objects.filter(
-                    department=student.department,
-                    name=f"Semester {next_semester_num}"
-                ).first()
-
-                if next_semester:
-                    return {
-                        'status': 'promote',
-                        'message': f'Promote to {next_semester.name}',
-                        'next_semester_id': next_semester.semester_id,
-                        'action': 'promote_student'
-                    }
-            except (ValueError, TypeError):
-                pass
-
-        return {'status': 'current', 'message': 'Student remains in current semester'}
-
 
 class DepartmentCoursesView(APIView):
     """Get all courses for a department"""
@@ -271,16 +198,39 @@ class StudentFeesListView(APIView):
             )
 
 
+class FeeStatusPagination(PageNumberPagination):
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
 class StudentFeeStatusListView(APIView):
     """List all students in a department and semester with their fee status"""
     permission_classes = [IsAdminRoleOrReadOnly]
+    pagination_class = FeeStatusPagination
 
     def get(self, request, department_id, semester_id):
         try:
-            # Get all students in the department and semester
-            students = Student.objects.filter(department_id=department_id, semester_id=semester_id)
+            # One query each for the students (with department/semester), their
+            # courses, their fees for this semester and those fees' payments
+            semester_fees = Fee.objects.filter(
+                department_id=department_id,
+                semester_id=semester_id
+            ).prefetch_related('payments')
+            students = (
+                Student.objects.filter(department_id=department_id, semester_id=semester_id)
+                .select_related('department', 'semester__department')
+                .prefetch_related(
+                    Prefetch('courses', queryset=Course.objects.select_related('semester')),
+                    Prefetch('fees', queryset=semester_fees, to_attr='semester_fees'),
+                )
+                .order_by('student_id')
+            )
 
-            if not students.exists():
+            paginator = self.pagination_class()
+            page = paginator.paginate_queryset(students, request, view=self)
+
+            if not paginator.page.paginator.count:
                 return Response(
                     {"error": "No students found in this department and semester combination"},
                     status=status.HTTP_404_NOT_FOUND
@@ -288,13 +238,8 @@ class StudentFeeStatusListView(APIView):
 
             student_fee_data = []
 
-            for student in students:
-                # Get fee for this student, department, and semester
-                fee = Fee.objects.filter(
-                    student=student,
-                    department_id=department_id,
-                    semester_id=semester_id
-                ).first()
+            for student in page:
+                fee = student.semester_fees[0] if student.semester_fees else None
 
                 if fee:
                     fee_data = FeeSerializer(fee).data
@@ -322,10 +267,15 @@ class StudentFeeStatusListView(APIView):
             return Response({
                 'department_id': department_id,
                 'semester_id': semester_id,
-                'total_students': len(student_fee_data),
+                'total_students': paginator.page.paginator.count,
+                'count': paginator.page.paginator.count,
+                'next': paginator.get_next_link(),
+                'previous': paginator.get_previous_link(),
                 'students': student_fee_data
             })
 
+        except NotFound:
+            raise
         except Exception as e:
             return Response(
                 {'error': str(e)},
@@ -347,93 +297,72 @@ class PaymentListCreateView(generics.ListCreateAPIView):
         fee = Fee.objects.get(fee_id=fee_id)
         serializer.save(fee=fee)
 
+    def replay(self, transaction_id, fee_id):
+        """
+        Response for a transaction_id that was already recorded: the same
+        payment again if it was for this fee (a retried request), else a conflict.
+        """
+        payment = Payment.objects.filter(transaction_id=transaction_id).first()
+        if payment is None:
+            return None
+        if str(payment.fee_id) != str(fee_id):
+            return Response(
+                {'error': f'Transaction {transaction_id} is already recorded for fee {payment.fee_id}'},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response(self.get_serializer(payment).data, status=status.HTTP_200_OK)
+
     def create(self, request, *args, **kwargs):
         """Override create method to add better error handling"""
+        # transaction_id is the idempotency key: retries return the recorded payment
+        transaction_id = str(request.data.get('transaction_id') or '').strip()
+        if transaction_id:
+            replayed = self.replay(transaction_id, kwargs.get('fee_id'))
+            if replayed is not None:
+                return replayed
         try:
-            return super().create(request, *args, **kwargs)
+            with transaction.atomic():
+                return super().create(request, *args, **kwargs)
+        except IntegrityError:
+            # A concurrent request recorded the same transaction_id first
+            replayed = self.replay(transaction_id, kwargs.get('fee_id')) if transaction_id else None
+            if replayed is not None:
+                return replayed
+            raise
         except Exception as e:
-            print(f"Payment creation error: {e}")
-            print(f"Request data: {request.data}")
+            logger.warning("Payment creation failed: %s", e, extra={'fee_id': kwargs.get('fee_id'), 'fields': request_keys(request)})
             return Response(
                 {'error': f'Payment creation failed: {str(e)}'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-    def calculate_cgpa(self, results):
-        """Calculate CGPA from results"""
-        if not results:
-            return {'cgpa': 0.0, 'total_credits': 0, 'grade_points': 0}
 
-        total_grade_points = 0
-        total_credits = 0
-
-        for result in results:
-            credits = getattr(result, 'course_credits', 3) if hasattr(result, 'course_credits') else 3
-            grade_points = self.grade_to_points(result.grade)
-            total_grade_points += grade_points * credits
-            total_credits += credits
-
-        cgpa = total_grade_points / total_credits if total_credits > 0 else 0
-
-        return {
-            'cgpa': round(cgpa, 2),
-            'total_credits': total_credits,
-            'grade_points': total_grade_points
-        }
-
-    def grade_to_points(self, grade):
-        """Convert letter grade to grade points"""
-        grade_map = {
-            'A+': 4.0, 'A': 4.0, 'A-': 3.7,
-            'B+': 3.3, 'B': 3.0, 'B-': 2.7,
-            'C+': 2.3, 'C': 2.0, 'C-': 1.7,
-            'D+': 1.3, 'D': 1.0,
-            'F': 0.0
-        }
-        return grade_map.get(grade.upper(), 0.0)
-
-    def check_promotion_logic(self, student, results):
-        """Check promotion/dropping logic"""
-        final_results = results.filter(exam_type__icontains='final')
-
-        if not final_results:
-            return {'status': 'pending', 'message': 'No final results available'}
-
-        failed_count = 0
-        for result in final_results.order_by('-exam_date'):
-            if result.grade.upper() == 'F':
-                failed_count += 1
-                if failed_count >= 3:
-                    return {
-                        'status': 'dropped',
-                        'message': 'Student dropped due to 3 consecutive failures',
-                        'action': 'drop_student'
-                    }
-            else:
-                failed_count = 0
-
-        # Promote logic
-        current_semester = student.semester
-        if current_semester:
-            next_semester_num = current_semester.name.split()[-1]
-            try:
-                next_semester_num = int(next_semester_num) + 1
-                next_semester = Semester.objects.filter(
-                    department=student.department,
-                    name=f"Semester {next_semester_num}"
-                ).first()
-
-                if next_semester:
-                    return {
-                        'status': 'promote',
-                        'message': f'Promote to {next_semester.name}',
-                        'next_semester_id': next_semester.semester_id,
-                        'action': 'promote_student'
-                    }
-            except (ValueError, TypeError):
-                pass
+class PaymentImportView(APIView):
+    """
+    POST /api/academics/fees/payments/import/
+    Record the payments of a bank statement (CSV or XLSX, field "file").
+    Columns: transaction_id, amount, and fee_id or student_id (optionally
+    semester_id), plus payment_method and notes. Rows whose transaction_id
+    is already recorded are reported as duplicates, rows without a matching
+    fee as unmatched.
+    """
+    permission_classes = [IsAdminRoleOrReadOnly]
+    parser_classes = [MultiPartParser, FormParser]
 
-        return {'status': 'current', 'message': 'Student remains in current semester'}
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            report = import_payments(iter_upload_rows(upload))
+        except ValidationError as e:
+            return Response({'error': e.detail[0] if isinstance(e.detail, list) else e.detail},
+                            status=status.HTTP_400_BAD_REQUEST)
+        logger.info("Payment import finished", extra={
+            'total_rows': report['total_rows'], 'payments_created': report['created'],
+            'duplicates': len(report['duplicates']), 'unmatched': len(report['unmatched']),
+        })
+        return Response(report, status=status.HTTP_201_CREATED if report['created'] else status.HTTP_200_OK)
 
 
 class StudentPromotionActionView(APIView):
@@ -456,12 +385,10 @@ class StudentPromotionActionView(APIView):
                         semester=student.semester
                     ).first()
 
-                    if current_fee:
+                    if current_fee and current_fee.paid_amount < current_fee.amount:
                         # Clear any outstanding balance by marking as fully paid
-                        current_fee.paid_amount = current_fee.amount
-                        current_fee.balance = 0
-                        current_fee.status = Fee.PAID
-                        current_fee.save(update_fields=['paid_amount', 'balance', 'status'])
+                        ledger.post(current_fee.fee_id, current_fee.amount - current_fee.paid_amount,
+                                    FeeLedgerEntry.WRITE_OFF, description='Cleared on promotion')
 
                     # Update student semester
                     student.semester = next_semester
@@ -523,43 +450,78 @@ class StudentPromotionActionView(APIView):
                 {'error': str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
+
+
+class DepartmentPromotionView(APIView):
+    """Promote all eligible students of a department semester in one batch"""
+    # The dry run lists students and their fee blockers, so it is admin-only too
+    permission_classes = [IsAdminRole]
+
+    def get(self, request, department_id, semester_id):
+        """Dry-run report of who would be promoted and who is held back"""
+        return Response(promote_department(department_id, semester_id, dry_run=True))
+
+    def post(self, request, department_id, semester_id):
+        try:
+            report = promote_department(
+                department_id,
+                semester_id,
+                due_date=request.data.get('due_date'),
+                dry_run=str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+            )
+            return Response(report)
+        except Exception as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+
 class DepartmentSemesterPaymentHistoryView(APIView):
-    """Get all payment history for a department and semester"""
-    permission_classes = [IsAdminRoleOrReadOnly]
+    """
+    Payment history of a department and semester, newest first.
+    Query params: date_from/date_to (YYYY-MM-DD, inclusive), page_size
+    (default 100, max 1000) and cursor (next_cursor of the previous page).
+    export=csv or export=ndjson streams every matching payment instead.
+    Admin users only.
+    """
+    permission_classes = [IsAdminRole]
 
     def get(self, request, department_id, semester_id):
         try:
-            # Get all payments for fees in this department and semester
-            payments = Payment.objects.filter(
-                fee__department_id=department_id,
-                fee__semester_id=semester_id
-            ).select_related('fee__student', 'fee__semester', 'fee__department').order_by('-payment_date')
-
-            payments_data = []
-            for payment in payments:
-                payments_data.append({
-                    'payment_id': payment.payment_id,
-                    'student_name': payment.fee.student.name,
-                    'student_id': payment.fee.student.student_id,
-                    'semester': payment.fee.semester.name,
-                    'department': payment.fee.department.name,
-                    'fee_amount': float(payment.fee.amount),
-                    'payment_date': payment.payment_date,
-                    'amount_paid': float(payment.amount),
-                    'payment_method': payment.payment_method,
-                    'transaction_id': payment.transaction_id,
-                    'notes': payment.notes,
-                    'remaining_balance': float(payment.fee.balance),
-                    'fee_status': payment.fee.status
-                })
+            payments = payment_history.history_queryset(
+                department_id, semester_id, **payment_history.parse_filters(request.query_params)
+            )
 
-            return Response({
+            export_format = request.query_params.get('export')
+            if export_format:
+                if export_format not in ('csv', 'ndjson'):
+                    raise ValidationError({'export': "Expected 'csv' or 'ndjson'"})
+                response = StreamingHttpResponse(
+                    payment_history.export_rows(payments, export_format),
+                    content_type='text/csv' if export_format == 'csv' else 'application/x-ndjson',
+                )
+                filename = f'payments-{department_id}-{semester_id}.{export_format}'
+                response['Content-Disposition'] = f'attachment; filename="{filename}"'
+                return response
+
+            cursor = request.query_params.get('cursor')
+            rows, next_cursor = payment_history.history_page(
+                payments, cursor, payment_history.page_size(request.query_params.get('page_size'))
+            )
+            data = {
                 'department_id': department_id,
                 'semester_id': semester_id,
-                'total_payments': len(payments_data),
-                'payments': payments_data
-            })
+                'payments': rows,
+                'next_cursor': next_cursor,
+            }
+            if not cursor:
+                # Counted on the first page only; following pages just walk the index
+                data['total_payments'] = payments.count()
+            return Response(data)
 
+        except ValidationError as e:
+            return Response({'error': e.detail}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response(
                 {'error': str(e)},
@@ -567,23 +529,72 @@ class DepartmentSemesterPaymentHistoryView(APIView):
             )
 
 
+class FeeCollectionAnalyticsView(APIView):
+    """
+    GET /api/academics/analytics/fees/
+    Fee collection figures from the summary cube: totals and per-status
+    figures as of date_to, a breakdown one level down (departments, or the
+    semesters of department_id) and a time series by interval (day, week
+    or month) from date_from to date_to (default: the last 30 days).
+    Narrow it with department_id and semester_id. Admin users only.
+    """
+    permission_classes = [IsAdminRole]
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            interval = params.get('interval', 'day')
+            if interval not in fee_summary.ANALYTICS_INTERVALS:
+                raise ValidationError({'interval': "Expected 'day', 'week' or 'month'"})
+            department_id = params.get('department_id')
+            semester_id = params.get('semester_id')
+            if not all(value.isdigit() for value in (department_id, semester_id) if value):
+                raise ValidationError({'error': 'department_id and semester_id must be numbers'})
+            date_to = fee_summary.parse_day(params, 'date_to', None)
+            date_from = fee_summary.parse_day(params, 'date_from', None)
+            if date_from and date_to and date_from > date_to:
+                raise ValidationError({'date_from': 'Must not be after date_to'})
+        except ValidationError as e:
+            return Response({'error': e.detail}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(fee_summary.collection_report(
+            department_id=int(department_id) if department_id else None,
+            semester_id=int(semester_id) if semester_id else None,
+            date_from=date_from, date_to=date_to, interval=interval,
+        ))
+
+
 class FeeReceiptView(APIView):
-    """Generate fee receipt for a specific fee"""
-    permission_classes = [IsAdminRoleOrReadOnly]
+    """
+    Fee receipt for a specific fee, as JSON text; export=pdf or export=text
+    downloads it as a file. Rendered receipts are cached until the fee changes.
+    Admin users, or the student the fee belongs to.
+    """
+    permission_classes = [IsAdminRoleOrFeeStudent]
 
     def get(self, request, fee_id):
-        try:
-            fee = Fee.objects.get(fee_id=fee_id)
-            receipt_text = fee.receipt_text()
-            return Response({
-                'fee_id': fee_id,
-                'receipt': receipt_text
-            })
-        except Fee.DoesNotExist:
+        data = receipts.receipt_data(fee_id)
+        if data is None:
             return Response(
                 {'error': 'Fee not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
+        self.check_object_permissions(request, data)
+        try:
+            export_format = request.query_params.get('export')
+            if export_format and export_format not in receipts.RENDERERS:
+                raise ValidationError({'export': "Expected 'pdf' or 'text'"})
+            receipt = receipts.render_cached(data, export_format or 'text')
+            if export_format:
+                response = HttpResponse(receipt, content_type='application/pdf' if export_format == 'pdf' else 'text/plain')
+                response['Content-Disposition'] = f'attachment; filename="{receipts.receipt_filename(data, export_format)}"'
+                return response
+            return Response({
+                'fee_id': fee_id,
+                'receipt': receipt
+            })
+        except ValidationError as e:
+            return Response({'error': e.detail}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response(
                 {'error': str(e)},
@@ -595,67 +606,21 @@ from rest_framework.permissions import AllowAny
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def StudentDashboardView(request, student_id):
-    from students.models import Student
-    from academics.models import Attendance, Result, Fee
-
-    # Get student by student_id field (not id)
-    student = Student.objects.filter(student_id=student_id).first()
+    from django.utils.cache import get_conditional_response
+    from django.utils.http import http_date
+    from .services.dashboard import get_student_dashboard
 
-    if not student:
+    entry = get_student_dashboard(student_id)
+    if not entry:
         return Response({"error": "Student not found"}, status=404)
-    # Basic student info
-    student_info = {
-        "student_id": student.student_id,
-        "name": student.name,
-        "email": student.email,
-        "phone": student.phone,
-        "department": student.department.name if student.department else None,
-        "semester": student.semester.name if student.semester else None,
-        "cgpa": student.cgpa,
-        "gpa": student.gpa,
-        "attendance_percentage": student.attendance_percentage,
-    }
-
-    # Get attendance data
-    attendance_records = Attendance.objects.filter(student=student)
-    total_classes = attendance_records.count()
-    present_classes = attendance_records.filter(status="Present").count()
-    attendance_summary = {
-        "total_classes": total_classes,
-        "present_classes": present_classes,
-        "percentage": round((present_classes / total_classes) * 100, 2) if total_classes > 0 else 0
-    }
-
-    # Get results
-    results = Result.objects.filter(student=student)
-    result_data = []
-    for res in results:
-        result_data.append({
-            "course": res.course.name if res.course else None,
-            "grade": res.grade,
-            "marks": res.obtained_marks,
-            "total_marks": res.total_marks,
-            "percentage": res.percentage,
-        })
 
-    # Get fee details
-    fees = Fee.objects.filter(student=student)
-    fee_data = []
-    for f in fees:
-        fee_data.append({
-            "amount": f.amount,
-            "paid_amount": f.paid_amount,
-            "status": f.status,
-            "balance": f.balance,
-            "due_date": f.due_date,
-        })
+    etag = f'"{entry["etag"]}"'
+    last_modified = int(entry['last_modified'].timestamp())
 
-    # Combine all data
-    data = {
-        "student_info": student_info,
-        "attendance_summary": attendance_summary,
-        "results": result_data,
-        "fees": fee_data,
-    }
+    response = Response(entry['data'], status=200)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'private, no-cache'
 
-    return Response(data, status=200)
\ No newline at end of file
+    # Polling clients revalidate with If-None-Match / If-Modified-Since and get a 304
+    return get_conditional_response(request, etag=etag, last_modified=last_modified, response=response)
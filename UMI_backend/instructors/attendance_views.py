@@ -2,11 +2,14 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from django.db import transaction
 
 from .attendance_serializers import StudentSerializer, BulkAttendanceSerializer
 from .permissions import IsInstructorForDepartment
 from students.models import Student
 from academics.models import Attendance, Department, Semester
+from academics.services.student_metrics import rebuild_students
 from .models import Instructor
 
 
@@ -87,33 +90,74 @@ class BulkAttendanceView(APIView):
             date = serializer.validated_data['date']
             attendances_data = serializer.validated_data['attendances']
 
-            created_attendances = []
-            for attendance_data in attendances_data:
+            # Last entry wins if a student is listed more than once
+            requested = {}
+            errors = []
+            for index, attendance_data in enumerate(attendances_data):
                 student_id = attendance_data['student_id']
-                status_value = attendance_data['status']
-
-                try:
-                    student = Student.objects.get(pk=student_id)
-                    # Create or update attendance record
-                    attendance, created = Attendance.objects.update_or_create(
-                        student=student,
-                        date=date,
-                        defaults={'status': status_value}
-                    )
-                    created_attendances.append({
-                        'student_id': student.student_id,
-                        'student_name': student.name,
-                        'status': attendance.status,
-                        'created': created
+                if student_id in requested:
+                    errors.append({
+                        'row': requested[student_id][0],
+                        'student_id': student_id,
+                        'error': 'Duplicate entry for student; later entry used'
                     })
-                except Student.DoesNotExist:
-                    return Response({"error": f"Student with id {student_id} not found"},
-                                   status=status.HTTP_404_NOT_FOUND)
-
+                requested[student_id] = (index, attendance_data['status'])
+
+            # One IN query for all students, one for the day's existing records
+            students = dict(
+                Student.objects.filter(pk__in=requested.keys()).values_list('student_id', 'name')
+            )
+            existing = set(
+                Attendance.objects.filter(student_id__in=students.keys(), date=date)
+                .values_list('student_id', flat=True)
+            )
+
+            records = []
+            created_attendances = []
+            for student_id, (index, status_value) in requested.items():
+                if student_id not in students:
+                    errors.append({
+                        'row': index,
+                        'student_id': student_id,
+                        'error': f"Student with id {student_id} not found"
+                    })
+                    continue
+                records.append(Attendance(student_id=student_id, date=date, status=status_value))
+                created_attendances.append({
+                    'row': index,
+                    'student_id': student_id,
+                    'student_name': students[student_id],
+                    'status': status_value,
+                    'created': student_id not in existing
+                })
+
+            if not records:
+                return Response({
+                    "error": "None of the given students were found",
+                    "errors": errors
+                }, status=status.HTTP_404_NOT_FOUND)
+
+            with transaction.atomic():
+                Attendance.objects.bulk_create(
+                    records,
+                    update_conflicts=True,
+                    unique_fields=['student', 'date'],
+                    update_fields=['status'],
+                    batch_size=500
+                )
+                # bulk_create bypasses the per-row signals; refresh everyone in one pass
+                rebuild_students(Student.objects.filter(pk__in=students.keys()))
+
+            created_count = sum(1 for row in created_attendances if row['created'])
             return Response({
                 "message": f"Attendance marked for {len(created_attendances)} students",
-                "attendances": created_attendances
+                "created": created_count,
+                "updated": len(created_attendances) - created_count,
+                "attendances": created_attendances,
+                "errors": errors
             }, status=status.HTTP_201_CREATED)
 
+        except ValidationError:
+            raise
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instructors', '0004_migrate_department_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='instructor',
+            name='image_renditions',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -38,6 +38,7 @@ class Instructor(models.Model):
     address = models.CharField(max_length=200, null=True, blank=True)
     experience_years = models.IntegerField(default=0)
     image = models.ImageField(upload_to="instructors/", null=True, blank=True)
+    image_renditions = models.JSONField(default=dict, blank=True)  # see academics.services.images
 
     # --- AI fields ---
     ai_profile_notes = models.TextField(null=True, blank=True)
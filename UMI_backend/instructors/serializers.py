@@ -1,14 +1,19 @@
 from rest_framework import serializers
 from .models import Instructor
+from academics.services.images import rendition_urls
 
 class InstructorSerializer(serializers.ModelSerializer):
     user_email = serializers.EmailField(source='user.email', read_only=True)
     department_name = serializers.CharField(source='department.name', read_only=True)
     department_id = serializers.IntegerField(write_only=True, required=False)
+    image_renditions = serializers.SerializerMethodField()
+
+    def get_image_renditions(self, obj):
+        return rendition_urls(obj, self.context.get('request'))
 
     class Meta:
         model = Instructor
-        fields = ['id', 'user', 'employee_id', 'name', 'phone', 'department', 'department_id', 'designation', 'hire_date', 'date_of_birth', 'gender', 'blood_group', 'salary', 'specialization', 'address', 'experience_years', 'image', 'ai_profile_notes', 'ai_last_generated', 'user_email', 'department_name']
+        fields = ['id', 'user', 'employee_id', 'name', 'phone', 'department', 'department_id', 'designation', 'hire_date', 'date_of_birth', 'gender', 'blood_group', 'salary', 'specialization', 'address', 'experience_years', 'image', 'image_renditions', 'ai_profile_notes', 'ai_last_generated', 'user_email', 'department_name']
         read_only_fields = ['user', 'user_email', 'department_name']
 
     def create(self, validated_data):
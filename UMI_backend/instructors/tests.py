@@ -1,3 +1,76 @@
-from django.test import TestCase
+from datetime import date
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from academics.models import Attendance, Department, Semester
+from academics.services.dashboard import dashboard_cache_key
+from students.models import Student
+from students.services.profile import profile_cache_key
 
-# Create your tests here.
+User = get_user_model()
+
+
+class BulkAttendanceTests(APITestCase):
+    url = '/api/instructors/attendance/bulk/'
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='instructor', password='pass', role='instructor')
+        self.client.force_authenticate(self.user)
+        self.department = Department.objects.create(name='Computer Science', code='CS')
+        self.semester = Semester.objects.create(name='Semester 1', semester_code='S1', program='BCS', department=self.department)
+        self.students = [
+            Student.objects.create(
+                name=f'Student {i}',
+                email=f'student{i}@example.com',
+                phone='123',
+                date_of_birth=date(2000, 1, 1),
+                department=self.department,
+                semester=self.semester,
+            )
+            for i in range(5)
+        ]
+
+    def post(self, entries):
+        return self.client.post(self.url, {'date': '2025-01-10', 'attendances': entries}, format='json')
+
+    def test_creates_updates_and_reports_missing_students(self):
+        Attendance.objects.create(student=self.students[0], date=date(2025, 1, 10), status=Attendance.ABSENT)
+        entries = [{'student_id': s.student_id, 'status': 'Present'} for s in self.students]
+        entries.append({'student_id': 'missing', 'status': 'Present'})
+
+        response = self.post(entries)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data['created'], response.data['updated']), (4, 1))
+        self.assertEqual(response.data['errors'][0]['student_id'], 'missing')
+        self.assertEqual(Attendance.objects.filter(date=date(2025, 1, 10), status=Attendance.PRESENT).count(), 5)
+        self.students[0].refresh_from_db()
+        self.assertEqual(self.students[0].attendance_percentage, 100.0)
+
+    def test_query_count_does_not_grow_with_class_size(self):
+        def count_queries(students):
+            Attendance.objects.all().delete()
+            entries = [{'student_id': s.student_id, 'status': 'Present'} for s in students]
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.post(entries).status_code, status.HTTP_201_CREATED)
+            return len(queries)
+
+        self.assertEqual(count_queries(self.students[:1]), count_queries(self.students))
+
+    def test_cached_dashboards_and_profiles_are_dropped_after_commit(self):
+        student = self.students[0]
+        keys = [dashboard_cache_key(student.pk), profile_cache_key(student.pk)]
+        cache.set_many({key: 'stale' for key in keys})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.post([{'student_id': student.student_id, 'status': 'Present'}]).status_code, status.HTTP_201_CREATED)
+            # Kept until the write commits, so a concurrent read can't cache the old state again
+            self.assertEqual(cache.get_many(keys), {key: 'stale' for key in keys})
+        self.assertEqual(cache.get_many(keys), {})
+
+    def test_all_students_missing(self):
+        response = self.post([{'student_id': 'missing', 'status': 'Absent'}])
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -10,6 +10,9 @@ import logging
 from .models import Instructor
 from .serializers import InstructorSerializer
 from .permissions import IsAdminOrReadOnly
+from monitoring.structured_logging import request_keys
+from academics.services.images import accept_upload
+from rest_framework.exceptions import ValidationError
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +24,8 @@ class InstructorViewSet(viewsets.ModelViewSet):
     parser_classes = [MultiPartParser, FormParser, JSONParser]
 
     def create(self, request, *args, **kwargs):
-        print(f"InstructorViewSet create - Request data: {request.data}")
-        print(f"Request content type: {request.content_type}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("InstructorViewSet create", extra={'fields': request_keys(request), 'content_type': request.content_type})
         try:
             data_for_validation = request.data.copy()
             from register.models import User
@@ -44,13 +47,12 @@ class InstructorViewSet(viewsets.ModelViewSet):
             headers = self.get_success_headers(serializer.data)
             return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
         except Exception as e:
-            print(f"InstructorViewSet create - Validation error: {e}")
-            print(f"Request data keys: {list(request.data.keys()) if hasattr(request.data, 'keys') else 'No keys'}")
+            logger.info("InstructorViewSet create failed: %s", e, extra={'fields': request_keys(request)})
             raise
 
     def update(self, request, *args, **kwargs):
-        print(f"InstructorViewSet update - Request data: {request.data}")
-        print(f"Request content type: {request.content_type}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("InstructorViewSet update", extra={'fields': request_keys(request), 'content_type': request.content_type})
         try:
             data_for_validation = request.data.copy()
             from register.models import User
@@ -70,8 +72,7 @@ class InstructorViewSet(viewsets.ModelViewSet):
 
             return Response(serializer.data)
         except Exception as e:
-            print(f"InstructorViewSet update - Validation error: {e}")
-            print(f"Request data keys: {list(request.data.keys()) if hasattr(request.data, 'keys') else 'No keys'}")
+            logger.info("InstructorViewSet update failed: %s", e, extra={'fields': request_keys(request)})
             raise
 
 
@@ -93,28 +94,18 @@ class InstructorViewSet(viewsets.ModelViewSet):
                 return Response({"error": "No image file provided"},
                                 status=status.HTTP_400_BAD_REQUEST)
 
-            image_file = request.FILES['image']
-
-            # Validate file type
-            allowed_types = ['image/jpeg', 'image/jpg', 'image/png', 'image/gif']
-            if image_file.content_type not in allowed_types:
-                return Response({"error": "Invalid file type. Only JPEG, PNG, and GIF allowed"},
-                                status=status.HTTP_400_BAD_REQUEST)
-
-            # Validate file size (max 5MB)
-            if image_file.size > 5 * 1024 * 1024:
-                return Response({"error": "File size too large. Maximum size is 5MB"},
-                                status=status.HTTP_400_BAD_REQUEST)
-
-            # Save the image
-            instructor.image.save(image_file.name, image_file, save=True)
+            accept_upload(instructor, request.FILES['image'])
 
+            # Renditions are produced in the background; image_renditions.status reports progress
             serializer = self.get_serializer(instructor)
             return Response({
                 "message": "Image uploaded successfully",
                 "instructor": serializer.data
-            }, status=status.HTTP_200_OK)
+            }, status=status.HTTP_202_ACCEPTED)
 
+        except ValidationError as e:
+            return Response({"error": e.detail[0]},
+                            status=status.HTTP_400_BAD_REQUEST)
         except Instructor.DoesNotExist:
             return Response({"error": "Instructor not found"},
                             status=status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-17 08:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Student's primary key moved back to student_id in students 0017; rebuild
+    the foreign keys that were created against the old integer id column.
+    """
+
+    dependencies = [
+        ('messaging', '0003_call_recipient_instructor_and_more'),
+        ('students', '0017_student_id_primary_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='message',
+            name='recipient_student',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='received_messages', to='students.student', db_constraint=False),
+        ),
+        migrations.AlterField(
+            model_name='message',
+            name='recipient_student',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='received_messages', to='students.student'),
+        ),
+        migrations.AlterField(
+            model_name='call',
+            name='recipient_student',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='received_calls', to='students.student', db_constraint=False),
+        ),
+        migrations.AlterField(
+            model_name='call',
+            name='recipient_student',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='received_calls', to='students.student'),
+        ),
+    ]
@@ -3,14 +3,24 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.response import Response
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q, Count, Value
-from django.db.models.functions import Concat
+from django.db.models import Q, Count
 from django.utils import timezone
 from .models import Message, Call, MessageTemplate
 from .serializers import MessageSerializer, CallSerializer, MessageTemplateSerializer
 from students.models import Student
+from students.services.search import typeahead
 from instructors.models import Instructor
 
+def student_recipient(student):
+    full_name = f"{student.first_name or ''} {student.last_name or ''}".strip()
+    return {
+        'id': student.pk,
+        'name': full_name or student.name,
+        'email': student.email,
+        'type': 'STUDENT'
+    }
+
+
 class MessageViewSet(viewsets.ModelViewSet):
     serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -28,20 +38,8 @@ class MessageViewSet(viewsets.ModelViewSet):
         results = []
 
         if recipient_type == 'STUDENT':
-            students = Student.objects.annotate(
-                full_name=Concat('first_name', Value(' '), 'last_name')
-            ).filter(
-                Q(full_name__icontains=query) |
-                Q(email__icontains=query)
-            )[:10]
-
-            for student in students:
-                results.append({
-                    'id': student.id,
-                    'name': student.full_name,
-                    'email': student.email,
-                    'type': 'STUDENT'
-                })
+            for student in typeahead(query):
+                results.append(student_recipient(student))
         elif recipient_type == 'INSTRUCTOR':
             instructors = Instructor.objects.filter(
                 Q(name__icontains=query) |
@@ -129,7 +127,7 @@ class MessageViewSet(viewsets.ModelViewSet):
 
         if recipient_type.upper() == 'STUDENT':
             try:
-                student = Student.objects.get(id=recipient_id)
+                student = Student.objects.get(pk=recipient_id)
                 queryset = Message.objects.filter(
                     Q(sender=user, recipient_student=student)
                 ).order_by('-sent_at')
@@ -189,19 +187,8 @@ def send_individual_message(request):
     if search_query:
         results = []
         if recipient_type == 'STUDENT':
-            students = Student.objects.annotate(
-                full_name=Concat('first_name', Value(' '), 'last_name')
-            ).filter(
-                Q(full_name__icontains=search_query) |
-                Q(email__icontains=search_query)
-            )[:10]
-            for student in students:
-                results.append({
-                    'id': student.id,
-                    'name': student.full_name,
-                    'email': student.email,
-                    'type': 'STUDENT'
-                })
+            for student in typeahead(search_query):
+                results.append(student_recipient(student))
         elif recipient_type == 'INSTRUCTOR':
             instructors = Instructor.objects.filter(
                 Q(name__icontains=search_query) |
@@ -0,0 +1,167 @@
+"""
+Query-count and latency benchmark for every GET route in UMI_backend/urls.py.
+
+Routes are discovered from the URLconf, their parameters filled from the
+data in the database (see academics.services.seeding.seed_university), and
+each path is requested ``repeat`` times. The first request of each path runs
+with an empty cache so its query count is the cold cost; latency percentiles
+cover all repeats.
+"""
+import json
+import math
+import re
+import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, resolve, Resolver404
+
+from academics.models import Course, Fee
+from students.models import Student
+
+SKIPPED_PREFIXES = ('admin/', 'media/')
+
+_REGEX_GROUP = re.compile(r'\(\?P<(\w+)>[^)]*\)')
+_ROUTE_PARAM = re.compile(r'<(?:\w+:)?(\w+)>')
+
+
+def _route_piece(pattern):
+    piece = str(pattern)
+    if pattern.regex.pattern == piece and (piece.startswith('^') or piece.endswith('$')):
+        piece = _REGEX_GROUP.sub(r'<\1>', piece.lstrip('^').rstrip('$'))
+    return piece
+
+
+def iter_routes(patterns=None, prefix=''):
+    """Yield (route, callback) for every URL pattern, with regex groups shown as <name>"""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for pattern in patterns:
+        route = prefix + _route_piece(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from iter_routes(pattern.url_patterns, route)
+        elif isinstance(pattern, URLPattern):
+            yield route, pattern.callback
+
+
+def _view_class(callback):
+    return getattr(callback, 'cls', None) or getattr(callback, 'view_class', None)
+
+
+def sample_parameters():
+    """Values for the named URL parameters, taken from one student that has fees"""
+    student = Student.objects.filter(semester__isnull=False, fees__isnull=False).first() or Student.objects.first()
+    if not student:
+        return {}
+    samples = {
+        'student_id': student.pk,
+        'department_id': student.department_id,
+        'semester_id': student.semester_id,
+    }
+    course = Course.objects.filter(semester__department_id=student.department_id).first()
+    if course:
+        samples['course_id'] = course.course_id
+    fee = Fee.objects.filter(student=student).first()
+    if fee:
+        samples['fee_id'] = fee.fee_id
+    return {name: value for name, value in samples.items() if value is not None}
+
+
+def build_path(route, callback, samples):
+    """Concrete path for ``route``, or (None, reason) when it can't be filled"""
+    params = _ROUTE_PARAM.findall(route)
+    values = {}
+    for name in params:
+        if name == 'pk':
+            view_class = _view_class(callback)
+            queryset = getattr(view_class, 'queryset', None)
+            pk = queryset.model.objects.values_list('pk', flat=True).first() if queryset is not None else None
+            if pk is None:
+                return None, 'no sample for pk'
+            values[name] = pk
+        elif name in samples:
+            values[name] = samples[name]
+        else:
+            return None, f'no sample for {name}'
+    path = '/' + _ROUTE_PARAM.sub(lambda match: str(values[match.group(1)]), route)
+    try:
+        if resolve(path).func is not callback:
+            return None, 'sample resolves to another route'
+    except Resolver404:
+        return None, 'sample does not match route'
+    return path, None
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def measure(client, path, repeat=5):
+    """Status, cold query count/time, p50/p95 latency (ms) and response size for GET ``path``"""
+    cache.clear()
+    latencies = []
+    first = None
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = client.get(path)
+            if response.streaming:
+                body = b''.join(response.streaming_content)
+            else:
+                body = response.content
+            latencies.append((time.perf_counter() - start) * 1000)
+        if first is None:
+            first = {
+                'status': response.status_code,
+                'queries': len(queries),
+                'query_ms': round(sum(float(query['time']) for query in queries.captured_queries) * 1000, 2),
+                'bytes': len(body),
+            }
+    return {
+        **first,
+        'p50_ms': round(_percentile(latencies, 50), 2),
+        'p95_ms': round(_percentile(latencies, 95), 2),
+    }
+
+
+def run_benchmark(client, repeat=5, include=None):
+    """
+    Benchmark every route; ``include`` is an optional substring filter.
+    Returns one dict per route with either the measurements or a 'skipped' reason.
+    """
+    samples = sample_parameters()
+    rows = []
+    seen = set()
+    for route, callback in iter_routes():
+        if route.startswith(SKIPPED_PREFIXES) or route in seen or '<format>' in route:
+            continue
+        if include and include not in route:
+            continue
+        seen.add(route)
+        path, reason = build_path(route, callback, samples)
+        if path is None:
+            rows.append({'route': route, 'skipped': reason})
+            continue
+        rows.append({'route': route, 'path': path, **measure(client, path, repeat)})
+    return rows
+
+
+def load_budgets(path):
+    with open(path) as budget_file:
+        return json.load(budget_file)
+
+
+def check_budgets(rows, budgets):
+    """List of 'route: metric value > budget' strings for every exceeded budget"""
+    default = budgets.get('default', {})
+    violations = []
+    for row in rows:
+        if 'skipped' in row:
+            continue
+        budget = {**default, **budgets.get('routes', {}).get(row['route'], {})}
+        for metric, limit in budget.items():
+            if row.get(metric) is not None and row[metric] > limit:
+                violations.append(f"{row['route']}: {metric} {row[metric]} > {limit}")
+    return violations
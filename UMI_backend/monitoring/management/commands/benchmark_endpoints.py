@@ -0,0 +1,80 @@
+import json
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test.runner import DiscoverRunner
+from django.test.utils import setup_test_environment, teardown_test_environment
+from rest_framework.test import APIClient
+
+from academics.services.seeding import seed_university
+from monitoring.benchmark import check_budgets, load_budgets, run_benchmark
+
+DEFAULT_BUDGETS = Path(__file__).resolve().parents[2] / 'benchmark_budgets.json'
+
+
+class Command(BaseCommand):
+    help = 'Seed a synthetic university into a throwaway database and benchmark every GET endpoint against budgets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--departments', type=int, default=2)
+        parser.add_argument('--semesters', type=int, default=2, help='Semesters per department')
+        parser.add_argument('--courses', type=int, default=3, help='Courses per semester')
+        parser.add_argument('--students', type=int, default=20, help='Students per department semester')
+        parser.add_argument('--years', type=int, default=1, help='Years of attendance history')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic data')
+        parser.add_argument('--repeat', type=int, default=5, help='Requests per endpoint')
+        parser.add_argument('--filter', help='Only benchmark routes containing this text')
+        parser.add_argument('--budgets', default=str(DEFAULT_BUDGETS), help='JSON file with query/latency budgets')
+        parser.add_argument('--output', help='Write the measurements to this JSON file')
+
+    def handle(self, *args, **options):
+        budgets = load_budgets(options['budgets'])
+
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        old_config = runner.setup_databases()
+        try:
+            self.stdout.write('Seeding synthetic university...')
+            counts = seed_university(
+                departments=options['departments'],
+                semesters=options['semesters'],
+                courses=options['courses'],
+                students=options['students'],
+                years=options['years'],
+                seed=options['seed'],
+            )
+            self.stdout.write(', '.join(f'{count} {name}' for name, count in counts.items()))
+
+            admin = get_user_model().objects.create_user(
+                username='benchmark-admin', email='benchmark@example.com', password='benchmark', role='admin', is_staff=True
+            )
+            client = APIClient(raise_request_exception=False)
+            client.force_authenticate(admin)
+            rows = run_benchmark(client, repeat=options['repeat'], include=options.get('filter'))
+        finally:
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+        self.stdout.write(f"{'route':<90} {'status':>6} {'queries':>7} {'p50 ms':>8} {'p95 ms':>8} {'bytes':>9}")
+        for row in rows:
+            if 'skipped' in row:
+                self.stdout.write(f"{row['route']:<90} skipped: {row['skipped']}")
+            else:
+                self.stdout.write(
+                    f"{row['route']:<90} {row['status']:>6} {row['queries']:>7} "
+                    f"{row['p50_ms']:>8} {row['p95_ms']:>8} {row['bytes']:>9}"
+                )
+
+        if options.get('output'):
+            with open(options['output'], 'w') as output:
+                json.dump(rows, output, indent=2)
+
+        violations = check_budgets(rows, budgets)
+        for violation in violations:
+            self.stdout.write(self.style.ERROR(violation))
+        if violations:
+            raise CommandError(f'{len(violations)} budget(s) exceeded')
+
+        measured = sum(1 for row in rows if 'skipped' not in row)
+        self.stdout.write(self.style.SUCCESS(f'All {measured} benchmarked endpoints are within budget'))
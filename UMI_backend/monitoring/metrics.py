@@ -0,0 +1,266 @@
+"""
+In-process request metrics recorded by monitoring.middleware.RequestMetricsMiddleware.
+
+The hot path takes no locks: every thread writes to its own shard of
+counters, and the rolling latency samples go into bounded deques (appends are
+atomic). Readers sum the shards when a snapshot is taken. Shards of threads
+that have ended are folded into one retired total whenever a new thread
+registers, so servers that start a thread per request keep as many shards
+as they have live threads.
+
+With settings.MONITORING_METRICS_DB set, each process also writes its
+cumulative totals to that SQLite file every MONITORING_METRICS_FLUSH_SECONDS,
+and snapshots merge the totals of every process sharing the file (latency
+percentiles then come from the merged histograms).
+"""
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from django.conf import settings
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, math.inf)
+
+# Requests kept per route for the rolling percentiles
+ROLLING_WINDOW = 1000
+
+# A user counts as active if they made a request this recently
+ACTIVE_USER_SECONDS = 15 * 60
+
+# How often users who are no longer active are dropped
+ACTIVE_USER_PRUNE_SECONDS = 60
+
+_FIELDS = ('requests', 'errors', 'duration_ms', 'queries', 'query_ms')
+
+
+def _add_routes(merged, routes):
+    for route, stats in list(routes.items()):
+        into = merged.setdefault(route, {
+            **dict.fromkeys(_FIELDS, 0), 'buckets': [0] * len(LATENCY_BUCKETS_MS)
+        })
+        for field in _FIELDS:
+            into[field] += stats[field]
+        into['buckets'] = [a + b for a, b in zip(into['buckets'], stats['buckets'])]
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of ``values`` (0 when empty)"""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def histogram_percentile(buckets, percent):
+    """Upper bound (ms) of the bucket holding the ``percent`` percentile"""
+    total = sum(buckets)
+    if not total:
+        return 0
+    rank = math.ceil(percent / 100 * total)
+    running = 0
+    for bound, count in zip(LATENCY_BUCKETS_MS, buckets):
+        running += count
+        if running >= rank:
+            return bound if bound != math.inf else LATENCY_BUCKETS_MS[-2]
+    return LATENCY_BUCKETS_MS[-2]
+
+
+class MetricsStore:
+    def __init__(self, window=ROLLING_WINDOW):
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self._local = threading.local()
+        self._shards = []  # [(thread, routes)]
+        self._retired = {}
+        self._shards_lock = threading.Lock()
+        self._samples = {}
+        self._active_users = {}
+        self._last_prune = 0
+        self._started = time.time()
+        self._last_flush = 0
+
+    def _shard(self):
+        shard = getattr(self._local, 'routes', None)
+        if shard is None:
+            shard = self._local.routes = {}
+            # Only taken once per thread, when its shard is registered
+            with self._shards_lock:
+                live = []
+                for thread, routes in self._shards:
+                    if thread.is_alive():
+                        live.append((thread, routes))
+                    else:
+                        _add_routes(self._retired, routes)
+                live.append((threading.current_thread(), shard))
+                self._shards = live
+        return shard
+
+    def record(self, route, status_code, duration_ms, queries=0, query_ms=0.0, user_id=None):
+        shard = self._shard()
+        stats = shard.get(route)
+        if stats is None:
+            stats = shard[route] = {
+                'requests': 0, 'errors': 0, 'duration_ms': 0.0, 'queries': 0, 'query_ms': 0.0,
+                'buckets': [0] * len(LATENCY_BUCKETS_MS),
+            }
+        stats['requests'] += 1
+        if status_code >= 500:
+            stats['errors'] += 1
+        stats['duration_ms'] += duration_ms
+        stats['queries'] += queries
+        stats['query_ms'] += query_ms
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if duration_ms <= bound:
+                stats['buckets'][index] += 1
+                break
+
+        samples = self._samples.get(route)
+        if samples is None:
+            samples = self._samples.setdefault(route, deque(maxlen=self.window))
+        samples.append(duration_ms)
+
+        if user_id is not None:
+            now = time.time()
+            self._active_users[user_id] = now
+            if now - self._last_prune >= ACTIVE_USER_PRUNE_SECONDS:
+                self._prune_active_users(now)
+
+        self._maybe_flush()
+
+    def _prune_active_users(self, now):
+        self._last_prune = now
+        cutoff = now - ACTIVE_USER_SECONDS
+        for user_id, seen in list(self._active_users.items()):
+            # Re-read: another thread may have just seen the user again
+            if seen < cutoff and self._active_users.get(user_id, now) < cutoff:
+                self._active_users.pop(user_id, None)
+
+    def totals(self):
+        """Cumulative per-route totals of this process"""
+        merged = {}
+        # Under the lock so a shard being retired isn't counted twice or missed
+        with self._shards_lock:
+            _add_routes(merged, self._retired)
+            for _, routes in self._shards:
+                _add_routes(merged, routes)
+        return merged
+
+    def active_users(self):
+        cutoff = time.time() - ACTIVE_USER_SECONDS
+        return sum(1 for seen in list(self._active_users.values()) if seen >= cutoff)
+
+    def snapshot(self):
+        """
+        {'uptime_seconds', 'active_users', 'routes': {route: {...}}} where each
+        route has requests, errors, error_rate, avg_ms, p50_ms/p95_ms/p99_ms,
+        queries, query_ms and the latency histogram buckets.
+        """
+        shared = _shared_db_path()
+        if shared:
+            self.flush()
+            totals, active_users = _read_shared(shared)
+        else:
+            totals, active_users = self.totals(), self.active_users()
+
+        routes = {}
+        for route, stats in totals.items():
+            samples = list(self._samples.get(route, ())) if not shared else None
+            requests = stats['requests']
+            routes[route] = {
+                'requests': requests,
+                'errors': stats['errors'],
+                'error_rate': round(stats['errors'] / requests, 4) if requests else 0,
+                'avg_ms': round(stats['duration_ms'] / requests, 2) if requests else 0,
+                'queries': stats['queries'],
+                'query_ms': round(stats['query_ms'], 2),
+                'buckets': stats['buckets'],
+                **{
+                    f'p{percent}_ms': round(
+                        percentile(samples, percent) if samples is not None
+                        else histogram_percentile(stats['buckets'], percent), 2
+                    )
+                    for percent in (50, 95, 99)
+                },
+            }
+        return {
+            'uptime_seconds': round(time.time() - self._started, 1),
+            'active_users': active_users,
+            'routes': routes,
+        }
+
+    def _maybe_flush(self):
+        if _shared_db_path() and time.time() - self._last_flush >= _flush_seconds():
+            self.flush()
+
+    def flush(self):
+        """Write this process's cumulative totals to the shared SQLite file"""
+        path = _shared_db_path()
+        if not path:
+            return
+        self._last_flush = time.time()
+        pid = os.getpid()
+        rows = [
+            (pid, route, stats['requests'], stats['errors'], stats['duration_ms'],
+             stats['queries'], stats['query_ms'], json.dumps(stats['buckets']))
+            for route, stats in self.totals().items()
+        ]
+        users = [(str(user_id), seen) for user_id, seen in list(self._active_users.items())]
+        with _shared_db(path) as db:
+            db.executemany('INSERT OR REPLACE INTO route_metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            db.executemany(
+                'INSERT INTO active_users VALUES (?, ?) ON CONFLICT(user_id) DO UPDATE SET seen = MAX(seen, excluded.seen)',
+                users
+            )
+            db.execute('DELETE FROM active_users WHERE seen < ?', (time.time() - ACTIVE_USER_SECONDS,))
+
+
+def _shared_db_path():
+    return getattr(settings, 'MONITORING_METRICS_DB', None)
+
+
+def _flush_seconds():
+    return getattr(settings, 'MONITORING_METRICS_FLUSH_SECONDS', 5)
+
+
+@contextmanager
+def _shared_db(path):
+    db = sqlite3.connect(path, timeout=5)
+    try:
+        with db:
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS route_metrics (pid INTEGER, route TEXT, requests INTEGER, errors INTEGER, '
+                'duration_ms REAL, queries INTEGER, query_ms REAL, buckets TEXT, PRIMARY KEY (pid, route))'
+            )
+            db.execute('CREATE TABLE IF NOT EXISTS active_users (user_id TEXT PRIMARY KEY, seen REAL)')
+            yield db
+    finally:
+        db.close()
+
+
+def _read_shared(path):
+    totals = {}
+    with _shared_db(path) as db:
+        for route, requests, errors, duration_ms, queries, query_ms, buckets in db.execute(
+            'SELECT route, requests, errors, duration_ms, queries, query_ms, buckets FROM route_metrics'
+        ):
+            into = totals.setdefault(route, {
+                **dict.fromkeys(_FIELDS, 0), 'buckets': [0] * len(LATENCY_BUCKETS_MS)
+            })
+            for field, value in zip(_FIELDS, (requests, errors, duration_ms, queries, query_ms)):
+                into[field] += value
+            into['buckets'] = [a + b for a, b in zip(into['buckets'], json.loads(buckets))]
+        (active_users,) = db.execute(
+            'SELECT COUNT(*) FROM active_users WHERE seen >= ?', (time.time() - ACTIVE_USER_SECONDS,)
+        ).fetchone()
+    return totals, active_users
+
+
+metrics = MetricsStore()
@@ -0,0 +1,64 @@
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+from .metrics import metrics
+
+
+class QueryCounter:
+    """execute_wrapper that counts queries and their time for one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration_ms += (time.perf_counter() - start) * 1000
+
+
+class RequestMetricsMiddleware:
+    """
+    Record latency, status and DB query count/time of every request into
+    monitoring.metrics, keyed by URL name (or route when the URL is unnamed).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        start = time.perf_counter()
+        status_code = 500
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(counter))
+                response = self.get_response(request)
+            status_code = response.status_code
+            return response
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            user = getattr(request, 'user', None)
+            metrics.record(
+                route_name(request),
+                status_code,
+                duration_ms,
+                queries=counter.count,
+                query_ms=counter.duration_ms,
+                user_id=user.pk if user is not None and user.is_authenticated else None,
+            )
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unmatched>'
+    if match.url_name:
+        return match.view_name
+    return match.route or match.view_name
@@ -0,0 +1,79 @@
+"""
+Structured logging helpers wired up in settings.LOGGING.
+
+JsonFormatter writes one JSON object per line with the standard fields plus
+anything passed through ``extra=``, so log shippers can index it without
+parsing messages. SamplingFilter keeps only a fraction of the low-level
+records of chosen loggers; warnings and errors always pass.
+
+Call sites log with %-style arguments (``logger.debug("x %s", y)``) so the
+message is only formatted when a handler actually emits it, and wrap any
+expensive argument in ``logger.isEnabledFor(...)``.
+"""
+import json
+import logging
+import random
+from datetime import datetime, timezone
+
+# LogRecord attributes that are not user-supplied ``extra`` values
+_RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord('', 0, '', 0, '', (), None).__dict__
+) | {'message', 'asctime', 'taskName'}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Pass ``rates[logger]`` (0..1) of the records below WARNING from that
+    logger or its children; other loggers use ``default``.
+    """
+
+    def __init__(self, rates=None, default=1.0, name=''):
+        super().__init__(name)
+        self.rates = dict(rates or {})
+        self.default = default
+
+    def rate_for(self, logger_name):
+        name = logger_name
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition('.')[0]
+        return self.default
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1 or random.random() < rate
+
+
+def parse_rates(value):
+    """'students.views=0.1,instructors=0.5' -> {'students.views': 0.1, 'instructors': 0.5}"""
+    rates = {}
+    for item in (value or '').split(','):
+        name, _, rate = item.partition('=')
+        if name.strip() and rate.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+def request_keys(request):
+    """Field names of a request payload, which is what the debug logs record instead of values"""
+    data = getattr(request, 'data', None)
+    return sorted(data.keys()) if hasattr(data, 'keys') else []
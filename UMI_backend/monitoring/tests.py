@@ -1,3 +1,187 @@
-from django.test import TestCase
+import json
+import logging
+import os
+import tempfile
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from academics.services.seeding import seed_university
+from .metrics import ACTIVE_USER_SECONDS, metrics
+from .structured_logging import JsonFormatter, SamplingFilter, parse_rates
+from .benchmark import build_path, check_budgets, iter_routes, run_benchmark, sample_parameters
+
+User = get_user_model()
+
+
+class EndpointBenchmarkTests(TestCase):
+    def setUp(self):
+        self.counts = seed_university(departments=1, semesters=2, courses=2, students=3, sessions_per_year=5)
+        self.client = APIClient(raise_request_exception=False)
+        self.client.force_authenticate(User.objects.create_user(username='admin', password='pass', role='admin'))
+
+    def test_seeded_university(self):
+        self.assertEqual(self.counts['students'], 6)
+        self.assertEqual(self.counts['attendance'], 30)
+        # semester 1 students: 2 courses, semester 2 students: 4 courses
+        self.assertEqual(self.counts['results'], 18)
+
+    def test_routes_are_filled_from_seeded_data(self):
+        samples = sample_parameters()
+        routes = dict(iter_routes())
+        route = 'api/academics/departments/<int:department_id>/semesters/<int:semester_id>/students/fees/'
+
+        path, reason = build_path(route, routes[route], samples)
+
+        self.assertIsNone(reason)
+        self.assertEqual(path, f"/api/academics/departments/{samples['department_id']}/semesters/{samples['semester_id']}/students/fees/")
+
+    def test_benchmark_reports_and_checks_budgets(self):
+        rows = run_benchmark(self.client, repeat=2, include='/students/fees/')
+
+        row = next(row for row in rows if row['route'].endswith('semesters/<int:semester_id>/students/fees/'))
+        self.assertEqual(row['status'], 200)
+        self.assertEqual(row['queries'], 5)
+        self.assertGreater(row['bytes'], 0)
+        self.assertEqual(check_budgets([row], {'routes': {row['route']: {'queries': 5}}}), [])
+        self.assertEqual(len(check_budgets([row], {'default': {'queries': 4}})), 1)
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.user = User.objects.create_user(username='admin', password='pass', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_health_reports_recorded_requests(self):
+        for _ in range(3):
+            self.client.get('/api/academics/departments/')
+        self.client.get('/api/does-not-exist/')
+
+        response = self.client.get('/api/monitoring/health/')
+
+        self.assertEqual(response.status_code, 200)
+        # The health request itself is recorded after its response is built
+        self.assertEqual(response.data['totalRequests'], 4)
+        self.assertEqual(response.data['activeUsers'], 1)
+        self.assertEqual(response.data['errorRate'], 0)
+        departments = response.data['routes']['department-list']
+        self.assertEqual(departments['requests'], 3)
+        self.assertGreaterEqual(departments['queries'], 3)
+        self.assertGreater(departments['p95_ms'], 0)
+        self.assertEqual(response.data['routes']['<unmatched>']['requests'], 1)
+
+    def test_server_errors_are_counted(self):
+        metrics.record('broken', 500, 12.0)
+        metrics.record('broken', 200, 8.0)
+
+        route = metrics.snapshot()['routes']['broken']
+
+        self.assertEqual(route['errors'], 1)
+        self.assertEqual(route['error_rate'], 0.5)
+        self.assertEqual(route['p50_ms'], 8.0)
+        self.assertEqual(route['p99_ms'], 12.0)
+
+    def test_prometheus_text(self):
+        self.client.get('/api/academics/departments/')
+
+        response = self.client.get('/api/monitoring/metrics/')
+
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('umi_http_requests_total{route="department-list"} 1', body)
+        self.assertIn('umi_http_request_duration_seconds_bucket{route="department-list",le="+Inf"} 1', body)
+        self.assertIn('umi_active_users 1', body)
+
+    def test_prometheus_without_token_is_admin_only(self):
+        self.assertEqual(APIClient().get('/api/monitoring/metrics/').status_code, 403)
+        student = APIClient()
+        student.force_authenticate(User.objects.create_user(username='student', password='pass', role='student'))
+        self.assertEqual(student.get('/api/monitoring/metrics/').status_code, 403)
+        principal = APIClient()
+        principal.force_authenticate(User.objects.create_user(username='principal', password='pass', role='principal'))
+        self.assertEqual(principal.get('/api/monitoring/metrics/').status_code, 200)
+
+    def test_health_routes_are_admin_only(self):
+        self.assertIn('routes', self.client.get('/api/monitoring/health/').data)
+        student = APIClient()
+        student.force_authenticate(User.objects.create_user(username='student', password='pass', role='student'))
+        response = student.get('/api/monitoring/health/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('routes', response.data)
+        self.assertIn('totalRequests', response.data)
+
+    def test_shards_of_ended_threads_are_folded(self):
+        for _ in range(20):
+            thread = threading.Thread(target=metrics.record, args=('threaded', 200, 1.0))
+            thread.start()
+            thread.join()
+
+        # Each new thread folds in the shards of those that have ended
+        self.assertLessEqual(len(metrics._shards), 2)
+        self.assertEqual(metrics.totals()['threaded']['requests'], 20)
+
+    @override_settings(MONITORING_METRICS_TOKEN='secret')
+    def test_prometheus_token(self):
+        self.assertEqual(self.client.get('/api/monitoring/metrics/').status_code, 401)
+        response = self.client.get('/api/monitoring/metrics/', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
+    def test_inactive_users_are_evicted(self):
+        now = 1_000_000
+        with mock.patch('monitoring.metrics.time.time', return_value=now):
+            for user_id in range(100):
+                metrics.record('route', 200, 1.0, user_id=user_id)
+        with mock.patch('monitoring.metrics.time.time', return_value=now + ACTIVE_USER_SECONDS + 60):
+            metrics.record('route', 200, 1.0, user_id='recent')
+            active_users = metrics.active_users()
+
+        self.assertEqual(list(metrics._active_users), ['recent'])
+        self.assertEqual(active_users, 1)
+
+    def test_shared_sqlite_store_merges_processes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(MONITORING_METRICS_DB=os.path.join(directory, 'metrics.sqlite3')):
+                metrics.record('shared', 200, 20.0)
+                metrics.flush()
+                route = metrics.snapshot()['routes']['shared']
+
+        self.assertEqual(route['requests'], 1)
+        self.assertEqual(route['p50_ms'], 25)
+
+
+class StructuredLoggingTests(TestCase):
+    def record(self, name='students.views', level=logging.INFO, **extra):
+        record = logging.LogRecord(name, level, __file__, 1, 'created %s', ('cs001',), None)
+        record.__dict__.update(extra)
+        return record
+
+    def test_json_formatter_includes_extra_fields(self):
+        entry = json.loads(JsonFormatter().format(self.record(fields=['email', 'name'])))
+        self.assertEqual(entry['message'], 'created cs001')
+        self.assertEqual(entry['logger'], 'students.views')
+        self.assertEqual(entry['level'], 'INFO')
+        self.assertEqual(entry['fields'], ['email', 'name'])
+        self.assertNotIn('args', entry)
+
+    def test_sampling_by_logger_prefix(self):
+        sampling = SamplingFilter(rates=parse_rates('students=0,students.serializers=1'))
+        self.assertFalse(sampling.filter(self.record('students.views')))
+        self.assertTrue(sampling.filter(self.record('students.serializers')))
+        self.assertTrue(sampling.filter(self.record('academics.views')))
+        self.assertTrue(sampling.filter(self.record('students.views', logging.WARNING)))
+
+    def test_disabled_debug_logging_skips_payload_work(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='admin', password='pass', role='admin'))
+        with mock.patch('students.views.request_keys', return_value=['email']) as request_keys, \
+                self.assertLogs('students.views', logging.INFO) as logs:
+            response = client.post('/api/students/', {'email': 'bad'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        # At INFO only the failure is logged; the debug payload summary is never built
+        self.assertEqual([record.levelname for record in logs.records], ['INFO'])
+        request_keys.assert_called_once()
@@ -3,4 +3,5 @@ from . import views
 
 urlpatterns = [
     path('health/', views.system_health, name='system_health'),
+    path('metrics/', views.prometheus_metrics, name='prometheus_metrics'),
 ]
@@ -1,12 +1,19 @@
-from rest_framework.decorators import api_view
+import math
+
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 import psutil
-import time
 from django.db import connection
 
+from academics.permissions import IsAdminRole
+from .metrics import LATENCY_BUCKETS_MS, metrics
+
 @api_view(['GET'])
 def system_health(request):
-    # Server status - for simplicity, assume always online
+    # Server status - answering this request means it's online
     server_status = 'online'
 
     # Database status - check if connection is usable
@@ -16,11 +23,14 @@ def system_health(request):
     except Exception:
         database_status = 'offline'
 
-    # API response time - simulate with a small delay measurement
-    start_time = time.time()
-    # Simulate a quick operation
-    time.sleep(0.01)
-    api_response_time = int((time.time() - start_time) * 1000)  # in ms
+    snapshot = metrics.snapshot()
+    routes = snapshot['routes']
+    total_requests = sum(route['requests'] for route in routes.values())
+    total_errors = sum(route['errors'] for route in routes.values())
+    total_duration = sum(route['avg_ms'] * route['requests'] for route in routes.values())
+
+    # API response time - average latency of the recorded requests
+    api_response_time = int(total_duration / total_requests) if total_requests else 0
 
     # Memory usage
     memory = psutil.virtual_memory()
@@ -29,23 +39,97 @@ def system_health(request):
     # CPU usage
     cpu_usage = int(psutil.cpu_percent(interval=0.1))
 
-    # Active users - placeholder, should be replaced with real data
-    active_users = 1247
-
-    # Total requests - placeholder, should be replaced with real data
-    total_requests = 15420
-
-    # Error rate - placeholder, should be replaced with real data
-    error_rate = 0.02
-
     data = {
         'serverStatus': server_status,
         'databaseStatus': database_status,
         'apiResponseTime': api_response_time,
         'memoryUsage': memory_usage,
         'cpuUsage': cpu_usage,
-        'activeUsers': active_users,
+        'activeUsers': snapshot['active_users'],
         'totalRequests': total_requests,
-        'errorRate': error_rate,
+        'errorRate': round(total_errors / total_requests, 4) if total_requests else 0,
+        'uptimeSeconds': snapshot['uptime_seconds'],
     }
+    # Per-route figures are for admins only, like /metrics
+    if IsAdminRole().has_permission(request, None):
+        data['routes'] = {
+            name: {key: value for key, value in route.items() if key != 'buckets'}
+            for name, route in routes.items()
+        }
     return Response(data)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])  # checked below
+def prometheus_metrics(request):
+    """
+    Request metrics in the Prometheus text exposition format, for the bearer
+    token in MONITORING_METRICS_TOKEN or, when none is set, admin users only
+    """
+    token = getattr(settings, 'MONITORING_METRICS_TOKEN', None)
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+    if not token and not IsAdminRole().has_permission(request, None):
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+
+    snapshot = metrics.snapshot()
+    lines = [
+        '# HELP umi_http_requests_total Requests handled, by route.',
+        '# TYPE umi_http_requests_total counter',
+    ]
+    routes = sorted(snapshot['routes'].items())
+    lines += [f'umi_http_requests_total{{route="{_label(name)}"}} {route["requests"]}' for name, route in routes]
+    lines += [
+        '# HELP umi_http_request_errors_total Requests answered with a 5xx status, by route.',
+        '# TYPE umi_http_request_errors_total counter',
+    ]
+    lines += [f'umi_http_request_errors_total{{route="{_label(name)}"}} {route["errors"]}' for name, route in routes]
+
+    lines += [
+        '# HELP umi_http_request_duration_seconds Request latency, by route.',
+        '# TYPE umi_http_request_duration_seconds histogram',
+    ]
+    for name, route in routes:
+        running = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, route['buckets']):
+            running += count
+            le = '+Inf' if bound == math.inf else f'{bound / 1000:g}'
+            lines.append(f'umi_http_request_duration_seconds_bucket{{route="{_label(name)}",le="{le}"}} {running}')
+        lines.append(f'umi_http_request_duration_seconds_sum{{route="{_label(name)}"}} {route["avg_ms"] * route["requests"] / 1000:g}')
+        lines.append(f'umi_http_request_duration_seconds_count{{route="{_label(name)}"}} {route["requests"]}')
+
+    lines += [
+        '# HELP umi_http_request_duration_rolling_seconds Rolling latency percentiles, by route.',
+        '# TYPE umi_http_request_duration_rolling_seconds gauge',
+    ]
+    for name, route in routes:
+        for percent in (50, 95, 99):
+            lines.append(
+                f'umi_http_request_duration_rolling_seconds{{route="{_label(name)}",quantile="0.{percent}"}} '
+                f'{route[f"p{percent}_ms"] / 1000:g}'
+            )
+
+    lines += [
+        '# HELP umi_db_queries_total Database queries run, by route.',
+        '# TYPE umi_db_queries_total counter',
+    ]
+    lines += [f'umi_db_queries_total{{route="{_label(name)}"}} {route["queries"]}' for name, route in routes]
+    lines += [
+        '# HELP umi_db_query_duration_seconds_total Time spent in database queries, by route.',
+        '# TYPE umi_db_query_duration_seconds_total counter',
+    ]
+    lines += [f'umi_db_query_duration_seconds_total{{route="{_label(name)}"}} {route["query_ms"] / 1000:g}' for name, route in routes]
+
+    lines += [
+        '# HELP umi_active_users Users with a request in the last 15 minutes.',
+        '# TYPE umi_active_users gauge',
+        f'umi_active_users {snapshot["active_users"]}',
+        '# HELP umi_uptime_seconds Seconds since the metrics store started.',
+        '# TYPE umi_uptime_seconds gauge',
+        f'umi_uptime_seconds {snapshot["uptime_seconds"]}',
+    ]
+    return HttpResponse('\n'.join(lines) + '\n', content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -12,6 +12,7 @@ def create_student_profile(sender, instance, created, **kwargs):
         # Check if student already exists
         if not Student.objects.filter(email=instance.email).exists():
             Student.objects.create(
+                user=instance,
                 name=f"{instance.first_name} {instance.last_name}".strip() or instance.username,
                 email=instance.email,
                 phone="00000000000",
@@ -19,4 +20,6 @@ def create_student_profile(sender, instance, created, **kwargs):
                 first_name=instance.first_name,
                 last_name=instance.last_name,
                 password=instance.password,
-            )
\ No newline at end of file
+            )
+        else:
+            Student.objects.filter(email=instance.email, user__isnull=True).update(user=instance)
\ No newline at end of file
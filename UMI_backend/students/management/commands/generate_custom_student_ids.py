@@ -1,20 +1,31 @@
+from itertools import groupby
+
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
 from students.models import Student
+from students.services.search import index_students
+from students.services.student_ids import allocate_student_ids
 
 class Command(BaseCommand):
     help = 'Generate custom student IDs for existing students based on department code'
 
     def handle(self, *args, **options):
-        students = Student.objects.filter(department__isnull=False, student_id__isnull=True).order_by('department', 'enrollment_date')
-        department_counts = {}
+        students = (
+            Student.objects.filter(Q(student_id__isnull=True) | Q(student_id=''), department__isnull=False)
+            .select_related('department')
+            .order_by('department', 'enrollment_date')
+        )
 
-        for student in students:
-            dept_code = student.department.code.lower()
-            if dept_code not in department_counts:
-                department_counts[dept_code] = 0
-            department_counts[dept_code] += 1
-            new_id = f"{dept_code}{str(department_counts[dept_code]).zfill(3)}"
-            Student.objects.filter(pk=student.pk).update(student_id=new_id)
-            self.stdout.write(f"Updated {student.name} to ID {new_id}")
+        updated = []
+        with transaction.atomic():
+            for department, group in groupby(students, key=lambda student: student.department):
+                group = list(group)
+                # One block reservation per department instead of one count() per student
+                for student, new_id in zip(group, allocate_student_ids(department, len(group))):
+                    Student.objects.filter(pk=student.pk).update(student_id=new_id)
+                    self.stdout.write(f"Updated {student.name} to ID {new_id}")
+                    updated.append(new_id)
+            index_students(updated)
 
-        self.stdout.write(self.style.SUCCESS('Custom student IDs generated for existing students'))
+        self.stdout.write(self.style.SUCCESS(f'Custom student IDs generated for {len(updated)} existing students'))
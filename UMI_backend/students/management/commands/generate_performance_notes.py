@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from students.models import Student
+from students.services.analysis import NOTES_BATCH_SIZE, refresh_performance_notes
+
+class Command(BaseCommand):
+    help = 'Regenerate student performance notes whose results, fees or scholarships changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count the notes that would change without saving them',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rewrite every note, even if its inputs are unchanged',
+        )
+        parser.add_argument(
+            '--department',
+            type=int,
+            help='Only students of this department_id',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=NOTES_BATCH_SIZE,
+            help=f'Students loaded per batch (default {NOTES_BATCH_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN MODE - No changes will be made'))
+
+        students = Student.objects.all()
+        if options.get('department'):
+            students = students.filter(department_id=options['department'])
+
+        def progress(counts):
+            if options['verbosity'] > 1:
+                self.stdout.write(f"{counts['students']} students processed, {counts['updated']} notes changed")
+
+        counts = refresh_performance_notes(
+            students, force=options['force'], dry_run=dry_run,
+            batch_size=options['batch_size'], progress=progress
+        )
+
+        summary = f"{counts['updated']} of {counts['students']} notes ({counts['unchanged']} unchanged)"
+        if dry_run:
+            self.stdout.write(self.style.SUCCESS(f'Dry run complete. Would update {summary}.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Successfully updated {summary}.'))
@@ -1,6 +1,6 @@
 from django.core.management.base import BaseCommand
 from students.models import Student
-from academics.models import Course
+from students.services.enrollment import sync_semester_courses
 
 class Command(BaseCommand):
     help = 'Reassign courses to students based on their semester'
@@ -11,6 +11,11 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be done without making changes',
         )
+        parser.add_argument(
+            '--department',
+            type=int,
+            help='Only sync students of this department_id',
+        )
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
@@ -19,67 +24,25 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING('DRY RUN MODE - No changes will be made'))
 
         students = Student.objects.all()
-        total_students = students.count()
-        updated_students = 0
-
-        self.stdout.write(f'Processing {total_students} students...')
-
-        for student in students:
-            if not student.semester:
-                self.stdout.write(f'Skipping student {student.student_id} ({student.name}) - no semester assigned')
-                continue
-
-            # Get all courses for this semester
-            semester_courses = Course.objects.filter(
-                semester__semester_id=student.semester.semester_id
-            )
-
-            if not semester_courses.exists():
-                self.stdout.write(f'No courses found for semester {student.semester.name} (student: {student.student_id})')
-                continue
-
-            current_course_count = student.courses.count()
-            semester_course_count = semester_courses.count()
-
-            if current_course_count != semester_course_count:
-                if dry_run:
-                    self.stdout.write(
-                        f'Would update student {student.student_id} ({student.name}): '
-                        f'{current_course_count} -> {semester_course_count} courses'
-                    )
-                else:
-                    # Clear existing courses and assign new ones
-                    student.courses.clear()
-                    student.courses.set(semester_courses)
-                    updated_students += 1
-                    self.stdout.write(
-                        f'Updated student {student.student_id} ({student.name}): '
-                        f'{current_course_count} -> {semester_course_count} courses'
-                    )
-            else:
-                # Check if the courses match
-                current_course_ids = set(student.courses.values_list('course_id', flat=True))
-                semester_course_ids = set(semester_courses.values_list('course_id', flat=True))
-
-                if current_course_ids != semester_course_ids:
-                    if dry_run:
-                        self.stdout.write(
-                            f'Would reassign courses for student {student.student_id} ({student.name}): '
-                            f'courses do not match semester'
-                        )
-                    else:
-                        student.courses.clear()
-                        student.courses.set(semester_courses)
-                        updated_students += 1
-                        self.stdout.write(
-                            f'Reassigned courses for student {student.student_id} ({student.name})'
-                        )
-
+        if options.get('department'):
+            students = students.filter(department_id=options['department'])
+
+        # Semesters without courses are skipped rather than emptied, as before
+        plan = sync_semester_courses(students, dry_run=dry_run, skip_empty_semesters=True)
+
+        # The per-student diff is the point of a dry run; otherwise only with -v 2
+        if dry_run or options['verbosity'] > 1:
+            prefix = 'Would update' if dry_run else 'Updated'
+            for student_id, changes in sorted(plan['changes'].items()):
+                self.stdout.write(
+                    f"{prefix} student {student_id}: +{changes['added']} -{changes['removed']}"
+                )
+
+        summary = (
+            f"{len(plan['changes'])} of {plan['students']} students with a semester "
+            f"({len(plan['add'])} enrollments added, {len(plan['remove'])} removed)"
+        )
         if dry_run:
-            self.stdout.write(
-                self.style.SUCCESS(f'Dry run complete. Would update {updated_students} students.')
-            )
+            self.stdout.write(self.style.SUCCESS(f'Dry run complete. Would update {summary}.'))
         else:
-            self.stdout.write(
-                self.style.SUCCESS(f'Successfully updated {updated_students} out of {total_students} students.')
-            )
+            self.stdout.write(self.style.SUCCESS(f'Successfully updated {summary}.'))
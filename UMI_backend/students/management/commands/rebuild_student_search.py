@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from students.services.search import rebuild_search_index, search_available
+
+
+class Command(BaseCommand):
+    help = 'Drop and repopulate the student search index (e.g. after raw SQL edits to students)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Students inserted per statement')
+
+    def handle(self, *args, **options):
+        indexed = rebuild_search_index(batch_size=options['batch_size'])
+        if not search_available():
+            self.stdout.write(self.style.WARNING('Search index is not available on this database; searches use icontains'))
+            return
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} students'))
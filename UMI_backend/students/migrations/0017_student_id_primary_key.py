@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-17 08:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0016_alter_student_email'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='student',
+            name='email',
+            field=models.EmailField(max_length=254, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='student_id',
+            field=models.CharField(max_length=20, primary_key=True, serialize=False, unique=True),
+        ),
+        migrations.RemoveField(
+            model_name='student',
+            name='id',
+        ),
+    ]
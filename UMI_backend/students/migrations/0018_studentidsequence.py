@@ -0,0 +1,40 @@
+# Generated by Django 5.2.5 on 2026-10-17 11:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def seed_sequences(apps, schema_editor):
+    """Start each department's sequence after the highest number already in use"""
+    Department = apps.get_model('academics', 'Department')
+    Student = apps.get_model('students', 'Student')
+    StudentIdSequence = apps.get_model('students', 'StudentIdSequence')
+    sequences = []
+    for department in Department.objects.all():
+        prefix = department.code.lower()
+        numbers = [
+            int(student_id[len(prefix):])
+            for student_id in Student.objects.filter(student_id__startswith=prefix).values_list('student_id', flat=True)
+            if student_id[len(prefix):].isdigit()
+        ]
+        sequences.append(StudentIdSequence(department=department, last_value=max(numbers, default=0)))
+    StudentIdSequence.objects.bulk_create(sequences)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0019_studentperformancecounter'),
+        ('students', '0017_student_id_primary_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentIdSequence',
+            fields=[
+                ('department', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='student_id_sequence', serialize=False, to='academics.department')),
+                ('last_value', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
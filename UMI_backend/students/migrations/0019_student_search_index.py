@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-17 12:10
+
+from django.db import OperationalError, migrations
+
+SEARCH_TABLE = 'students_search'
+
+
+def create_search_index(apps, schema_editor):
+    """FTS5 index behind students.services.search; other databases use the icontains fallback"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    Student = apps.get_model('students', 'Student')
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+                f"USING fts5(student_id, name, email, tokenize = 'unicode61', prefix = '2 3')"
+            )
+        except OperationalError:
+            return  # SQLite built without FTS5
+        rows = []
+        for student in Student.objects.order_by().iterator(chunk_size=5000):
+            names = []
+            for value in (student.name, student.first_name, student.last_name):
+                if value and value not in names:
+                    names.append(value)
+            rows.append((student.student_id.replace('"', ''), ' '.join(names), student.email))
+        cursor.executemany(f"INSERT INTO {SEARCH_TABLE} (student_id, name, email) VALUES (%s, %s, %s)", rows)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0018_studentidsequence'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
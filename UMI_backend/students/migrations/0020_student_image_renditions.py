@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0019_student_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='image_renditions',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 13:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0020_student_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='performance_notes_version',
+            field=models.CharField(blank=True, default='', max_length=16),
+        ),
+    ]
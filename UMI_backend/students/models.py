@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 from django.db.models.signals import post_save
 from django.dispatch import receiver
@@ -6,12 +7,14 @@ class Student(models.Model):
     student_id = models.CharField(max_length=20, primary_key=True, unique=True)   # Custom ID like it-001
     name = models.CharField(max_length=100)
     email = models.EmailField(unique=True)
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, related_name='student_profile')
     phone = models.CharField(max_length=15)
     department = models.ForeignKey("academics.Department", on_delete=models.SET_NULL, null=True, blank=True)
     semester = models.ForeignKey("academics.Semester", on_delete=models.SET_NULL, null=True, blank=True)
     date_of_birth = models.DateField()
     father_guardian = models.CharField(max_length=100, blank=True, null=True)
     image = models.ImageField(upload_to="student_images/", null=True, blank=True)
+    image_renditions = models.JSONField(default=dict, blank=True)  # see academics.services.images
 
     # New fields for detailed form
     first_name = models.CharField(max_length=50, blank=True, null=True)
@@ -31,14 +34,14 @@ class Student(models.Model):
     cgpa = models.FloatField(default=0.0)                  # Cumulative GPA
     previous_cgpa = models.FloatField(default=0.0)         # For CGPA calculation
     performance_notes = models.TextField(blank=True, null=True)
+    performance_notes_version = models.CharField(max_length=16, blank=True, default='')  # inputs stamp, see students.services.analysis
 
     courses = models.ManyToManyField("academics.Course", related_name="students", blank=True)
 
     def save(self, *args, **kwargs):
         if not self.student_id and self.department:
-            dept_code = self.department.code.lower()
-            count = Student.objects.filter(department=self.department).count()
-            self.student_id = f"{dept_code}{str(count + 1).zfill(3)}"
+            from students.services.student_ids import allocate_student_id
+            self.student_id = allocate_student_id(self.department)
         super().save(*args, **kwargs)
 
     def can_perform_action(self, action_type):
@@ -116,6 +119,20 @@ class Student(models.Model):
         return self.name
 
 
+class StudentIdSequence(models.Model):
+    """
+    Last number handed out for each department's student IDs (e.g. cs042).
+    Only ever moves forward, so IDs are never reused after deletions.
+    """
+    department = models.OneToOneField(
+        "academics.Department", on_delete=models.CASCADE, primary_key=True, related_name="student_id_sequence"
+    )
+    last_value = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.department.code}: {self.last_value}"
+
+
 @receiver(post_save, sender=Student)
 def create_fee_for_student_semester(sender, instance, created, **kwargs):
     """
@@ -1,15 +1,49 @@
+import logging
+
 from rest_framework import serializers
 from .models import Student
-from academics.models import Course
 from academics.serializers import CourseSerializer, FeeSerializer
+from academics.services.images import rendition_urls
+from .services.enrollment import sync_semester_courses
+
+logger = logging.getLogger(__name__)
+
+
+def query_param_list(request, name):
+    value = request.query_params.get(name, '')
+    return {item.strip() for item in value.split(',') if item.strip()}
+
+
+class SparseFieldsMixin:
+    """
+    On GET requests ``?fields=a,b`` keeps only the listed fields, and fields
+    named in ``Meta.expandable_fields`` are left out unless asked for with
+    ``?expand=``.
+    """
 
-class StudentSerializer(serializers.ModelSerializer):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+        expand = query_param_list(request, 'expand')
+        for name in getattr(self.Meta, 'expandable_fields', ()):
+            if name not in expand:
+                self.fields.pop(name, None)
+        fields = query_param_list(request, 'fields')
+        if fields:
+            for name in set(self.fields) - fields - expand:
+                self.fields.pop(name)
+
+
+class StudentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     id = serializers.SerializerMethodField()
     department = serializers.SerializerMethodField()
     semester = serializers.SerializerMethodField()
     courses = CourseSerializer(many=True, read_only=True)
     department_id = serializers.IntegerField(required=False, allow_null=True)
     semester_id = serializers.IntegerField(required=False, allow_null=True)
+    image_renditions = serializers.SerializerMethodField()
 
     def get_id(self, obj):
         return obj.student_id
@@ -33,10 +67,13 @@ class StudentSerializer(serializers.ModelSerializer):
                 'semester_code': obj.semester.semester_code,
                 'program': obj.semester.program,
                 'capacity': obj.semester.capacity,
-                'department': obj.semester.department.department_id if obj.semester.department else None,
+                'department': obj.semester.department_id,
             }
         return None
 
+    def get_image_renditions(self, obj):
+        return rendition_urls(obj, self.context.get('request'))
+
     def get_department_id(self, obj):
         return obj.department.department_id if obj.department else None
 
@@ -45,68 +82,39 @@ class StudentSerializer(serializers.ModelSerializer):
         """
         Automatically assign all courses of the student's semester to the student
         """
-        import logging
-        logger = logging.getLogger(__name__)
-
         if not student.semester:
-            logger.warning(f"Student {student.name} (ID: {student.student_id}) has no semester assigned. Skipping course assignment.")
+            logger.warning("Student %s has no semester assigned; skipping course assignment", student.student_id)
             return
 
         try:
-            # Get all courses for this semester - use the semester object directly
-            semester_courses = Course.objects.filter(semester=student.semester)
-
-            # Get current courses before assignment for logging
-            current_course_ids = set(student.courses.values_list('course_id', flat=True))
-            new_course_ids = set(semester_courses.values_list('course_id', flat=True))
-
-            # Assign courses to student
-            student.courses.set(semester_courses)
-
-            # Log the assignment
-            course_names = [course.name for course in semester_courses]
-            logger.info(f"Student {student.name} (ID: {student.student_id}) enrolled in semester {student.semester.name} with {semester_courses.count()} courses: {course_names}")
-
-            # Log changes if any
-            added_courses = new_course_ids - current_course_ids
-            removed_courses = current_course_ids - new_course_ids
-
-            if added_courses:
-                added_course_names = list(Course.objects.filter(course_id__in=added_courses).values_list('name', flat=True))
-                logger.info(f"Added courses to student {student.name}: {added_course_names}")
-
-            if removed_courses:
-                removed_course_names = list(Course.objects.filter(course_id__in=removed_courses).values_list('name', flat=True))
-                logger.info(f"Removed courses from student {student.name}: {removed_course_names}")
-
+            plan = sync_semester_courses(Student.objects.filter(pk=student.pk))
+            changes = plan['changes'].get(student.student_id, {'added': [], 'removed': []})
+            logger.info(
+                "Student %s enrolled in semester %s: %d courses added, %d removed", student.student_id,
+                student.semester.name, len(changes['added']), len(changes['removed']),
+                extra={'student_id': student.student_id, 'semester_id': student.semester_id, **changes}
+            )
         except Exception as e:
-            logger.error(f"Error assigning courses to student {student.name} (ID: {student.student_id}): {str(e)}")
+            logger.error("Error assigning courses to student %s: %s", student.student_id, e)
             raise
 
     def validate(self, data):
-        # Debug: Print the incoming data
-        print(f"StudentSerializer validate - Incoming data: {data}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("StudentSerializer validate", extra={'fields': sorted(data)})
 
         # Ensure required fields are provided
         required_fields = ['email', 'department_id']
         for field in required_fields:
             if field not in data or not data[field]:
-                print(f"Missing required field: {field}")
+                logger.debug("StudentSerializer missing required field %s", field)
                 raise serializers.ValidationError(f"{field} is required")
 
         # Ensure either name or (first_name and last_name) are provided
         if not data.get('name') and not (data.get('first_name') and data.get('last_name')):
-            print("Missing name or first_name/last_name")
+            logger.debug("StudentSerializer missing name or first_name/last_name")
             raise serializers.ValidationError("Either 'name' or both 'first_name' and 'last_name' are required")
 
         # Guardian information is optional - don't require it
-        guardian_name = data.get('guardian_name')
-        father_guardian = data.get('father_guardian')
-
-        print(f"Guardian validation - guardian_name: '{guardian_name}', father_guardian: '{father_guardian}'")
-        print("Guardian information is optional - validation passed")
-
-        print("Validation passed successfully")
         return data
 
     def create(self, validated_data):
@@ -245,7 +253,44 @@ class StudentSerializer(serializers.ModelSerializer):
         fields = '__all__'
         extra_kwargs = {
             'password': {'write_only': True},  # Don't include password in responses
+            'user': {'read_only': True},  # Linked at signup / first profile lookup
             'name': {'required': False},  # Make name not required since we'll generate it
             'father_guardian': {'required': False},  # Make father_guardian not required since we'll map it
             'student_id': {'read_only': True},  # student_id is auto-generated
         }
+
+
+class StudentListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Compact student row for the directory; courses only with ?expand=courses"""
+    id = serializers.CharField(source='student_id', read_only=True)
+    department = serializers.SerializerMethodField()
+    semester = serializers.SerializerMethodField()
+    courses = CourseSerializer(many=True, read_only=True)
+    image_renditions = serializers.SerializerMethodField()
+
+    def get_image_renditions(self, obj):
+        return rendition_urls(obj, self.context.get('request'))
+
+    def get_department(self, obj):
+        if obj.department:
+            return {
+                'id': obj.department.department_id,
+                'name': obj.department.name,
+                'code': obj.department.code,
+                'description': obj.department.description,
+            }
+        return None
+
+    def get_semester(self, obj):
+        if obj.semester:
+            return {'id': obj.semester.semester_id, 'name': obj.semester.name, 'semester_code': obj.semester.semester_code}
+        return None
+
+    class Meta:
+        model = Student
+        fields = [
+            'id', 'student_id', 'name', 'first_name', 'last_name', 'email', 'phone', 'registration_number',
+            'batch', 'gender', 'image', 'image_renditions', 'department_id', 'semester_id', 'department', 'semester',
+            'attendance_percentage', 'gpa', 'cgpa', 'courses',
+        ]
+        expandable_fields = ('courses',)
@@ -0,0 +1,243 @@
+# students/services/admissions.py
+import csv
+import io
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from academics.models import Course, Department, Fee, FeeStructure, Semester
+from academics.services import fee_summary
+from students.models import Student
+from students.services.search import index_students
+from students.services.student_ids import allocate_student_ids
+
+ADMISSION_CHUNK_SIZE = 500
+
+GENDER_CHOICES = ['male', 'female', 'other']
+
+
+class AdmissionRowSerializer(serializers.Serializer):
+    """One row of a bulk admission file; lookups are checked against preloaded tables"""
+    name = serializers.CharField(max_length=100, required=False)
+    first_name = serializers.CharField(max_length=50, required=False)
+    last_name = serializers.CharField(max_length=50, required=False)
+    email = serializers.EmailField()
+    phone = serializers.CharField(max_length=15, required=False, default='N/A')
+    date_of_birth = serializers.DateField()
+    department_id = serializers.IntegerField()
+    semester_id = serializers.IntegerField(required=False)
+    gender = serializers.ChoiceField(choices=GENDER_CHOICES, required=False)
+    blood_group = serializers.CharField(max_length=5, required=False)
+    guardian_name = serializers.CharField(max_length=100, required=False)
+    guardian_contact = serializers.CharField(max_length=15, required=False)
+    address = serializers.CharField(required=False)
+    batch = serializers.CharField(max_length=20, required=False)
+    registration_number = serializers.CharField(max_length=20, required=False)
+
+    def validate(self, data):
+        if not data.get('name') and not (data.get('first_name') and data.get('last_name')):
+            raise serializers.ValidationError("Either 'name' or both 'first_name' and 'last_name' are required")
+
+        departments = self.context['departments']
+        semesters = self.context['semesters']
+        if data['department_id'] not in departments:
+            raise serializers.ValidationError({'department_id': f"Department with id {data['department_id']} does not exist"})
+        semester_id = data.get('semester_id')
+        if semester_id is not None:
+            semester = semesters.get(semester_id)
+            if semester is None:
+                raise serializers.ValidationError({'semester_id': f"Semester with id {semester_id} does not exist"})
+            if semester.department_id != data['department_id']:
+                raise serializers.ValidationError({'semester_id': 'Semester does not belong to the department'})
+        return data
+
+
+def iter_csv_rows(uploaded_file):
+    """Yield one dict per CSV line, reading the upload incrementally"""
+    text = io.TextIOWrapper(uploaded_file.file, encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.DictReader(text)
+    finally:
+        text.detach()
+
+
+def iter_xlsx_rows(uploaded_file):
+    """Yield one dict per row of the first worksheet, using openpyxl's streaming reader"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise serializers.ValidationError('XLSX import requires the openpyxl package; upload a CSV file instead')
+
+    workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else '' for cell in next(rows, [])]
+        for values in rows:
+            yield dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def iter_upload_rows(uploaded_file):
+    name = (uploaded_file.name or '').lower()
+    if name.endswith('.xlsx'):
+        return iter_xlsx_rows(uploaded_file)
+    if name.endswith('.csv'):
+        return iter_csv_rows(uploaded_file)
+    raise serializers.ValidationError('Unsupported file type. Upload a .csv or .xlsx file')
+
+
+def clean_row(row):
+    """Drop blank cells so optional columns fall back to their defaults"""
+    cleaned = {}
+    for key, value in row.items():
+        if key is None or value is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if value == '' or value.lower() == 'null':
+                continue
+        elif hasattr(value, 'date') and callable(value.date):
+            value = value.date()  # XLSX date cells come back as datetimes
+        cleaned[key.strip()] = value
+    return cleaned
+
+
+def import_admissions(rows, chunk_size=ADMISSION_CHUNK_SIZE):
+    """
+    Validate and create students from an iterable of row dicts, ``chunk_size``
+    rows at a time. Each chunk costs a fixed number of queries: one email
+    check, one ID block reservation per department, and bulk inserts for the
+    students, their semester courses and their first fee.
+
+    Returns {'total_rows', 'created', 'failed', 'student_ids', 'errors'} where
+    errors lists {'row': <1-based data row>, 'errors': ...}.
+    """
+    context = {
+        'departments': Department.objects.in_bulk(),
+        'semesters': Semester.objects.in_bulk(),
+    }
+    semester_courses = {}
+    fee_structures = {
+        (structure.department_id, structure.semester_id): structure
+        for structure in FeeStructure.objects.filter(is_active=True)
+    }
+    seen_emails = set()
+    report = {'total_rows': 0, 'created': 0, 'failed': 0, 'student_ids': [], 'errors': []}
+
+    numbered = enumerate(rows, start=1)
+    while chunk := list(islice(numbered, chunk_size)):
+        report['total_rows'] += len(chunk)
+        valid = []
+        for number, row in chunk:
+            serializer = AdmissionRowSerializer(data=clean_row(row), context=context)
+            if not serializer.is_valid():
+                report['errors'].append({'row': number, 'errors': serializer.errors})
+                continue
+            email = serializer.validated_data['email'].lower()
+            if email in seen_emails:
+                report['errors'].append({'row': number, 'errors': {'email': ['Duplicate email in this file']}})
+                continue
+            seen_emails.add(email)
+            valid.append((number, serializer.validated_data))
+
+        existing = set(
+            email.lower() for email in Student.objects.filter(
+                email__in=[data['email'] for _, data in valid]
+            ).values_list('email', flat=True)
+        )
+        accepted = []
+        for number, data in valid:
+            if data['email'].lower() in existing:
+                report['errors'].append({'row': number, 'errors': {'email': ['A student with this email already exists']}})
+            else:
+                accepted.append((number, data))
+
+        if accepted:
+            try:
+                created = _create_chunk(accepted, context, semester_courses, fee_structures)
+            except IntegrityError as e:
+                report['errors'].extend({'row': number, 'errors': {'non_field_errors': [str(e)]}} for number, _ in accepted)
+            else:
+                report['student_ids'].extend(created)
+                report['created'] += len(created)
+
+    report['failed'] = len(report['errors'])
+    report['errors'].sort(key=lambda error: error['row'])
+    return report
+
+
+def _create_chunk(accepted, context, semester_courses, fee_structures):
+    departments = context['departments']
+    semesters = context['semesters']
+
+    by_department = {}
+    for _, data in accepted:
+        by_department.setdefault(data['department_id'], []).append(data)
+
+    with transaction.atomic():
+        students = []
+        for department_id, rows in by_department.items():
+            department = departments[department_id]
+            for data, student_id in zip(rows, allocate_student_ids(department, len(rows))):
+                name = data.get('name')
+                if data.get('first_name') and data.get('last_name'):
+                    name = f"{data['first_name']} {data['last_name']}".strip()
+                students.append(Student(
+                    student_id=student_id,
+                    name=name,
+                    first_name=data.get('first_name'),
+                    last_name=data.get('last_name'),
+                    email=data['email'],
+                    phone=data.get('phone') or 'N/A',
+                    date_of_birth=data['date_of_birth'],
+                    department=department,
+                    semester=semesters.get(data.get('semester_id')),
+                    gender=data.get('gender', 'male'),
+                    blood_group=data.get('blood_group'),
+                    guardian_name=data.get('guardian_name'),
+                    father_guardian=data.get('guardian_name'),
+                    guardian_contact=data.get('guardian_contact'),
+                    address=data.get('address'),
+                    batch=data.get('batch'),
+                    registration_number=data.get('registration_number'),
+                ))
+        Student.objects.bulk_create(students)
+
+        enrollments = Student.courses.through
+        fees = []
+        course_rows = []
+        for student in students:
+            if not student.semester_id:
+                continue
+            if student.semester_id not in semester_courses:
+                semester_courses[student.semester_id] = list(
+                    Course.objects.filter(semester_id=student.semester_id).values_list('course_id', flat=True)
+                )
+            course_rows.extend(
+                enrollments(student_id=student.pk, course_id=course_id)
+                for course_id in semester_courses[student.semester_id]
+            )
+            fees.append(_first_fee(student, fee_structures))
+        enrollments.objects.bulk_create(course_rows)
+        Fee.objects.bulk_create(fees)
+        fee_summary.record_changes([(None, fee_summary.fee_row(fee)) for fee in fees])
+        index_students([student.pk for student in students])
+    return [student.pk for student in students]
+
+
+def _first_fee(student, fee_structures):
+    """The fee Student's post_save receivers would create for a new admission"""
+    structure = fee_structures.get((student.department_id, student.semester_id))
+    if structure:
+        amount, due_date = structure.amount, student.enrollment_date + timedelta(days=30)
+    else:
+        amount = Decimal(str(FeeStructure.get_default_amount_for_semester(student.semester)))
+        due_date = date(2025, 1, 1)
+    return Fee(
+        student=student, department_id=student.department_id, semester_id=student.semester_id,
+        amount=amount, paid_amount=0, balance=amount, status=Fee.UNPAID, due_date=due_date
+    )
@@ -1,41 +1,93 @@
 # students/services/analysis.py
-from django.db.models import Sum
+import hashlib
+import json
+from itertools import islice
+
+from django.db.models import F, Sum, Window
+from django.db.models.functions import RowNumber
 from academics.models import Result, Fee, Scholarship
+from students.models import Student
+from students.services.profile import invalidate_student_profiles_on_commit
 
-def generate_performance_notes(student):
+NOTES_BATCH_SIZE = 1000
+
+RECENT_RESULTS = 3
+
+
+def load_note_inputs(students):
+    """
+    Everything the notes are written from, for every student of ``students``,
+    in four queries: the students, their latest results (a window function
+    keeps the last RECENT_RESULTS per student), fee balances and scholarships.
+    Returns {student_id: inputs}.
+    """
+    inputs = {
+        student_id: {
+            'attendance': attendance or 0,
+            'gpa': gpa or 0,
+            'results': [],
+            'balance': 0.0,
+            'scholarships': [],
+        }
+        for student_id, attendance, gpa in students.values_list('student_id', 'attendance_percentage', 'gpa')
+    }
+    student_ids = list(inputs)
+
+    recent = (
+        Result.objects.filter(student_id__in=student_ids)
+        .annotate(position=Window(
+            RowNumber(), partition_by=[F('student_id')], order_by=[F('exam_date').desc(), F('result_id').desc()]
+        ))
+        .filter(position__lte=RECENT_RESULTS)
+        .order_by('student_id', 'position')
+        .values_list('student_id', 'course__name', 'obtained_marks', 'total_marks')
+    )
+    for student_id, course_name, obtained, total in recent:
+        inputs[student_id]['results'].append([course_name, obtained, total])
+
+    balances = (
+        Fee.objects.filter(student_id__in=student_ids)
+        .values('student_id')
+        .annotate(balance=Sum(F('amount') - F('paid_amount')))
+        .values_list('student_id', 'balance')
+    )
+    for student_id, balance in balances:
+        inputs[student_id]['balance'] = float(balance or 0)
+
+    for student_id, name in (
+        Scholarship.students.through.objects.filter(student_id__in=student_ids)
+        .order_by('scholarship_id').values_list('student_id', 'scholarship__name')
+    ):
+        inputs[student_id]['scholarships'].append(name)
+    return inputs
+
+
+def source_version(inputs):
+    """Stamp of the note inputs; the notes only need rewriting when it changes"""
+    return hashlib.sha1(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def render_notes(inputs):
     """
     Rule-based 'AI style' summary.
     Future me yahan LLM call plug kar sakti ho.
     """
-    # 1) Basic stats (already on student)
-    attendance = student.attendance_percentage or 0
-    gpa = student.gpa or 0
+    attendance = inputs['attendance']
+    gpa = inputs['gpa']
+    total_balance = inputs['balance']
+    scholarships = inputs['scholarships']
 
-    # 2) Results snapshot
-    results_qs = Result.objects.filter(student=student).order_by("-exam_date", "-result_id")
-    last3 = list(results_qs[:3])
     last3_lines = []
-    for r in last3:
+    for subject, obtained, total in inputs['results']:
         pct = None
-        if r.total_marks and r.obtained_marks is not None:
-            pct = round((float(r.obtained_marks) / float(r.total_marks)) * 100, 2)
+        if total and obtained is not None:
+            pct = round((float(obtained) / float(total)) * 100, 2)
         last3_lines.append(
-            f"{r.subject or 'Subject'}: {r.obtained_marks}/{r.total_marks}"
+            f"{subject or 'Subject'}: {obtained}/{total}"
             + (f" (~{pct}%)" if pct is not None else "")
         )
 
-    # 3) Fees summary
-    fees_qs = Fee.objects.filter(student=student)
-    total_balance = 0.0
-    for f in fees_qs:
-        total_balance += float(f.amount) - float(f.paid_amount)
-
-    # 4) Scholarships
-    scholarships = list(
-        Scholarship.objects.filter(students=student).values_list("name", flat=True)
-    )
-
-    # 5) Simple narrative
+    # Simple narrative
     parts = []
     parts.append(f"Attendance: {attendance:.1f}% | GPA: {gpa:.2f}.")
     if last3_lines:
@@ -64,4 +116,48 @@ def generate_performance_notes(student):
 
     parts.append("Recommendations: " + " ".join(recs))
 
-    return " ".join(parts)
\ No newline at end of file
+    return " ".join(parts)
+
+
+def notes_with_version(student):
+    """(notes, source version) for one student, the same text the batch refresh writes"""
+    inputs = load_note_inputs(Student.objects.filter(pk=student.pk))[student.pk]
+    return render_notes(inputs), source_version(inputs)
+
+
+def generate_performance_notes(student):
+    return notes_with_version(student)[0]
+
+
+def refresh_performance_notes(students, force=False, dry_run=False, batch_size=NOTES_BATCH_SIZE, progress=None):
+    """
+    Rewrite performance_notes for ``students`` (a queryset), ``batch_size``
+    students at a time: five queries per batch to load the inputs plus one
+    bulk_update of the students whose inputs changed since their notes were
+    written (compared through performance_notes_version), or of all of them
+    with ``force``. Returns {'students', 'updated', 'unchanged'}.
+    """
+    counts = {'students': 0, 'updated': 0, 'unchanged': 0}
+    student_ids = iter(students.order_by('pk').values_list('pk', flat=True))
+    while batch := list(islice(student_ids, batch_size)):
+        versions = dict(Student.objects.filter(pk__in=batch).values_list('pk', 'performance_notes_version'))
+        inputs = load_note_inputs(Student.objects.filter(pk__in=batch))
+        changed = []
+        for student_id, student_inputs in inputs.items():
+            version = source_version(student_inputs)
+            if not force and versions.get(student_id) == version:
+                continue
+            changed.append(Student(
+                student_id=student_id,
+                performance_notes=render_notes(student_inputs),
+                performance_notes_version=version,
+            ))
+        if changed and not dry_run:
+            Student.objects.bulk_update(changed, ['performance_notes', 'performance_notes_version'])
+            invalidate_student_profiles_on_commit([student.pk for student in changed])
+        counts['students'] += len(inputs)
+        counts['updated'] += len(changed)
+        counts['unchanged'] += len(inputs) - len(changed)
+        if progress:
+            progress(counts)
+    return counts
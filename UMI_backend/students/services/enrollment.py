@@ -0,0 +1,68 @@
+# students/services/enrollment.py
+from django.db import transaction
+
+from students.models import Student
+from students.services.profile import invalidate_student_profiles_on_commit
+
+SYNC_BATCH_SIZE = 5000
+
+
+def plan_course_sync(students, skip_empty_semesters=False):
+    """
+    Diff the course enrollments of ``students`` (a Student queryset) against
+    the courses of each student's semester, in two queries: the desired
+    (student, course) pairs and the current through-table rows. Students
+    without a semester are left alone, as are students whose semester has
+    no courses when ``skip_empty_semesters`` is set.
+
+    Returns {'students', 'add': [(student_id, course_id)], 'remove': [row id],
+    'changes': {student_id: {'added': [...], 'removed': [...]}}}.
+    """
+    desired = {}
+    for student_id, course_id in students.filter(semester__isnull=False).values_list('student_id', 'semester__courses'):
+        courses = desired.setdefault(student_id, set())
+        if course_id is not None:
+            courses.add(course_id)
+    if skip_empty_semesters:
+        desired = {student_id: courses for student_id, courses in desired.items() if courses}
+
+    enrollments = Student.courses.through
+    current = {}
+    for row_id, student_id, course_id in enrollments.objects.filter(
+        student__in=students.filter(semester__isnull=False).values('pk')
+    ).values_list('id', 'student_id', 'course_id'):
+        current.setdefault(student_id, {})[course_id] = row_id
+
+    plan = {'students': len(desired), 'add': [], 'remove': [], 'changes': {}}
+    for student_id, courses in desired.items():
+        enrolled = current.get(student_id, {})
+        added = sorted(courses - enrolled.keys())
+        removed = sorted(enrolled.keys() - courses)
+        if not added and not removed:
+            continue
+        plan['add'].extend((student_id, course_id) for course_id in added)
+        plan['remove'].extend(enrolled[course_id] for course_id in removed)
+        plan['changes'][student_id] = {'added': added, 'removed': removed}
+    return plan
+
+
+def apply_course_sync(plan, batch_size=SYNC_BATCH_SIZE):
+    """Insert and delete the through-table rows of a plan_course_sync() result in one transaction"""
+    enrollments = Student.courses.through
+    with transaction.atomic():
+        for start in range(0, len(plan['remove']), batch_size):
+            enrollments.objects.filter(id__in=plan['remove'][start:start + batch_size]).delete()
+        enrollments.objects.bulk_create(
+            [enrollments(student_id=student_id, course_id=course_id) for student_id, course_id in plan['add']],
+            batch_size=batch_size, ignore_conflicts=True
+        )
+    invalidate_student_profiles_on_commit(plan['changes'])
+    return {'added': len(plan['add']), 'removed': len(plan['remove']), 'students_changed': len(plan['changes'])}
+
+
+def sync_semester_courses(students, dry_run=False, skip_empty_semesters=False):
+    """Enroll ``students`` in exactly their semester's courses; returns the plan plus the applied counts"""
+    plan = plan_course_sync(students, skip_empty_semesters=skip_empty_semesters)
+    if not dry_run and plan['changes']:
+        plan.update(apply_course_sync(plan))
+    return plan
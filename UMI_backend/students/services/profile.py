@@ -0,0 +1,133 @@
+# students/services/profile.py
+from collections import OrderedDict
+from threading import Lock
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch
+
+from academics.models import Course
+from students.models import Student
+
+PROFILE_CACHE_TIMEOUT = 15 * 60
+
+USER_LINK_CACHE_TIMEOUT = 24 * 60 * 60
+
+USER_LINK_LRU_SIZE = 2048
+
+
+def profile_cache_key(student_id):
+    return f"student-profile:{student_id}"
+
+
+def user_link_cache_key(user_id):
+    return f"student-user:{user_id}"
+
+
+class _LRU:
+    """Small thread-safe per-process LRU of user id -> student id"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_user_links = _LRU(USER_LINK_LRU_SIZE)
+
+
+def invalidate_student_profiles(student_ids):
+    cache.delete_many([profile_cache_key(student_id) for student_id in student_ids])
+
+
+def invalidate_student_profiles_on_commit(student_ids):
+    # Only once the write commits: a read inside the transaction would cache the old state again
+    student_ids = list(student_ids)
+    transaction.on_commit(lambda: invalidate_student_profiles(student_ids))
+
+
+def forget_user_link(user_id):
+    _user_links.discard(user_id)
+    cache.delete(user_link_cache_key(user_id))
+
+
+def resolve_student_id(user):
+    """
+    Student id of a logged-in user: the per-process LRU, then the shared
+    cache, then Student.user. Accounts created before the link existed are
+    matched by email once and linked, so later lookups use the index.
+    """
+    student_id = _user_links.get(user.pk)
+    if student_id is not None:
+        return student_id
+
+    student_id = cache.get(user_link_cache_key(user.pk))
+    if student_id is None:
+        student_id = Student.objects.filter(user_id=user.pk).values_list('pk', flat=True).first()
+        if student_id is None and user.email:
+            student_id = Student.objects.filter(email=user.email, user__isnull=True).values_list('pk', flat=True).first()
+            if student_id is not None:
+                Student.objects.filter(pk=student_id, user__isnull=True).update(user_id=user.pk)
+        if student_id is None:
+            return None
+        cache.set(user_link_cache_key(user.pk), student_id, USER_LINK_CACHE_TIMEOUT)
+    _user_links.set(user.pk, student_id)
+    return student_id
+
+
+def build_student_profile(student_id, user_id):
+    """StudentSerializer payload of a student still linked to ``user_id``, or None"""
+    from students.serializers import StudentSerializer
+
+    student = (
+        Student.objects.filter(pk=student_id, user_id=user_id)
+        .select_related('department', 'semester')
+        .prefetch_related(Prefetch('courses', queryset=Course.objects.select_related('semester')))
+        .first()
+    )
+    if student is None:
+        return None
+    return StudentSerializer(student).data
+
+
+def get_student_profile(user):
+    """
+    Profile payload of the user's student, or None. Entries are keyed by
+    student and remember the user they were built for, so a link that
+    changed since a process cached it is noticed and re-resolved.
+    """
+    for _ in range(2):
+        student_id = resolve_student_id(user)
+        if student_id is None:
+            return None
+        entry = cache.get(profile_cache_key(student_id))
+        if entry is not None and entry['user_id'] == user.pk:
+            return entry['data']
+        data = build_student_profile(student_id, user.pk)
+        if data is not None:
+            cache.set(profile_cache_key(student_id), {'user_id': user.pk, 'data': data}, PROFILE_CACHE_TIMEOUT)
+            return data
+        forget_user_link(user.pk)
+    return None
@@ -0,0 +1,205 @@
+# students/services/search.py
+"""
+Student search index shared by the student directory and messaging recipient lookup.
+
+On SQLite the index is an FTS5 table (created by migration 0019) with one
+row per student: the student ID, every form of the name, and the email.
+Each word of a query matches as a prefix, so "ali kh" finds "Ali Khan", and
+typeahead results are ranked with bm25. Student signals keep the index in
+step with saves and deletes; bulk_create callers pass the new IDs to
+index_students(). On other databases, or before the migration has run,
+searches fall back to icontains filters.
+"""
+import re
+
+from django.db import connections, router
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from students.models import Student
+
+SEARCH_TABLE = 'students_search'
+
+TYPEAHEAD_LIMIT = 10
+
+# Relative bm25 weights of the student_id, name and email columns
+RANK_WEIGHTS = (2.0, 10.0, 4.0)
+
+# Student fields the index is built from; saves that touch none of them skip reindexing
+SEARCHABLE_FIELDS = ('student_id', 'name', 'first_name', 'last_name', 'email')
+
+FALLBACK_FIELDS = ('name', 'email', 'student_id', 'first_name', 'last_name')
+
+INDEX_CHUNK_SIZE = 500
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+_available = {}
+
+
+def _connection():
+    return connections[router.db_for_write(Student)]
+
+
+def search_available(connection=None):
+    """True when the FTS5 index table exists on the students database"""
+    connection = connection or _connection()
+    if connection.vendor != 'sqlite':
+        return False
+    key = (connection.alias, str(connection.settings_dict['NAME']))
+    if key not in _available:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [SEARCH_TABLE])
+            _available[key] = cursor.fetchone() is not None
+    return _available[key]
+
+
+def create_search_table(cursor):
+    """The index table; migration 0019 keeps its own copy of this definition"""
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+        f"USING fts5(student_id, name, email, tokenize = 'unicode61', prefix = '2 3')"
+    )
+
+
+def match_expression(query):
+    """FTS5 query matching every word of ``query`` as a prefix, or None if it has no words"""
+    tokens = _TOKEN.findall(query or '')
+    if not tokens:
+        return None
+    return ' AND '.join(f'"{token}"*' for token in tokens)
+
+
+def _searchable_name(student):
+    parts = []
+    for value in (student.name, student.first_name, student.last_name):
+        if value and value not in parts:
+            parts.append(value)
+    return ' '.join(parts)
+
+
+def _delete_rows(cursor, student_ids):
+    # Matching on the student_id column uses the index; the equality check drops phrase look-alikes
+    ids = ' OR '.join(f'"{student_id}"' for student_id in student_ids)
+    cursor.execute(
+        f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ("
+        f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s AND student_id IN ({', '.join(['%s'] * len(student_ids))}))",
+        [f'student_id : ({ids})', *student_ids]
+    )
+
+
+def _insert_rows(cursor, rows):
+    cursor.executemany(f"INSERT INTO {SEARCH_TABLE} (student_id, name, email) VALUES (%s, %s, %s)", rows)
+
+
+def _replace_rows(connection, rows, student_ids=None):
+    with connection.cursor() as cursor:
+        _delete_rows(cursor, student_ids or [row[0] for row in rows])
+        _insert_rows(cursor, rows)
+
+
+def _row(student):
+    return (student.student_id.replace('"', ''), _searchable_name(student), student.email)
+
+
+def index_student(student):
+    """(Re)index one saved student from the instance itself"""
+    connection = _connection()
+    if search_available(connection) and student.student_id:
+        _replace_rows(connection, [_row(student)])
+
+
+def index_students(student_ids):
+    """(Re)index the given students, e.g. after bulk_create; IDs that no longer exist are removed"""
+    connection = _connection()
+    if not search_available(connection):
+        return
+    student_ids = [str(student_id).replace('"', '') for student_id in student_ids]
+    for start in range(0, len(student_ids), INDEX_CHUNK_SIZE):
+        chunk = student_ids[start:start + INDEX_CHUNK_SIZE]
+        students = Student.objects.filter(pk__in=chunk).only(*SEARCHABLE_FIELDS)
+        _replace_rows(connection, [_row(student) for student in students], chunk)
+
+
+def unindex_students(student_ids):
+    connection = _connection()
+    if not search_available(connection):
+        return
+    student_ids = [str(student_id).replace('"', '') for student_id in student_ids]
+    with connection.cursor() as cursor:
+        for start in range(0, len(student_ids), INDEX_CHUNK_SIZE):
+            _delete_rows(cursor, student_ids[start:start + INDEX_CHUNK_SIZE])
+
+
+def rebuild_search_index(batch_size=5000):
+    """Drop and repopulate the whole index; returns the number of students indexed"""
+    connection = _connection()
+    if connection.vendor != 'sqlite':
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+        create_search_table(cursor)
+    _available.pop((connection.alias, str(connection.settings_dict['NAME'])), None)
+
+    indexed = 0
+    students = Student.objects.order_by().only(*SEARCHABLE_FIELDS)
+    with connection.cursor() as cursor:
+        batch = []
+        for student in students.iterator(chunk_size=batch_size):
+            batch.append(_row(student))
+            if len(batch) >= batch_size:
+                _insert_rows(cursor, batch)
+                indexed += len(batch)
+                batch = []
+        if batch:
+            _insert_rows(cursor, batch)
+            indexed += len(batch)
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+    return indexed
+
+
+def _fallback_filter(queryset, query):
+    for token in query.split():
+        condition = Q()
+        for field in FALLBACK_FIELDS:
+            condition |= Q(**{f'{field}__icontains': token})
+        queryset = queryset.filter(condition)
+    return queryset
+
+
+def filter_students(queryset, query):
+    """Narrow ``queryset`` to the students matching ``query`` (ordering is left to the caller)"""
+    if not query or not query.strip():
+        return queryset
+    if not search_available():
+        return _fallback_filter(queryset, query)
+    match = match_expression(query)
+    if match is None:
+        return queryset.none()
+    return queryset.filter(pk__in=RawSQL(
+        f"SELECT student_id FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", [match]
+    ))
+
+
+def typeahead(query, limit=TYPEAHEAD_LIMIT):
+    """
+    Best ``limit`` students for ``query``, ranked by bm25 over every match
+    in the index query itself. One index query, then one primary-key fetch.
+    """
+    if not query or not query.strip():
+        return []
+    if not search_available():
+        return list(_fallback_filter(Student.objects.order_by('name'), query)[:limit])
+    match = match_expression(query)
+    if match is None:
+        return []
+    weights = ', '.join(str(weight) for weight in RANK_WEIGHTS)
+    with _connection().cursor() as cursor:
+        cursor.execute(
+            f"SELECT student_id FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s "
+            f"ORDER BY bm25({SEARCH_TABLE}, {weights}) LIMIT %s",
+            [match, limit]
+        )
+        ranked = [student_id for (student_id,) in cursor.fetchall()]
+    students = Student.objects.in_bulk(ranked)
+    return [students[student_id] for student_id in ranked if student_id in students]
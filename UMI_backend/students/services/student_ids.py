@@ -0,0 +1,49 @@
+# students/services/student_ids.py
+from django.db import transaction
+
+from students.models import Student, StudentIdSequence
+
+
+def format_student_id(department, number):
+    """Department code plus a zero-padded number, e.g. cs007"""
+    return f"{department.code.lower()}{str(number).zfill(3)}"
+
+
+def _highest_existing_number(department):
+    """Largest number already used in this department's IDs (one scan, when the sequence is created)"""
+    prefix = department.code.lower()
+    highest = 0
+    for student_id in Student.objects.filter(student_id__startswith=prefix).values_list('student_id', flat=True).iterator():
+        suffix = student_id[len(prefix):]
+        if suffix.isdigit():
+            highest = max(highest, int(suffix))
+    return highest
+
+
+def reserve_student_numbers(department, count=1):
+    """
+    Reserve ``count`` consecutive numbers for the department and return them
+    as a range. The sequence row is locked for the rest of the caller's
+    transaction, so parallel workers always get disjoint blocks.
+    """
+    with transaction.atomic():
+        sequence = StudentIdSequence.objects.select_for_update().filter(department=department).first()
+        if sequence is None:
+            sequence, _ = StudentIdSequence.objects.get_or_create(
+                department=department,
+                defaults={'last_value': _highest_existing_number(department)}
+            )
+            sequence = StudentIdSequence.objects.select_for_update().get(pk=sequence.pk)
+        start = sequence.last_value + 1
+        sequence.last_value += count
+        sequence.save(update_fields=['last_value'])
+    return range(start, start + count)
+
+
+def allocate_student_ids(department, count):
+    """``count`` new student IDs for the department, reserved as one block"""
+    return [format_student_id(department, number) for number in reserve_student_numbers(department, count)]
+
+
+def allocate_student_id(department):
+    return allocate_student_ids(department, 1)[0]
@@ -0,0 +1,51 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Student
+from .services.profile import forget_user_link, invalidate_student_profiles
+from .services.search import SEARCHABLE_FIELDS, index_student, unindex_students
+
+
+@receiver(post_save, sender=Student)
+def update_student_search_index(sender, instance, update_fields=None, **kwargs):
+    # Saves of derived fields (cgpa, attendance, notes...) don't change what is searchable
+    if update_fields is not None and not set(update_fields) & set(SEARCHABLE_FIELDS):
+        return
+    index_student(instance)
+
+
+@receiver(post_delete, sender=Student)
+def remove_student_from_search_index(sender, instance, **kwargs):
+    unindex_students([instance.pk])
+
+
+def _invalidate_on_commit(student_ids, user_id=None):
+    # Only once the write commits: a read inside the transaction would cache the old state again
+    def invalidate():
+        invalidate_student_profiles(student_ids)
+        if user_id:
+            forget_user_link(user_id)
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=Student)
+def invalidate_profile(sender, instance, **kwargs):
+    _invalidate_on_commit([instance.pk])
+
+
+@receiver(post_delete, sender=Student)
+def invalidate_profile_and_user_link(sender, instance, **kwargs):
+    _invalidate_on_commit([instance.pk], instance.user_id)
+
+
+@receiver(m2m_changed, sender=Student.courses.through)
+def invalidate_profile_on_enrollment(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith('post_'):
+            _invalidate_on_commit([instance.pk])
+    elif action == 'pre_clear':
+        # course.students.clear(): read the students before the rows go
+        _invalidate_on_commit(list(instance.students.values_list('pk', flat=True)))
+    elif action in ('post_add', 'post_remove'):
+        _invalidate_on_commit(set(pk_set))
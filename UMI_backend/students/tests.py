@@ -1,8 +1,16 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from rest_framework.test import APIClient
 from rest_framework import status
+import io
+import shutil
+import tempfile
+from datetime import date, timedelta
+from django.core.files.uploadedfile import SimpleUploadedFile
 from students.models import Student
-from academics.models import Department, Semester, Course
+from students.services.enrollment import plan_course_sync, sync_semester_courses
+from students.services.search import filter_students, rebuild_search_index, typeahead
+from students.services.student_ids import allocate_student_id, allocate_student_ids
+from academics.models import Department, Semester, Course, Fee
 
 class StudentCourseAssignmentTests(TestCase):
     def setUp(self):
@@ -67,3 +75,562 @@ class StudentCourseAssignmentTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         student.refresh_from_db()
         self.assertEqual(student.courses.count(), 0)
+
+
+class StudentIdAllocatorTests(TestCase):
+    def setUp(self):
+        self.department = Department.objects.create(name="Computer Science", code="CS")
+
+    def create_student(self, n):
+        return Student.objects.create(
+            name=f"Student {n}",
+            email=f"student{n}@example.com",
+            phone="123",
+            date_of_birth=date(2000, 1, 1),
+            department=self.department,
+        )
+
+    def test_ids_are_sequential_per_department(self):
+        other = Department.objects.create(name="Mathematics", code="MATH")
+        first = self.create_student(1)
+        second = self.create_student(2)
+        third = Student.objects.create(name="Math", email="math@example.com", phone="1",
+                                       date_of_birth=date(2000, 1, 1), department=other)
+
+        self.assertEqual([first.pk, second.pk, third.pk], ["cs001", "cs002", "math001"])
+
+    def test_ids_are_not_reused_after_deletion(self):
+        self.create_student(1)
+        self.create_student(2).delete()
+
+        self.assertEqual(self.create_student(3).pk, "cs003")
+
+    def test_sequence_starts_after_existing_ids(self):
+        Student.objects.bulk_create([
+            Student(student_id="cs041", name="Old", email="old@example.com", phone="1",
+                    date_of_birth=date(2000, 1, 1), department=self.department)
+        ])
+
+        self.assertEqual(self.create_student(1).pk, "cs042")
+
+    def test_block_reservation_costs_the_same_for_any_size(self):
+        allocate_student_id(self.department)
+
+        with self.assertNumQueries(4):
+            ids = allocate_student_ids(self.department, 5000)
+
+        self.assertEqual(ids[0], "cs002")
+        self.assertEqual(ids[-1], "cs5001")
+        self.assertEqual(allocate_student_id(self.department), "cs5002")
+
+
+class BulkAdmissionImportTests(TestCase):
+    def setUp(self):
+        from django.contrib.auth import get_user_model
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user(username="admin", password="pass", role="admin"))
+        self.department = Department.objects.create(name="Computer Science", code="CS")
+        self.semester = Semester.objects.create(name="Semester 1", semester_code="S1", program="BCS", department=self.department)
+        self.courses = [
+            Course.objects.create(name=f"Course {i}", code=f"CS10{i}", semester=self.semester)
+            for i in range(2)
+        ]
+        Student.objects.create(name="Existing", email="taken@example.com", phone="1",
+                               date_of_birth=date(2000, 1, 1), department=self.department)
+
+    def upload(self, name, content):
+        return self.client.post("/api/students/bulk-import/", {"file": SimpleUploadedFile(name, content)}, format="multipart")
+
+    def csv_content(self, rows):
+        lines = ["name,email,department_id,semester_id,date_of_birth"] + rows
+        return "\n".join(lines).encode()
+
+    def test_csv_import_creates_students_courses_and_fees(self):
+        rows = [f"Student {i},student{i}@example.com,{self.department.pk},{self.semester.pk},2001-02-03" for i in range(1200)]
+
+        response = self.upload("admissions.csv", self.csv_content(rows))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 1200)
+        self.assertEqual(response.data["errors"], [])
+        self.assertEqual(response.data["student_ids"][:2], ["cs002", "cs003"])
+        admitted = Student.objects.filter(semester=self.semester)
+        self.assertEqual(admitted.count(), 1200)
+        self.assertEqual(Student.courses.through.objects.filter(student__in=admitted).count(), 2400)
+        fee = Fee.objects.get(student_id="cs002")
+        self.assertEqual(fee.balance, fee.amount)
+        self.assertEqual(Fee.objects.filter(student__in=admitted).count(), 1200)
+
+    def test_per_row_errors(self):
+        rows = [
+            f"Good,good@example.com,{self.department.pk},{self.semester.pk},2001-02-03",
+            f"Bad Email,not-an-email,{self.department.pk},,2001-02-03",
+            f"Taken,taken@example.com,{self.department.pk},,2001-02-03",
+            f"Duplicate,good@example.com,{self.department.pk},,2001-02-03",
+            "No Department,nodept@example.com,999,,2001-02-03",
+            f"No Birth Date,nodob@example.com,{self.department.pk},{self.semester.pk},",
+        ]
+
+        response = self.upload("admissions.csv", self.csv_content(rows))
+
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [2, 3, 4, 5, 6])
+        self.assertIn("email", response.data["errors"][0]["errors"])
+        self.assertIn("department_id", response.data["errors"][3]["errors"])
+        self.assertIn("date_of_birth", response.data["errors"][4]["errors"])
+        self.assertFalse(Student.objects.filter(email="nodob@example.com").exists())
+
+    def test_xlsx_import(self):
+        from openpyxl import Workbook
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(["first_name", "last_name", "email", "department_id", "semester_id", "date_of_birth"])
+        sheet.append(["Ada", "Lovelace", "ada@example.com", self.department.pk, self.semester.pk, date(2001, 2, 3)])
+        content = io.BytesIO()
+        workbook.save(content)
+
+        response = self.upload("admissions.xlsx", content.getvalue())
+
+        self.assertEqual(response.data["created"], 1)
+        student = Student.objects.get(email="ada@example.com")
+        self.assertEqual(student.name, "Ada Lovelace")
+        self.assertEqual(student.date_of_birth, date(2001, 2, 3))
+
+    def test_unsupported_file_type(self):
+        response = self.upload("admissions.txt", b"hello")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class StudentDirectoryListTests(TestCase):
+    def setUp(self):
+        from django.contrib.auth import get_user_model
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user(username="admin", password="pass", role="admin"))
+        self.department = Department.objects.create(name="Computer Science", code="CS")
+        self.semester = Semester.objects.create(name="Semester 1", semester_code="S1", program="BCS", department=self.department)
+        courses = [Course.objects.create(name=f"Course {i}", code=f"CS10{i}", semester=self.semester) for i in range(3)]
+        for i in range(120):
+            student = Student.objects.create(name=f"Student {i:03d}", email=f"s{i}@example.com", phone="1",
+                                             date_of_birth=date(2000, 1, 1), department=self.department,
+                                             semester=self.semester)
+            student.courses.set(courses)
+
+    def test_list_is_compact_and_query_count_is_flat(self):
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/students/")
+        self.assertEqual(len(response.data["results"]), 50)
+        row = response.data["results"][0]
+        self.assertNotIn("courses", row)
+        self.assertEqual(row["department"]["code"], "CS")
+        self.assertIn("description", row["department"])
+        self.assertEqual(row["semester_id"], self.semester.pk)
+
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/students/?expand=courses")
+        self.assertEqual(len(response.data["results"][0]["courses"]), 3)
+
+    def test_cursor_pagination(self):
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/students/")
+        self.assertEqual(len(response.data["results"]), 50)
+        self.assertIsNone(response.data["previous"])
+        self.assertEqual(response.data["results"][0]["name"], "Student 000")
+
+        names = [row["name"] for row in response.data["results"]]
+        next_url = response.data["next"]
+        while next_url:
+            response = self.client.get(next_url)
+            names.extend(row["name"] for row in response.data["results"])
+            next_url = response.data["next"]
+        self.assertEqual(names, [f"Student {i:03d}" for i in range(120)])
+
+        response = self.client.get("/api/students/?page_size=500")
+        self.assertEqual(len(response.data["results"]), 120)
+        self.assertIsNone(response.data["next"])
+
+    def test_sparse_fields(self):
+        response = self.client.get("/api/students/?fields=id,name")
+        self.assertEqual(set(response.data["results"][0]), {"id", "name"})
+
+        student_id = response.data["results"][0]["id"]
+        with self.assertNumQueries(2):
+            response = self.client.get(f"/api/students/{student_id}/")
+        self.assertEqual(len(response.data["courses"]), 3)
+        self.assertEqual(response.data["semester"]["department"], self.department.pk)
+
+        response = self.client.get(f"/api/students/{student_id}/?fields=email,courses")
+        self.assertEqual(set(response.data), {"email", "courses"})
+
+
+class StudentSearchIndexTests(TestCase):
+    def setUp(self):
+        from django.contrib.auth import get_user_model
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user(username="admin", password="pass", role="admin"))
+        self.department = Department.objects.create(name="Computer Science", code="CS")
+        self.ali = self.create_student("Ali", "Khan", "ali.khan@example.com")
+        self.sara = self.create_student("Sara", "Ali", "sara@example.com")
+        self.omar = self.create_student("Omar", "Farooq", "omar@uni.edu")
+
+    def create_student(self, first_name, last_name, email):
+        return Student.objects.create(name=f"{first_name} {last_name}", first_name=first_name, last_name=last_name,
+                                      email=email, phone="1", date_of_birth=date(2000, 1, 1), department=self.department)
+
+    def search(self, query):
+        return set(filter_students(Student.objects.all(), query).values_list("pk", flat=True))
+
+    def test_prefix_matching_on_every_field(self):
+        self.assertEqual(self.search("ali kh"), {self.ali.pk})
+        self.assertEqual(self.search("ali"), {self.ali.pk, self.sara.pk})
+        self.assertEqual(self.search("uni.edu"), {self.omar.pk})
+        self.assertEqual(self.search(self.omar.pk), {self.omar.pk})
+        self.assertEqual(self.search("zzz"), set())
+
+    def test_index_follows_saves_and_deletes(self):
+        self.omar.name = "Omar Siddiqui"
+        self.omar.save()
+        self.assertEqual(self.search("siddiq"), {self.omar.pk})
+        self.assertEqual(self.search("farooq"), {self.omar.pk})  # still in last_name
+
+        self.sara.delete()
+        self.assertEqual(self.search("sara"), set())
+
+        self.assertEqual(rebuild_search_index(), 2)
+        self.assertEqual(self.search("ali"), {self.ali.pk})
+
+    def test_typeahead_ranks_name_matches_first(self):
+        self.create_student("Zain", "Malik", "alim@example.com")
+        with self.assertNumQueries(2):
+            ranked = typeahead("ali", limit=2)
+        self.assertEqual(len(ranked), 2)
+        self.assertNotIn("alim@example.com", [student.email for student in ranked])
+
+    def test_typeahead_ranks_every_match(self):
+        from students.services.search import index_students
+        weak = Student.objects.bulk_create([
+            Student(student_id=f"x{i:04}", name=f"Student {i}", email=f"raz{i}@example.com", phone="1",
+                    date_of_birth=date(2000, 1, 1), department=self.department)
+            for i in range(600)
+        ])
+        index_students([student.pk for student in weak])
+        raza = self.create_student("Raza", "Shah", "shah@example.com")
+        self.assertEqual(typeahead("raz", limit=1), [raza])
+
+    def test_directory_and_recipient_search(self):
+        response = self.client.get("/api/students/?search=khan")
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.ali.pk])
+
+        response = self.client.get("/api/messaging/messages/search_recipients/?q=sara")
+        self.assertEqual(response.data, [
+            {"id": self.sara.pk, "name": "Sara Ali", "email": "sara@example.com", "type": "STUDENT"}
+        ])
+
+
+def sample_photo():
+    from PIL import Image
+    image = Image.new("RGB", (2000, 1000), "navy")
+    exif = Image.Exif()
+    exif[0x0112] = 6  # orientation: rotate 90 degrees
+    exif[0x010F] = "Camera Maker"
+    content = io.BytesIO()
+    image.save(content, "JPEG", exif=exif)
+    return SimpleUploadedFile("photo.jpg", content.getvalue(), content_type="image/jpeg")
+
+
+class StudentPhotoUploadTests(TestCase):
+    def setUp(self):
+        from django.contrib.auth import get_user_model
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, IMAGE_PROCESSING_WORKERS=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user(username="admin", password="pass", role="admin"))
+        department = Department.objects.create(name="Computer Science", code="CS")
+        self.students = [
+            Student.objects.create(name=f"Student {i}", email=f"s{i}@example.com", phone="1",
+                                   date_of_birth=date(2000, 1, 1), department=department)
+            for i in range(2)
+        ]
+
+    def photo(self):
+        return sample_photo()
+
+    def upload(self, student, upload):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(f"/api/students/{student.pk}/upload-image/", {"image": upload}, format="multipart")
+
+    def test_upload_produces_stripped_webp_renditions(self):
+        from PIL import Image
+        from django.core.files.storage import default_storage
+
+        response = self.upload(self.students[0], self.photo())
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["student"]["image_renditions"]["status"], "processing")
+
+        student = Student.objects.get(pk=self.students[0].pk)
+        renditions = student.image_renditions
+        self.assertTrue(student.image.name.startswith("student_images/"))
+        self.assertTrue(student.image.name.endswith(".webp"))
+        for name, longest_side in ((student.image.name, 1600), (renditions["medium"], 480), (renditions["thumbnail"], 128)):
+            with default_storage.open(name) as stored, Image.open(stored) as image:
+                self.assertEqual(image.format, "WEBP")
+                self.assertEqual(max(image.size), longest_side)
+                self.assertGreater(image.size[1], image.size[0])  # orientation applied
+                self.assertEqual(dict(image.getexif()), {})
+        # Pending files are left for garbage collection: an identical upload may be reusing one
+        pending = default_storage.listdir("student_images/pending")[1]
+        self.assertEqual(len(pending), 1)
+        from academics.storage import collect_garbage
+        collect_garbage(grace=timedelta(0))
+        self.assertEqual(default_storage.listdir("student_images/pending")[1], [])
+
+        response = self.client.get("/api/students/?fields=id,image_renditions")
+        thumbnail = response.data["results"][0]["image_renditions"]
+        self.assertEqual(thumbnail["status"], "ready")
+        self.assertTrue(thumbnail["thumbnail"].endswith(renditions["thumbnail"]))
+
+    def test_identical_uploads_share_files(self):
+        self.upload(self.students[0], self.photo())
+        self.upload(self.students[1], self.photo())
+        first, second = (Student.objects.get(pk=student.pk) for student in self.students)
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertEqual(first.image_renditions, second.image_renditions)
+
+    def test_rejects_files_that_are_not_images(self):
+        fake = SimpleUploadedFile("photo.jpg", b"not really a jpeg", content_type="image/jpeg")
+        response = self.upload(self.students[0], fake)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Student.objects.get(pk=self.students[0].pk).image_renditions, {})
+
+
+class CourseSyncTests(TestCase):
+    def setUp(self):
+        department = Department.objects.create(name="Computer Science", code="CS")
+        self.first = Semester.objects.create(name="Semester 1", semester_code="S1", program="BCS", department=department)
+        self.second = Semester.objects.create(name="Semester 2", semester_code="S2", program="BCS", department=department)
+        empty = Semester.objects.create(name="Semester 3", semester_code="S3", program="BCS", department=department)
+        self.first_courses = [Course.objects.create(name=f"C1{i}", code=f"C1{i}", semester=self.first) for i in range(3)]
+        self.second_course = Course.objects.create(name="C20", code="C20", semester=self.second)
+
+        def student(semester, courses):
+            created = Student.objects.create(name="Student", email=f"s{Student.objects.count()}@example.com", phone="1",
+                                             date_of_birth=date(2000, 1, 1), department=department, semester=semester)
+            Student.courses.through.objects.bulk_create(
+                [Student.courses.through(student_id=created.pk, course_id=course.pk) for course in courses]
+            )
+            return created
+
+        self.unenrolled = student(self.first, [])
+        self.mixed = student(self.first, [self.first_courses[0], self.second_course])
+        self.synced = student(self.first, self.first_courses)
+        self.no_semester = student(None, [self.second_course])
+        self.empty_semester = student(empty, [self.second_course])
+
+    def enrolled(self, student):
+        return set(student.courses.values_list("course_id", flat=True))
+
+    def test_plan_is_two_queries_and_a_minimal_diff(self):
+        with self.assertNumQueries(2):
+            plan = plan_course_sync(Student.objects.all())
+        first_ids = [course.pk for course in self.first_courses]
+        self.assertEqual(plan["students"], 4)
+        self.assertEqual(plan["changes"], {
+            self.unenrolled.pk: {"added": first_ids, "removed": []},
+            self.mixed.pk: {"added": first_ids[1:], "removed": [self.second_course.pk]},
+            self.empty_semester.pk: {"added": [], "removed": [self.second_course.pk]},
+        })
+
+    def test_sync_applies_bulk_changes_and_is_idempotent(self):
+        with self.assertNumQueries(2):
+            sync_semester_courses(Student.objects.all(), dry_run=True)
+        self.assertEqual(self.enrolled(self.unenrolled), set())
+
+        with self.assertNumQueries(6):  # plan (2), savepoint, one delete, one insert, release
+            plan = sync_semester_courses(Student.objects.all())
+        self.assertEqual((plan["added"], plan["removed"]), (5, 2))
+        first_ids = {course.pk for course in self.first_courses}
+        for student in (self.unenrolled, self.mixed, self.synced):
+            self.assertEqual(self.enrolled(student), first_ids)
+        self.assertEqual(self.enrolled(self.no_semester), {self.second_course.pk})
+        self.assertEqual(self.enrolled(self.empty_semester), set())
+        self.assertEqual(plan_course_sync(Student.objects.all())["changes"], {})
+
+    def test_command_keeps_students_of_semesters_without_courses(self):
+        from django.core.management import call_command
+        out = io.StringIO()
+        call_command("reassign_semester_courses", "--dry-run", stdout=out)
+        self.assertIn(f"Would update student {self.mixed.pk}", out.getvalue())
+        self.assertEqual(self.enrolled(self.unenrolled), set())
+
+        call_command("reassign_semester_courses", stdout=io.StringIO())
+        self.assertEqual(self.enrolled(self.unenrolled), {course.pk for course in self.first_courses})
+        self.assertEqual(self.enrolled(self.empty_semester), {self.second_course.pk})
+
+
+class PerformanceNotesTests(TestCase):
+    def setUp(self):
+        from django.contrib.auth import get_user_model
+        from academics.models import Result, Scholarship
+        department = Department.objects.create(name="Computer Science", code="CS")
+        self.course = Course.objects.create(name="Databases", code="DB101")
+        self.students = [
+            Student.objects.create(name=f"Student {i}", email=f"notes{i}@example.com", phone="1",
+                                   date_of_birth=date(2000, 1, 1), department=department,
+                                   attendance_percentage=90, gpa=3.2)
+            for i in range(3)
+        ]
+        for day in range(1, 6):
+            Result.objects.create(student=self.students[0], course=self.course, exam_date=date(2025, 1, day),
+                                  total_marks=100, obtained_marks=60 + day)
+        self.fee = Fee.objects.create(student=self.students[1], amount=1000, paid_amount=400, due_date=date(2025, 1, 1))
+        Scholarship.objects.create(name="Merit", amount=500).students.add(self.students[2])
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user(username="admin", password="pass", role="admin"))
+
+    def notes(self, student):
+        student.refresh_from_db()
+        return student.performance_notes
+
+    def test_batch_matches_single_student_notes(self):
+        from students.services.analysis import generate_performance_notes, refresh_performance_notes
+        # ids, then per batch: versions, students, results, fees, scholarships and one bulk UPDATE
+        with self.assertNumQueries(7):
+            counts = refresh_performance_notes(Student.objects.all())
+        self.assertEqual(counts, {"students": 3, "updated": 3, "unchanged": 0})
+        for student in self.students:
+            self.assertEqual(self.notes(student), generate_performance_notes(student))
+        self.assertEqual(self.notes(self.students[0]).count("Databases:"), 3)
+        self.assertIn("Outstanding fee balance: 600.00.", self.notes(self.students[1]))
+        self.assertIn("Scholarships: Merit.", self.notes(self.students[2]))
+
+    def test_unchanged_students_are_skipped(self):
+        from students.services.analysis import refresh_performance_notes
+        refresh_performance_notes(Student.objects.all())
+        with self.assertNumQueries(6):
+            counts = refresh_performance_notes(Student.objects.all())
+        self.assertEqual(counts, {"students": 3, "updated": 0, "unchanged": 3})
+
+        self.fee.paid_amount = 1000
+        self.fee.save()
+        counts = refresh_performance_notes(Student.objects.all())
+        self.assertEqual((counts["updated"], counts["unchanged"]), (1, 2))
+        self.assertIn("Fees are clear", self.notes(self.students[1]))
+
+        self.assertEqual(refresh_performance_notes(Student.objects.all(), force=True)["updated"], 3)
+
+    def test_dry_run_and_batches(self):
+        from students.services.analysis import refresh_performance_notes
+        counts = refresh_performance_notes(Student.objects.all(), dry_run=True, batch_size=2)
+        self.assertEqual(counts["updated"], 3)
+        self.assertFalse(Student.objects.exclude(performance_notes_version="").exists())
+
+        seen = []
+        refresh_performance_notes(Student.objects.all(), batch_size=2, progress=lambda c: seen.append(c["students"]))
+        self.assertEqual(seen, [2, 3])
+
+    def test_endpoints(self):
+        response = self.client.post("/api/students/generate-notes/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["updated"], 3)
+        response = self.client.post("/api/students/generate-notes/")
+        self.assertEqual(response.data, {"students": 3, "updated": 0, "unchanged": 3})
+
+        response = self.client.post(f"/api/students/{self.students[1].pk}/generate-notes/?save=false")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["performance_notes"], self.notes(self.students[1]))
+
+    def test_command(self):
+        from django.core.management import call_command
+        out = io.StringIO()
+        call_command("generate_performance_notes", "--dry-run", stdout=out)
+        self.assertIn("Would update 3 of 3 notes", out.getvalue())
+        call_command("generate_performance_notes", stdout=io.StringIO())
+        out = io.StringIO()
+        call_command("generate_performance_notes", stdout=out)
+        self.assertIn("0 of 3 notes (3 unchanged)", out.getvalue())
+
+
+class StudentProfileCacheTests(TestCase):
+    def setUp(self):
+        from django.contrib.auth import get_user_model
+        from django.core.cache import cache
+        from students.services import profile
+        cache.clear()
+        profile._user_links.clear()
+        self.addCleanup(profile._user_links.clear)
+        department = Department.objects.create(name="Computer Science", code="CS")
+        self.semester = Semester.objects.create(name="Semester 1", semester_code="S1", program="BCS", department=department)
+        self.course = Course.objects.create(name="Databases", code="DB101", semester=self.semester)
+        self.student = Student.objects.create(name="Ali", email="ali@example.com", phone="1", date_of_birth=date(2000, 1, 1),
+                                              department=department, semester=self.semester)
+        self.user = get_user_model().objects.create_user(username="ali", email="ali@example.com", password="pass", role="student")
+        self.student.refresh_from_db()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_signup_links_existing_student_and_profile_is_cached(self):
+        self.assertEqual(self.student.user_id, self.user.pk)
+        with self.assertNumQueries(3):  # student, department/semester join, courses
+            response = self.client.get("/api/students/profile/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["email"], "ali@example.com")
+        with self.assertNumQueries(0):
+            cached = self.client.get("/api/students/profile/")
+        self.assertEqual(cached.data, response.data)
+
+    def test_changes_invalidate_profile(self):
+        self.client.get("/api/students/profile/")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.courses.add(self.course)
+            # Kept until the write commits, so a concurrent read can't cache the old state again
+            self.assertEqual(self.client.get("/api/students/profile/").data["courses"], [])
+        self.assertEqual([c["name"] for c in self.client.get("/api/students/profile/").data["courses"]], ["Databases"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.students.clear()
+        self.assertEqual(self.client.get("/api/students/profile/").data["courses"], [])
+
+        Student.objects.filter(pk=self.student.pk).update(phone="0300")
+        self.student.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.save()
+        self.assertEqual(self.client.get("/api/students/profile/").data["phone"], "0300")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.delete()
+        self.assertEqual(self.client.get("/api/students/profile/").status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_photo_upload_invalidates_profile(self):
+        from academics.services.images import accept_upload
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.assertEqual(self.client.get("/api/students/profile/").data["image_renditions"]["status"], "none")
+        with override_settings(MEDIA_ROOT=media_root, IMAGE_PROCESSING_WORKERS=0):
+            with self.captureOnCommitCallbacks(execute=True):
+                accept_upload(self.student, sample_photo())
+            profile = self.client.get("/api/students/profile/").data
+        self.assertEqual(profile["image_renditions"]["status"], "ready")
+        self.assertTrue(profile["image"].endswith(".webp"))
+
+    def test_relinked_student_is_not_served_from_a_stale_link(self):
+        from django.contrib.auth import get_user_model
+        from django.core.cache import cache
+        self.client.get("/api/students/profile/")
+        other = get_user_model().objects.create_user(username="sara", email="sara@example.com", password="pass", role="admin")
+        # Bypass the signals, as another process would; only the link check catches it
+        Student.objects.filter(pk=self.student.pk).update(user=other)
+        cache.delete(f"student-profile:{self.student.pk}")
+        self.assertEqual(self.client.get("/api/students/profile/").status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_unlinked_student_is_matched_by_email_once(self):
+        Student.objects.filter(pk=self.student.pk).update(user=None)
+        from students.services import profile
+        profile._user_links.clear()
+        from django.core.cache import cache
+        cache.clear()
+        self.assertEqual(self.client.get("/api/students/profile/").status_code, status.HTTP_200_OK)
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.user_id, self.user.pk)
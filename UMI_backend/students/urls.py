@@ -6,6 +6,7 @@ router = DefaultRouter()
 router.register(r'', StudentViewSet)
 
 urlpatterns = [
-    path('', include(router.urls)),
+    # Before the router, whose detail route would otherwise take 'profile' as a student id
     path('profile/', StudentProfileView.as_view(), name='student-profile'),
+    path('', include(router.urls)),
 ]
\ No newline at end of file
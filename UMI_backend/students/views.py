@@ -1,3 +1,5 @@
+import logging
+
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -7,57 +9,96 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-from .services.analysis import generate_performance_notes
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from django.db.models import Prefetch
+from .services.analysis import notes_with_version, refresh_performance_notes
+from .services.admissions import import_admissions, iter_upload_rows
+from .services.profile import get_student_profile
+from .services.search import filter_students
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from .models import Student
-from .serializers import StudentSerializer
+from .serializers import StudentSerializer, StudentListSerializer, query_param_list
 from .permissions import IsStaffOrAdmin
+from academics.models import Course
+from academics.services.images import accept_upload
 from academics.serializers import CourseSerializer
+from monitoring.structured_logging import request_keys
+
+logger = logging.getLogger(__name__)
+
+
+class StudentCursorPagination(CursorPagination):
+    """Cursor pages of the student directory: {'next', 'previous', 'results'}"""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = ('name', 'student_id')
+
+
+class StudentSearchFilter(SearchFilter):
+    """?search= answered from the student search index instead of LIKE scans over search_fields"""
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        return filter_students(queryset, ' '.join(terms))
+
 
 class StudentViewSet(viewsets.ModelViewSet):
+    """
+    Students. The list uses the compact StudentListSerializer (courses with
+    ?expand=courses); detail views keep the full StudentSerializer shape.
+    Both accept ?fields= to return only some fields.
+    """
     queryset = Student.objects.all()
     serializer_class = StudentSerializer
+    pagination_class = StudentCursorPagination
     permission_classes = [IsStaffOrAdmin]  # Admin or staff modify kar sakta
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, StudentSearchFilter, OrderingFilter]
     filterset_fields = ['department', 'semester']
     search_fields = ['name', 'email', 'student_id', 'first_name', 'last_name']
     ordering_fields = ['name', 'student_id', 'enrollment_date']
-    ordering = ['name']
+    ordering = ['name', 'student_id']
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return StudentListSerializer
+        return StudentSerializer
 
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().select_related('department', 'semester')
+        if self.action != 'list' or 'courses' in query_param_list(self.request, 'expand'):
+            queryset = queryset.prefetch_related(
+                Prefetch('courses', queryset=Course.objects.select_related('semester'))
+            )
+
         department = self.request.query_params.get('department')
         semester = self.request.query_params.get('semester')
-
-        print(f"StudentViewSet filtering - department: {department}, semester: {semester}")
-
         if department:
             queryset = queryset.filter(department_id=department)
-            print(f"Filtered by department {department}: {queryset.count()} students")
         if semester:
             queryset = queryset.filter(semester_id=semester)
-            print(f"Filtered by semester {semester}: {queryset.count()} students")
 
         return queryset
 
     def create(self, request, *args, **kwargs):
-        print(f"StudentViewSet create - Request data: {request.data}")
-        print(f"Request content type: {request.content_type}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("StudentViewSet create", extra={'fields': request_keys(request), 'content_type': request.content_type})
         try:
             return super().create(request, *args, **kwargs)
         except Exception as e:
-            print(f"StudentViewSet create - Validation error: {e}")
-            print(f"Request data keys: {list(request.data.keys()) if hasattr(request.data, 'keys') else 'No keys'}")
+            logger.info("StudentViewSet create failed: %s", e, extra={'fields': request_keys(request)})
             raise
 
     def update(self, request, *args, **kwargs):
-        print(f"StudentViewSet update - Request data: {request.data}")
-        print(f"Request content type: {request.content_type}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("StudentViewSet update", extra={'fields': request_keys(request), 'content_type': request.content_type})
         try:
             return super().update(request, *args, **kwargs)
         except Exception as e:
-            print(f"StudentViewSet update - Validation error: {e}")
-            print(f"Request data keys: {list(request.data.keys()) if hasattr(request.data, 'keys') else 'No keys'}")
+            logger.info("StudentViewSet update failed: %s", e, extra={'fields': request_keys(request)})
             raise
 
     @action(detail=True, methods=["post"], url_path="generate-notes")
@@ -69,12 +110,13 @@ class StudentViewSet(viewsets.ModelViewSet):
           - save=false  (agar sirf preview chahiye ho, save na karna ho)
         """
         student = self.get_object()
-        notes = generate_performance_notes(student)
+        notes, version = notes_with_version(student)
 
         save_flag = str(request.query_params.get("save", "true")).lower() != "false"
         if save_flag:
             student.performance_notes = notes
-            student.save(update_fields=["performance_notes"])
+            student.performance_notes_version = version
+            student.save(update_fields=["performance_notes", "performance_notes_version"])
 
         return Response(
             {
@@ -85,6 +127,48 @@ class StudentViewSet(viewsets.ModelViewSet):
             status=status.HTTP_200_OK,
         )
 
+    @action(detail=False, methods=["post"], url_path="generate-notes")
+    def generate_notes_bulk(self, request):
+        """
+        POST /api/students/generate-notes/?department=<id>&semester=<id>
+        Regenerates performance_notes for all matching students in batches;
+        students whose results, fees and scholarships haven't changed since
+        their notes were written are skipped unless force=true.
+        """
+        students = Student.objects.all()
+        department = request.query_params.get("department")
+        semester = request.query_params.get("semester")
+        if department:
+            students = students.filter(department_id=department)
+        if semester:
+            students = students.filter(semester_id=semester)
+
+        force = str(request.query_params.get("force", "false")).lower() == "true"
+        counts = refresh_performance_notes(students, force=force)
+        logger.info("Performance notes refreshed", extra=counts)
+        return Response(counts, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='bulk-import', parser_classes=[MultiPartParser, FormParser])
+    def bulk_import(self, request):
+        """
+        POST /api/students/bulk-import/
+        Admit many students from a CSV or XLSX file (field "file"). Columns match
+        the student form: name or first_name/last_name, email, department_id,
+        semester_id, phone, date_of_birth, ... Returns a per-row error report.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response(
+                {"error": "No file provided"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            report = import_admissions(iter_upload_rows(upload))
+        except ValidationError as e:
+            return Response({"error": e.detail[0] if isinstance(e.detail, list) else e.detail},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response(report, status=status.HTTP_201_CREATED if report['created'] else status.HTTP_400_BAD_REQUEST)
+
     @action(detail=True, methods=['post'], url_path='upload-image', parser_classes=[MultiPartParser, FormParser])
     def upload_image(self, request, pk=None):
         """
@@ -100,34 +184,20 @@ class StudentViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            image_file = request.FILES['image']
-            
-            # Validate file type
-            allowed_types = ['image/jpeg', 'image/jpg', 'image/png', 'image/gif']
-            if image_file.content_type not in allowed_types:
-                return Response(
-                    {"error": "Invalid file type. Only JPEG, PNG, and GIF images are allowed"}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Validate file size (max 5MB)
-            if image_file.size > 5 * 1024 * 1024:
-                return Response(
-                    {"error": "File size too large. Maximum size is 5MB"}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Save the image
-            student.image = image_file
-            student.save(update_fields=['image'])
-            
-            # Return updated student data
+            accept_upload(student, request.FILES['image'])
+
+            # Renditions are produced in the background; image_renditions.status reports progress
             serializer = self.get_serializer(student)
             return Response({
                 "message": "Image uploaded successfully",
                 "student": serializer.data
-            }, status=status.HTTP_200_OK)
-            
+            }, status=status.HTTP_202_ACCEPTED)
+
+        except ValidationError as e:
+            return Response(
+                {"error": e.detail[0]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         except Student.DoesNotExist:
             return Response(
                 {"error": "Student not found"}, 
@@ -179,15 +249,14 @@ class StudentProfileView(APIView):
     
     def get(self, request):
         try:
-            # Get student by email (assuming email is used for authentication)
-            student = Student.objects.get(email=request.user.email)
-            serializer = StudentSerializer(student)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        except Student.DoesNotExist:
-            return Response(
-                {"error": "Student profile not found"}, 
-                status=status.HTTP_404_NOT_FOUND
-            )
+            # Linked student of this user (cached; see students.services.profile)
+            profile = get_student_profile(request.user)
+            if profile is None:
+                return Response(
+                    {"error": "Student profile not found"},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            return Response(profile, status=status.HTTP_200_OK)
         except Exception as e:
             return Response(
                 {"error": str(e)}, 
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-17 08:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Student's primary key moved back to student_id in students 0017; rebuild
+    the foreign keys that were created against the old integer id column.
+    """
+
+    dependencies = [
+        ('transport', '0002_alter_studenttransport_student'),
+        ('students', '0017_student_id_primary_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='studenttransport',
+            name='student',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='transport', to='students.student', db_constraint=False),
+        ),
+        migrations.AlterField(
+            model_name='studenttransport',
+            name='student',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='transport', to='students.student'),
+        ),
+    ]